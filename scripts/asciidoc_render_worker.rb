@@ -0,0 +1,58 @@
+#!/usr/bin/env ruby
+# filename: asciidoc_render_worker.rb
+# description: Keeps asciidoctor and asciidoctor-pdf loaded and renders the guides generate_guidance.py sends over a unix socket
+#
+# usage: ruby asciidoc_render_worker.rb SOCKET_PATH
+#        ./generate_guidance.py --render_socket SOCKET_PATH ../baselines/cis_lvl1.yaml
+#
+# Each request is one line of JSON, {"backend": "html5" or "pdf", "file": "/absolute/path/guide.adoc"},
+# answered with one line of JSON, {"file": ..., "ok": true} or {"file": ..., "ok": false, "error": ...}.
+# The output is written next to the .adoc file, the same as running asciidoctor or asciidoctor-pdf on it.
+
+require 'json'
+require 'socket'
+
+# use the gems bundled from the project Gemfile when they were installed, otherwise the system gems
+gemfile = File.expand_path('../Gemfile', __dir__)
+if File.exist?(gemfile)
+  ENV['BUNDLE_GEMFILE'] ||= gemfile
+  begin
+    require 'bundler/setup'
+  rescue LoadError, StandardError
+  end
+end
+
+require 'asciidoctor'
+begin
+  require 'asciidoctor-pdf'
+rescue LoadError
+  warn 'asciidoctor-pdf is not installed, only HTML guides can be rendered'
+end
+
+def render(request)
+  Asciidoctor.convert_file(request['file'], backend: request['backend'], safe: :unsafe)
+  { 'file' => request['file'], 'ok' => true }
+rescue StandardError, LoadError => e
+  { 'file' => request['file'], 'ok' => false, 'error' => e.message }
+end
+
+abort "usage: #{$PROGRAM_NAME} SOCKET_PATH" unless ARGV.length == 1
+socket_path = File.expand_path(ARGV[0])
+File.unlink(socket_path) if File.socket?(socket_path)
+server = UNIXServer.new(socket_path)
+at_exit { File.unlink(socket_path) if File.socket?(socket_path) }
+%w[INT TERM].each { |signal| trap(signal) { exit } }
+puts "Rendering guides sent to #{socket_path}"
+
+loop do
+  client = server.accept
+  begin
+    while (line = client.gets)
+      client.puts(JSON.generate(render(JSON.parse(line))))
+    end
+  rescue JSON::ParserError, SystemCallError, IOError => e
+    warn "Dropped a connection: #{e.message}"
+  ensure
+    client.close
+  end
+end
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# filename: benchmark_yaml_loaders.py
+# description: Compare the time taken to load the rule catalog with the pure Python and libyaml loaders
+
+import os
+import argparse
+import statistics
+import time
+import yaml
+from rule_catalog import RuleCatalog, load_yaml
+
+
+def create_args():
+    """configure the arguments used in the script, returns the parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description='Benchmark cold loads of the rules, sections, baselines and includes with each available YAML loader.')
+    parser.add_argument("-r", "--repeat", default=5, type=int,
+                        help="Number of times to load the catalog with each loader.", action="store")
+    return parser.parse_args()
+
+
+def catalog_files():
+    """Returns every YAML file read by the generate_* scripts
+    """
+    catalog = RuleCatalog()
+    files = catalog.all_rule_files()
+    for directory in ['../sections', '../custom/sections', '../baselines', '../includes']:
+        if os.path.isdir(directory):
+            files += sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith('.yaml'))
+    files.append('../VERSION.yaml')
+    return files
+
+
+def time_loader(files, loader, repeat):
+    """Loads every file with the given loader, returns a list of elapsed times in seconds
+    """
+    # read the files up front so only the parsing is measured
+    contents = []
+    for path in files:
+        with open(path) as f:
+            contents.append(f.read())
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in contents:
+            load_yaml(content, loader)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    args = create_args()
+
+    file_dir = os.path.dirname(os.path.abspath(__file__))
+    original_working_directory = os.getcwd()
+    os.chdir(file_dir)
+
+    files = catalog_files()
+    loaders = [('SafeLoader', yaml.SafeLoader)]
+    if hasattr(yaml, 'CSafeLoader'):
+        loaders.append(('CSafeLoader', yaml.CSafeLoader))
+    else:
+        print("libyaml is not available, only the pure Python loader will be measured")
+
+    print(f"Loading {len(files)} YAML files, {args.repeat} runs per loader\n")
+    results = {}
+    for name, loader in loaders:
+        timings = time_loader(files, loader, args.repeat)
+        results[name] = statistics.median(timings)
+        print(f"{name:<12} median {results[name]:.3f}s  min {min(timings):.3f}s  max {max(timings):.3f}s")
+
+    if len(results) > 1:
+        print(f"\nCSafeLoader is {results['SafeLoader'] / results['CSafeLoader']:.1f}x faster")
+
+    os.chdir(original_working_directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# filename: build_cache.py
+# description: Records the input files each generated fragment and output depends on, so unchanged work can be skipped
+
+import os
+import hashlib
+import pickle
+from rule_catalog import PICKLE_ERRORS, cache_path, read_pickle_store, write_pickle_store
+
+
+class BuildCache():
+    """Stores generated fragments with the state of the files and parameters they were built from.
+    Each fragment is kept in its own file under cache_dir, a run only reads the fragments it asks for
+    and only writes the ones it stores.
+    """
+    CACHE_VERSION = 2
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        # file digests are only computed once per run, the same templates are inputs of many fragments
+        self._digests = {}
+
+    def _digest(self, path):
+        if path not in self._digests:
+            try:
+                with open(path, 'rb') as f:
+                    self._digests[path] = hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                self._digests[path] = None
+        return self._digests[path]
+
+    def _file_state(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, self._digest(path))
+
+    def _file_matches(self, path, states):
+        """Compares a file with its recorded state in states, the content is only hashed when the mtime or size changed.
+        When only the mtime or size changed the new ones are recorded, so the file isn't hashed again on the next run
+        """
+        recorded = states[path]
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return recorded is None
+        if recorded is None:
+            return False
+        if (stat.st_mtime_ns, stat.st_size) == recorded[:2]:
+            return True
+        if self._digest(path) != recorded[2]:
+            return False
+        states[path] = (stat.st_mtime_ns, stat.st_size, recorded[2])
+        return True
+
+    def _params_digest(self, params):
+        return hashlib.sha256(pickle.dumps(params, pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+    def _inputs(self, inputs):
+        return sorted({os.path.abspath(path) for path in inputs if path})
+
+    def _entry_file(self, kind, key):
+        return os.path.join(self.cache_dir, kind, hashlib.sha256(repr(key).encode()).hexdigest() + '.pickle')
+
+    def _write(self, entry_file, entry):
+        try:
+            write_pickle_store(entry_file, self.CACHE_VERSION, entry)
+        except OSError as e:
+            print(f"Unable to write the build cache {entry_file}: {e}")
+
+    def get(self, kind, key, inputs, params=None):
+        """Returns the stored value for a fragment, or None if any of its input files or parameters changed
+        """
+        entry_file = self._entry_file(kind, key)
+        try:
+            entry = read_pickle_store(entry_file, self.CACHE_VERSION)
+        except PICKLE_ERRORS:
+            return None
+        if entry is None or entry['key'] != key:
+            return None
+        inputs = self._inputs(inputs)
+        if list(entry['inputs']) != inputs or entry['params'] != self._params_digest(params):
+            return None
+        recorded = dict(entry['inputs'])
+        for path in inputs:
+            if not self._file_matches(path, entry['inputs']):
+                return None
+        if entry['inputs'] != recorded:
+            self._write(entry_file, entry)
+        return entry['value']
+
+    def put(self, kind, key, inputs, value, params=None):
+        """Stores a fragment together with the current state of its input files
+        """
+        self._write(self._entry_file(kind, key), {
+            'key': key,
+            'inputs': {path: self._file_state(path) for path in self._inputs(inputs)},
+            'params': self._params_digest(params),
+            'value': value
+        })
+
+
+_build_cache = None
+
+
+def get_build_cache():
+    """Returns the shared build cache, stored under build/.cache/build_deps
+    """
+    global _build_cache
+    if _build_cache is None:
+        _build_cache = BuildCache(cache_path('build_deps'))
+    return _build_cache
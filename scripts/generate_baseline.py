@@ -2,96 +2,16 @@
 # filename: generate_guidance.py
 # description: Process a given keyword, and output a baseline file
 
+import sys
 import os.path
-import glob
 import os
+import re
 import yaml
 import argparse
+from rule_catalog import TagIndex, get_catalog, get_rule_yaml, load_yaml, load_yaml_file, preload_rules, set_workers, use_rule_pack
+from rule_model import MacSecurityRule
 
 
-class MacSecurityRule():
-    def __init__(self, title, rule_id, severity, discussion, check, fix, cci, cce, nist_controls, disa_stig, srg, odv, tags, result_value, mobileconfig, mobileconfig_info):
-        self.rule_title = title
-        self.rule_id = rule_id
-        self.rule_severity = severity
-        self.rule_discussion = discussion
-        self.rule_check = check
-        self.rule_fix = fix
-        self.rule_cci = cci
-        self.rule_cce = cce
-        self.rule_80053r4 = nist_controls
-        self.rule_disa_stig = disa_stig
-        self.rule_srg = srg
-        self.rule_odv = odv
-        self.rule_result_value = result_value
-        self.rule_tags = tags
-        self.rule_mobileconfig = mobileconfig
-        self.rule_mobileconfig_info = mobileconfig_info
-
-    def create_asciidoc(self, adoc_rule_template):
-        """Pass an AsciiDoc template as file object to return formatted AsciiDOC"""
-        rule_adoc = ""
-        rule_adoc = adoc_rule_template.substitute(
-            rule_title=self.rule_title,
-            rule_id=self.rule_id,
-            rule_severity=self.rule_severity,
-            rule_discussion=self.rule_discussion,
-            rule_check=self.rule_check,
-            rule_fix=self.rule_fix,
-            rule_cci=self.rule_cci,
-            rule_80053r4=self.rule_80053r4,
-            rule_disa_stig=self.rule_disa_stig,
-            rule_srg=self.rule_srg,
-            rule_result=self.rule_result_value
-        )
-        return rule_adoc
-
-
-def get_rule_yaml(rule_file, custom=False):
-    """ Takes a rule file, checks for a custom version, and returns the yaml for the rule
-    """
-    resulting_yaml = {}
-    names = [os.path.basename(x) for x in glob.glob('../custom/rules/**/*.yaml', recursive=True)]
-    file_name = os.path.basename(rule_file)
-
-    if custom:
-        print(f"Custom settings found for rule: {rule_file}")
-        try:
-            override_path = glob.glob('../custom/rules/**/{}'.format(file_name), recursive=True)[0]
-        except IndexError:
-            override_path = glob.glob('../custom/rules/{}'.format(file_name), recursive=True)[0]
-        with open(override_path) as r:
-            rule_yaml = yaml.load(r, Loader=yaml.SafeLoader)
-    else:
-        with open(rule_file) as r:
-            rule_yaml = yaml.load(r, Loader=yaml.SafeLoader)
-
-    try:
-        og_rule_path = glob.glob('../rules/**/{}'.format(file_name), recursive=True)[0]
-    except IndexError:
-        #assume this is a completely new rule
-        og_rule_path = glob.glob('../custom/rules/**/{}'.format(file_name), recursive=True)[0]
-
-    # get original/default rule yaml for comparison
-    with open(og_rule_path) as og:
-        og_rule_yaml = yaml.load(og, Loader=yaml.SafeLoader)
-    og.close()
-
-    for yaml_field in og_rule_yaml:
-        try:
-            if og_rule_yaml[yaml_field] == rule_yaml[yaml_field]:
-                resulting_yaml[yaml_field] = og_rule_yaml[yaml_field]
-            else:
-                resulting_yaml[yaml_field] = rule_yaml[yaml_field]
-                if 'customized' in resulting_yaml:
-                    resulting_yaml['customized'].append("customized {}".format(yaml_field))
-                else:
-                    resulting_yaml['customized'] = ["customized {}".format(yaml_field)]
-        except KeyError:
-            resulting_yaml[yaml_field] = og_rule_yaml[yaml_field]
-
-    return resulting_yaml
-
 def collect_rules():
     """Takes a baseline yaml file and parses the rules, returns a list of containing rules
     """
@@ -116,7 +36,8 @@ def collect_rules():
                   'srg']
 
 
-    for rule in sorted(glob.glob('../rules/**/*.yaml',recursive=True)) + sorted(glob.glob('../custom/rules/**/*.yaml',recursive=True)):
+    catalog = get_catalog()
+    for rule in sorted(catalog.rule_files) + sorted(catalog.custom_rule_files):
         rule_yaml = get_rule_yaml(rule, custom=False)
         for key in keys:
             try:
@@ -132,23 +53,7 @@ def collect_rules():
                         #print("expected reference '{}' is missing in key '{}' for rule{}".format(reference, key, rule))
                         rule_yaml[key].update({reference: ["None"]})
 
-        all_rules.append(MacSecurityRule(rule_yaml['title'].replace('|', '\|'),
-                                    rule_yaml['id'].replace('|', '\|'),
-                                    rule_yaml['severity'].replace('|', '\|'),
-                                    rule_yaml['discussion'].replace('|', '\|'),
-                                    rule_yaml['check'].replace('|', '\|'),
-                                    rule_yaml['fix'].replace('|', '\|'),
-                                    rule_yaml['references']['cci'],
-                                    rule_yaml['references']['cce'],
-                                    rule_yaml['references']['800-53r4'],
-                                    rule_yaml['references']['disa_stig'],
-                                    rule_yaml['references']['srg'],
-                                    rule_yaml['odv'],
-                                    rule_yaml['tags'],
-                                    rule_yaml['result'],
-                                    rule_yaml['mobileconfig'],
-                                    rule_yaml['mobileconfig_info']
-                                    ))
+        all_rules.append(MacSecurityRule.from_yaml(rule_yaml))
 
     return all_rules
 
@@ -160,11 +65,15 @@ def create_args():
     parser.add_argument("-c", "--controls", default=None,
                         help="Output the 800-53 controls covered by the rules.", action="store_true")
     parser.add_argument("-k", "--keyword", default=None,
-                        help="Keyword tag to collect rules containing the tag.", action="store")
+                        help="Keyword tag to collect rules containing the tag, tags can be combined with AND, OR, NOT and parentheses.", action="store")
     parser.add_argument("-l", "--list_tags", default=None,
                         help="List the available keyword tags to search for.", action="store_true")
     parser.add_argument("-t", "--tailor", default=None,
                         help="Customize the baseline to your organizations values.", action="store_true")
+    parser.add_argument("-w", "--workers", default=1, type=int,
+                        help="Number of worker processes used to parse the rule files, 0 uses every available core.", action="store")
+    parser.add_argument("-P", "--rule_pack", default=None, type=os.path.abspath,
+                        help="Load the rules, sections, baselines and includes from a rule pack built by generate_rule_pack.py.", action="store")
 
     return parser.parse_args()
 
@@ -219,16 +128,8 @@ def parse_authors(authors_from_yaml):
     author_block += "|===\n"
     return author_block
 
-def available_tags(all_rules):
-    all_tags = []
-    for rule in all_rules:
-        for tag in rule.rule_tags:
-            all_tags.append(tag)
-
-    available_tags = []
-    for tag in all_tags:
-        if tag not in available_tags:
-            available_tags.append(tag)
+def available_tags(tag_index):
+    available_tags = tag_index.tags()
     available_tags.append("all_rules")
     available_tags.sort()
 
@@ -327,7 +228,7 @@ def write_odv_custom_rule(rule, odv):
         os.makedirs("../custom/rules")
     if os.path.exists(f"../custom/rules/{rule.rule_id}.yaml"):
         with open(f"../custom/rules/{rule.rule_id}.yaml") as f:
-            rule_yaml = yaml.load(f, Loader=yaml.SafeLoader)
+            rule_yaml = load_yaml(f)
     else:
         rule_yaml = {}
 
@@ -342,7 +243,7 @@ def remove_odv_custom_rule(rule):
     odv_yaml = {}
     try:
         with open(f"../custom/rules/{rule.rule_id}.yaml") as f:
-            odv_yaml = yaml.load(f, Loader=yaml.SafeLoader)
+            odv_yaml = load_yaml(f)
             odv_yaml.pop('odv', None)
     except:
         pass
@@ -462,10 +363,16 @@ def main():
         # switch to the scripts directory
         os.chdir(file_dir)
 
+        if args.rule_pack:
+            if not use_rule_pack(args.rule_pack):
+                sys.exit(1)
+        set_workers(args.workers)
+        preload_rules()
         all_rules = collect_rules()
+        tag_index = TagIndex(all_rules)
 
         if args.list_tags:
-            available_tags(all_rules)
+            available_tags(tag_index)
             return
 
         if args.controls:
@@ -473,8 +380,7 @@ def main():
             parent_dir, 'includes', '800-53_baselines.yaml')
 
 
-            with open(baselines_file) as r:
-                baselines = yaml.load(r, Loader=yaml.SafeLoader)
+            baselines = load_yaml_file(baselines_file)
 
             included_controls = get_controls(all_rules)
             needed_controls = []
@@ -502,25 +408,20 @@ def main():
     # import mscp-data
     mscp_data_file = os.path.join(
             parent_dir, 'includes', 'mscp-data.yaml')
-    with open(mscp_data_file) as r:
-        mscp_data_yaml = yaml.load(r, Loader=yaml.SafeLoader)
+    mscp_data_yaml = load_yaml_file(mscp_data_file)
 
     version_file = os.path.join(parent_dir, "VERSION.yaml")
-    with open(version_file) as r:
-        version_yaml = yaml.load(r, Loader=yaml.SafeLoader)
+    version_yaml = load_yaml_file(version_file)
 
-    found_rules = []
-    for rule in all_rules:
-        if args.keyword in rule.rule_tags or args.keyword == "all_rules":
-            found_rules.append(rule)
+    try:
         # assume all baselines will contain the supplemental rules
-        if "supplemental" in rule.rule_tags:
-            if rule not in found_rules:
-                found_rules.append(rule)
+        found_rules = tag_index.select(args.keyword, always_include=["supplemental"])
+    except ValueError as e:
+        sys.exit(f"Unable to parse the keyword {args.keyword}: {e}")
 
     if args.keyword == None:
         print("No rules found for the keyword provided, please verify from the following list:")
-        available_tags(all_rules)
+        available_tags(tag_index)
     else:
         _established_benchmarks = ['stig', 'cis_lvl1', 'cis_lvl2']
         if any(bm in args.keyword for bm in _established_benchmarks):
@@ -556,7 +457,11 @@ def main():
             baseline_output_file = open(f"{build_path}/{tailored_filename}.yaml", 'w')
             baseline_output_file.write(output_baseline(odv_baseline_rules, version_yaml, baseline_tailored_string, benchmark, authors, full_title))
         else:
-            baseline_output_file = open(f"{build_path}/{args.keyword}.yaml", 'w')
+            output_name = args.keyword
+            if tag_index.is_expression(args.keyword):
+                # name the file after the expression, e.g. cis_lvl2_AND_NOT_800-53r5_low.yaml
+                output_name = re.sub(r'[^\w.-]+', '_', args.keyword).strip('_')
+            baseline_output_file = open(f"{build_path}/{output_name}.yaml", 'w')
             baseline_output_file.write(output_baseline(found_rules, version_yaml, baseline_tailored_string, benchmark, authors, full_title))
 
     # finally revert back to the prior directory
@@ -4,70 +4,34 @@
 import sys
 import os.path
 import plistlib
-import xlwt
 import glob
 import os
-import yaml
 import re
 import argparse
+import csv
 import subprocess
 import logging
 import tempfile
 import base64
+import pickle
+import json
+import socket
 from datetime import date
-from xlwt import Workbook
 from string import Template
 from itertools import groupby
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
+import rule_catalog
+from build_cache import get_build_cache
+from rule_catalog import get_catalog, get_workers, load_yaml_file, preload_rules, set_workers, use_rule_pack
+from rule_model import MacSecurityRule
+from xlsx_writer import XlsxWorkbook
 
-class MacSecurityRule():
-    def __init__(self, title, rule_id, severity, discussion, check, fix, cci, cce, nist_controls, nist_171, disa_stig, srg, cis, cmmc, custom_refs, odv, tags, result_value, mobileconfig, mobileconfig_info, customized):
-        self.rule_title = title
-        self.rule_id = rule_id
-        self.rule_severity = severity
-        self.rule_discussion = discussion
-        self.rule_check = check
-        self.rule_fix = fix
-        self.rule_cci = cci
-        self.rule_cce = cce
-        self.rule_80053r5 = nist_controls
-        self.rule_800171 = nist_171
-        self.rule_disa_stig = disa_stig
-        self.rule_srg = srg
-        self.rule_cis = cis
-        self.rule_cmmc = cmmc
-        self.rule_custom_refs = custom_refs
-        self.rule_odv = odv
-        self.rule_result_value = result_value
-        self.rule_tags = tags
-        self.rule_mobileconfig = mobileconfig
-        self.rule_mobileconfig_info = mobileconfig_info
-        self.rule_customized = customized
-
-    def create_asciidoc(self, adoc_rule_template):
-        """Pass an AsciiDoc template as file object to return formatted AsciiDOC"""
-        rule_adoc = ""
-        rule_adoc = adoc_rule_template.substitute(
-            rule_title=self.rule_title,
-            rule_id=self.rule_id,
-            rule_severity=self.rule_severity,
-            rule_discussion=self.rule_discussion,
-            rule_check=self.rule_check,
-            rule_fix=self.rule_fix,
-            rule_cci=self.rule_cci,
-            rule_80053r5=self.rule_80053r5,
-            rule_disa_stig=self.rule_disa_stig,
-            rule_cis=self.rule_cis,
-            rule_cmmc=self.rule_cmmc,
-            rule_srg=self.rule_srg,
-            rule_result=self.rule_result_value
-        )
-        return rule_adoc
+# generated fragments are rebuilt whenever the code producing them changes
+_code_inputs = [os.path.abspath(__file__), os.path.abspath(rule_catalog.__file__)]
 
-    def create_mobileconfig(self):
-        pass
 
-    # Convert a list to AsciiDoc
+# Convert a list to AsciiDoc
 def ulify(elements):
     string = "\n"
     for s in elements:
@@ -374,15 +338,14 @@ def concatenate_payload_settings(settings):
     return [settings_dict]
 
 
-def generate_profiles(baseline_name, build_path, parent_dir, baseline_yaml, signing, hash=''):
+def generate_profiles(baseline_name, build_path, parent_dir, baseline_rules, signing, hash=''):
     """Generate the configuration profiles for the rules in the provided baseline YAML file
     """
     
     # import profile_manifests.plist
     manifests_file = os.path.join(
         parent_dir, 'includes', 'supported_payloads.yaml')
-    with open(manifests_file) as r:
-        manifests = yaml.load(r, Loader=yaml.SafeLoader)
+    manifests = load_yaml_file(manifests_file)
 
     # Output folder
     unsigned_mobileconfig_output_path = os.path.join(
@@ -417,20 +380,13 @@ def generate_profiles(baseline_name, build_path, parent_dir, baseline_yaml, sign
     profile_types = {}
     mount_controls = {}
 
-    for sections in baseline_yaml['profile']:
-        for profile_rule in sections['rules']:
-            logging.debug(f"checking for rule file for {profile_rule}")
-            if glob.glob('../custom/rules/**/{}.yaml'.format(profile_rule),recursive=True):
-                rule = glob.glob('../custom/rules/**/{}.yaml'.format(profile_rule),recursive=True)[0]
-                custom=True
-                logging.debug(f"{rule}")
-            elif glob.glob('../rules/*/{}.yaml'.format(profile_rule)):
-                rule = glob.glob('../rules/*/{}.yaml'.format(profile_rule))[0]
-                custom=False
-                logging.debug(f"{rule}")
-
-            #for rule in glob.glob('../rules/*/{}.yaml'.format(profile_rule)) + glob.glob('../custom/rules/**/{}.yaml'.format(profile_rule),recursive=True):
-            rule_yaml = get_rule_yaml(rule, baseline_yaml, custom)
+    for section, rules in baseline_rules:
+        for baseline_rule in rules:
+            logging.debug(f"checking for rule file for {baseline_rule.rule_id}")
+            rule = baseline_rule.rule_location
+            logging.debug(f"{rule}")
+
+            rule_yaml = baseline_rule.yaml()
 
             if rule_yaml['mobileconfig']:
                 for payload_type, info in rule_yaml['mobileconfig_info'].items():
@@ -500,6 +456,16 @@ def generate_profiles(baseline_name, build_path, parent_dir, baseline_yaml, sign
             if signing:
                 signed_mobileconfig_file_path = os.path.join(
                 signed_mobileconfig_output_path, payload + '.mobileconfig')
+        # skip payloads whose settings are unchanged since the profiles were last written
+        profile_outputs = [unsigned_mobileconfig_file_path, settings_plist_file_path]
+        if signing:
+            profile_outputs.append(signed_mobileconfig_file_path)
+        # snapshot the settings, building the payload modifies them
+        profile_params = pickle.dumps((settings, baseline_name, signing, hash), pickle.HIGHEST_PROTOCOL)
+        if all(os.path.exists(path) for path in profile_outputs) and get_build_cache().get('mobileconfig', unsigned_mobileconfig_file_path, _code_inputs, profile_params):
+            print(f"Configuration profile {os.path.abspath(unsigned_mobileconfig_file_path)} is up to date, skipping")
+            continue
+
         identifier = payload + f".{baseline_name}"
         created = date.today()
         description = "Created: {}\nConfiguration settings for the {} preference domain.".format(created,
@@ -544,6 +510,8 @@ def generate_profiles(baseline_name, build_path, parent_dir, baseline_yaml, sign
             newProfile.finalizeAndSave(config_file)
             newProfile.finalizeAndSavePlist(settings_config_file)
             config_file.close()
+        settings_config_file.close()
+        get_build_cache().put('mobileconfig', unsigned_mobileconfig_file_path, _code_inputs, True, profile_params)
 
     print(f"""
     CAUTION: These configuration profiles are intended for evaluation in a TEST
@@ -555,7 +523,7 @@ def generate_profiles(baseline_name, build_path, parent_dir, baseline_yaml, sign
     be available through the vendor.
     """)
 
-def default_audit_plist(baseline_name, build_path, baseline_yaml):
+def default_audit_plist(baseline_name, build_path, baseline_rules):
     """"Generate the default audit plist file to define exemptions
     """
 
@@ -576,16 +544,16 @@ def default_audit_plist(baseline_name, build_path, baseline_yaml):
 
     plist_dict = {}
 
-    for sections in baseline_yaml['profile']:
-        for profile_rule in sections['rules']:
-            if profile_rule.startswith("supplemental"):
+    for section, rules in baseline_rules:
+        for baseline_rule in rules:
+            if baseline_rule.rule_id.startswith("supplemental"):
                 continue
-            plist_dict[profile_rule] = { "exempt": False }
+            plist_dict[baseline_rule.rule_id] = { "exempt": False }
 
     plistlib.dump(plist_dict, plist_file)
 
 
-def generate_script(baseline_name, build_path, baseline_yaml, reference):
+def generate_script(baseline_name, build_path, baseline_rules, reference):
     """Generates the zsh script from the rules in the baseline YAML
     """
     compliance_script_file = open(
@@ -824,19 +792,12 @@ fi
     """
 
     # Read all rules in the section and output the check functions
-    for sections in baseline_yaml['profile']:
-        for profile_rule in sections['rules']:
-            logging.debug(f"checking for rule file for {profile_rule}")
-            if glob.glob('../custom/rules/**/{}.yaml'.format(profile_rule),recursive=True):
-                rule = glob.glob('../custom/rules/**/{}.yaml'.format(profile_rule),recursive=True)[0]
-                custom=True
-                logging.debug(f"{rule}")
-            elif glob.glob('../rules/*/{}.yaml'.format(profile_rule)):
-                rule = glob.glob('../rules/*/{}.yaml'.format(profile_rule))[0]
-                custom=False
-                logging.debug(f"{rule}")
+    for section, rules in baseline_rules:
+        for baseline_rule in rules:
+            logging.debug(f"checking for rule file for {baseline_rule.rule_id}")
+            logging.debug(f"{baseline_rule.rule_location}")
 
-            rule_yaml = get_rule_yaml(rule, baseline_yaml, custom)
+            rule_yaml = baseline_rule.yaml()
 
 
             if rule_yaml['id'].startswith("supplemental"):
@@ -1161,269 +1122,229 @@ def fill_in_odv(resulting_yaml, parent_values):
 
 
 
+# merged rules are kept pickled so every caller gets its own copy and the cached rule can't be modified
+_merged_rules = {}
+
 def get_rule_yaml(rule_file, baseline_yaml, custom=False,):
     """ Takes a rule file, checks for a custom version, and returns the yaml for the rule
     """
-    global resulting_yaml
-    resulting_yaml = {}
-    names = [os.path.basename(x) for x in glob.glob('../custom/rules/**/*.yaml', recursive=True)]
-    file_name = os.path.basename(rule_file)
-    
     # get parent values
     try:
         parent_values = baseline_yaml['parent_values']
     except KeyError:
         parent_values = "recommended"
 
-    if custom:
-        print(f"Custom settings found for rule: {rule_file}")
-        try:
-            override_path = glob.glob('../custom/rules/**/{}'.format(file_name), recursive=True)[0]
-        except IndexError:
-            override_path = glob.glob('../custom/rules/{}'.format(file_name), recursive=True)[0]
-        with open(override_path) as r:
-            rule_yaml = yaml.load(r, Loader=yaml.SafeLoader)
-    else:
-        with open(rule_file) as r:
-            rule_yaml = yaml.load(r, Loader=yaml.SafeLoader)
+    merge_key = (rule_file, custom, parent_values)
+    if merge_key not in _merged_rules:
+        resulting_yaml = rule_catalog.get_rule_yaml(rule_file, custom)
+        fill_in_odv(resulting_yaml, parent_values)
+        _merged_rules[merge_key] = pickle.dumps(resulting_yaml, pickle.HIGHEST_PROTOCOL)
 
-    try:
-        og_rule_path = glob.glob('../rules/**/{}'.format(file_name), recursive=True)[0]
-    except IndexError:
-        #assume this is a completely new rule
-        og_rule_path = glob.glob('../custom/rules/**/{}'.format(file_name), recursive=True)[0]
-        resulting_yaml['customized'] = ["customized rule"]
-
-    # get original/default rule yaml for comparison
-    with open(og_rule_path) as og:
-        og_rule_yaml = yaml.load(og, Loader=yaml.SafeLoader)
-
-    for yaml_field in og_rule_yaml:
-        #print('processing field {} for rule {}'.format(yaml_field, file_name))
-        if yaml_field == "references":
-            if not 'references' in resulting_yaml:
-                resulting_yaml['references'] = {}
-            for ref in og_rule_yaml['references']:
-                try:
-                    if og_rule_yaml['references'][ref] == rule_yaml['references'][ref]:
-                        resulting_yaml['references'][ref] = og_rule_yaml['references'][ref]
-                    else:
-                        resulting_yaml['references'][ref] = rule_yaml['references'][ref]
-                except KeyError:
-                    #  reference not found in original rule yaml, trying to use reference from custom rule
-                    try:
-                        resulting_yaml['references'][ref] = rule_yaml['references'][ref]
-                    except KeyError:
-                        resulting_yaml['references'][ref] = og_rule_yaml['references'][ref]
-                try:
-                    if "custom" in rule_yaml['references']:
-                        resulting_yaml['references']['custom'] = rule_yaml['references']['custom']
-                        if 'customized' in resulting_yaml:
-                            if 'customized references' not in resulting_yaml['customized']:
-                                resulting_yaml['customized'].append("customized references")
-                        else:
-                            resulting_yaml['customized'] = ["customized references"]
-                except:
-                    pass
-        elif yaml_field == "tags":
-            # try to concatenate tags from both original yaml and custom yaml
-            try:
-                if og_rule_yaml["tags"] == rule_yaml["tags"]:
-                    #print("using default data in yaml field {}".format("tags"))
-                    resulting_yaml['tags'] = og_rule_yaml['tags']
-                else:
-                    #print("Found custom tags... concatenating them")
-                    resulting_yaml['tags'] = og_rule_yaml['tags'] + rule_yaml['tags']
-            except KeyError:
-                resulting_yaml['tags'] = og_rule_yaml['tags']
-        else:
-            try:
-                if og_rule_yaml[yaml_field] == rule_yaml[yaml_field]:
-                    #print("using default data in yaml field {}".format(yaml_field))
-                    resulting_yaml[yaml_field] = og_rule_yaml[yaml_field]
-                else:
-                    #print('using CUSTOM value for yaml field {} in rule {}'.format(yaml_field, file_name))
-                    resulting_yaml[yaml_field] = rule_yaml[yaml_field]
-                    if 'customized' in resulting_yaml:
-                        resulting_yaml['customized'].append("customized {}".format(yaml_field))
-                    else:
-                        resulting_yaml['customized'] = ["customized {}".format(yaml_field)]
-            except KeyError:
-                resulting_yaml[yaml_field] = og_rule_yaml[yaml_field]
-
-    fill_in_odv(resulting_yaml, parent_values)
-
-    return resulting_yaml
+    return pickle.loads(_merged_rules[merge_key])
 
 
-def generate_xls(baseline_name, build_path, baseline_yaml):
-    """Using the baseline yaml file, create an XLS document containing the YAML fields
+class BaselineRule:
+    """A rule of a resolved baseline with the files it is loaded from. yaml() returns a new copy of the merged rule
+    on every call, the writers modify the rules they are given
     """
+    def __init__(self, rule_id, rule_path, override_path, baseline_yaml):
+        self.rule_id = rule_id
+        self.rule_path = rule_path
+        self.override_path = override_path
+        self.custom = bool(override_path)
+        self.rule_location = override_path if override_path else rule_path
+        self.baseline_yaml = baseline_yaml
 
-    baseline_rules = create_rules(baseline_yaml)
-
-    # File path setup
-    file_dir = os.path.dirname(os.path.abspath(__file__))
-    parent_dir = os.path.dirname(file_dir)
-
-    # Output files
-    xls_output_file = f"{build_path}/{baseline_name}.xls"
-
-
-    wb = Workbook()
-
-    sheet1 = wb.add_sheet('Sheet 1', cell_overwrite_ok=True)
-    topWrap = xlwt.easyxf("align: vert top; alignment: wrap True")
-    top = xlwt.easyxf("align: vert top")
-    headers = xlwt.easyxf("font: bold on")
-    counter = 1
-    column_counter = 17
-    custom_ref_column = {}
-    sheet1.write(0, 0, "CCE", headers)
-    sheet1.write(0, 1, "Rule ID", headers)
-    sheet1.write(0, 2, "Title", headers)
-    sheet1.write(0, 3, "Discussion", headers)
-    sheet1.write(0, 4, "Mechanism", headers)
-    sheet1.write(0, 5, "Check", headers)
-    sheet1.write(0, 6, "Check Result", headers)
-    sheet1.write(0, 7, "Fix", headers)
-    sheet1.write(0, 8, "800-53r5", headers)
-    sheet1.write(0, 9, "800-171", headers)
-    sheet1.write(0, 10, "SRG", headers)
-    sheet1.write(0, 11, "DISA STIG", headers)
-    sheet1.write(0, 12, "CIS Benchmark", headers)
-    sheet1.write(0, 13, "CIS v8", headers)
-    sheet1.write(0, 14, "CMMC", headers)
-    sheet1.write(0, 15, "CCI", headers)
-    sheet1.write(0, 16, "Modifed Rule", headers)
-    sheet1.set_panes_frozen(True)
-    sheet1.set_horz_split_pos(1)
-    sheet1.set_vert_split_pos(2)
-
-
-    for rule in baseline_rules:
-        if rule.rule_id.startswith("supplemental") or rule.rule_id.startswith("srg"):
-            continue
-
-        sheet1.write(counter, 0, rule.rule_cce, top)
-        sheet1.col(0).width = 256 * 15
-        sheet1.write(counter, 1, rule.rule_id, top)
-        sheet1.col(1).width = 512 * 25
-        sheet1.write(counter, 2, rule.rule_title, top)
-        sheet1.col(2).width = 600 * 30
-        sheet1.write(counter, 3, str(rule.rule_discussion), topWrap)
-        sheet1.col(3).width = 700 * 35
-        mechanism = "Manual"
-        if "[source,bash]" in rule.rule_fix:
-            mechanism = "Script"
-        if "This is implemented by a Configuration Profile." in rule.rule_fix:
-            mechanism = "Configuration Profile"
-        if "inherent" in rule.rule_tags:
-            mechanism = "The control cannot be configured out of compliance."
-        if "permanent" in rule.rule_tags:
-            mechanism = "The control is not able to be configure to meet the requirement.  It is recommended to implement a third-party solution to meet the control."
-        if "not_applicable" in rule.rule_tags:
-            mechanism = " The control is not applicable when configuring a macOS system."
-
-        sheet1.write(counter, 4, mechanism, top)
-        sheet1.col(4).width = 256 * 25
-
-        sheet1.write(counter, 5, rule.rule_check.replace("\|", "|"), topWrap)
-        sheet1.col(5).width = 750 * 50
-
-        sheet1.write(counter, 6, str(rule.rule_result_value), topWrap)
-        sheet1.col(6).width = 256 * 25
-
-        if rule.rule_mobileconfig:
-            sheet1.write(counter, 7, format_mobileconfig_fix(
-                rule.rule_mobileconfig_info), topWrap)
-            #print(format_mobileconfig_fix(rule.rule_mobileconfig_info))
-
-            # sheet1.write(counter, 7, str(
-            #     configProfile(rule_file)), topWrap)
-        else:
-            sheet1.write(counter, 7, str(rule.rule_fix.replace("\|", "|")), topWrap)
+    def yaml(self):
+        return get_rule_yaml(self.rule_location, self.baseline_yaml, self.custom)
 
-        sheet1.col(7).width = 1000 * 50
+    def merge_key(self):
+        """Returns the key the merged rule is stored under, baselines with the same parent values share it
+        """
+        return (self.rule_location, self.custom, self.baseline_yaml.get('parent_values', "recommended"))
 
-        baseline_refs = (
-            str(rule.rule_80053r5)).strip('[]\'')
-        baseline_refs = baseline_refs.replace(", ", "\n").replace("\'", "")
 
-        sheet1.write(counter, 8, baseline_refs, topWrap)
-        sheet1.col(8).width = 256 * 15
+def resolve_baseline(baseline_yaml):
+    """Looks up the files of every rule in the baseline once, returns a list of (section, rules) in profile order
+    """
+    catalog = get_catalog()
+    return [(sections['section'], [BaselineRule(rule_id, *catalog.lookup(rule_id), baseline_yaml) for rule_id in sections['rules']])
+            for sections in baseline_yaml['profile']]
+
+
+# spreadsheet columns and their widths in characters, custom reference columns are added after these
+XLS_COLUMNS = [("CCE", 15),
+               ("Rule ID", 50),
+               ("Title", 70),
+               ("Discussion", 96),
+               ("Mechanism", 25),
+               ("Check", 146),
+               ("Check Result", 25),
+               ("Fix", 195),
+               ("800-53r5", 15),
+               ("800-171", 15),
+               ("SRG", 29),
+               ("DISA STIG", 29),
+               ("CIS Benchmark", 29),
+               ("CIS v8", 29),
+               ("CMMC", 29),
+               ("CCI", 23),
+               ("Modifed Rule", 23)]
+CUSTOM_REF_WIDTH = 50
+MATRIX_COLUMN_WIDTH = 20
+XLS_ROW_HEIGHT = 36
+TABLE_DELIMITERS = {"csv": ",", "tsv": "\t"}
+
+
+def format_refs(refs):
+    refs = (str(refs)).strip('[]\'')
+    return refs.replace(", ", "\n").replace("\'", "")
+
+
+def table_value(cell):
+    """Returns the text of a spreadsheet cell for the csv and tsv output, lists are written one per line
+    """
+    if cell is None:
+        return ""
+    value = cell[0]
+    if isinstance(value, list):
+        return "\n".join(str(item) for item in value)
+    return value
 
-        nist171_refs = (
-            str(rule.rule_800171)).strip('[]\'')
-        nist171_refs = nist171_refs.replace(", ", "\n").replace("\'", "")
 
-        sheet1.write(counter, 9, nist171_refs, topWrap)
-        sheet1.col(9).width = 256 * 15
+def xls_rule_row(rule, custom_ref_column):
+    """Returns the spreadsheet cells for a rule as (value, style) pairs, None where the rule has no value
+    """
+    mechanism = "Manual"
+    if "[source,bash]" in rule.rule_fix:
+        mechanism = "Script"
+    if "This is implemented by a Configuration Profile." in rule.rule_fix:
+        mechanism = "Configuration Profile"
+    if "inherent" in rule.rule_tags:
+        mechanism = "The control cannot be configured out of compliance."
+    if "permanent" in rule.rule_tags:
+        mechanism = "The control is not able to be configure to meet the requirement.  It is recommended to implement a third-party solution to meet the control."
+    if "not_applicable" in rule.rule_tags:
+        mechanism = " The control is not applicable when configuring a macOS system."
+
+    if rule.rule_mobileconfig:
+        fix = format_mobileconfig_fix(rule.rule_mobileconfig_info)
+    else:
+        fix = str(rule.text('fix'))
+
+    row = [(rule.rule_cce, "top"),
+           (rule.rule_id, "top"),
+           (rule.rule_title, "top"),
+           (str(rule.rule_discussion), "top_wrap"),
+           (mechanism, "top"),
+           (rule.text('check'), "top_wrap"),
+           (str(rule.rule_result_value), "top_wrap"),
+           (fix, "top_wrap"),
+           (format_refs(rule.rule_80053r5), "top_wrap"),
+           (format_refs(rule.rule_800171), "top_wrap"),
+           (format_refs(rule.rule_srg), "top_wrap"),
+           (format_refs(rule.rule_disa_stig), "top_wrap"),
+           None,
+           None,
+           (format_refs(rule.rule_cmmc), "top_wrap"),
+           (format_refs(rule.rule_cci), "top_wrap"),
+           (format_refs(rule.rule_customized), "top_wrap")]
+    row.extend([None] * len(custom_ref_column))
+
+    if rule.rule_cis != ['None']:
+        for title, ref in rule.rule_cis.items():
+            if title.lower() == "benchmark":
+                row[12] = ("\n".join(ref) if isinstance(ref, list) else ref, "top_wrap")
+            if title.lower() == "controls v8":
+                row[13] = (str(ref).strip('[]\'').replace(", ", "\n"), "top_wrap")
+
+    if rule.rule_custom_refs != ['None']:
+        for title, ref in rule.rule_custom_refs.items():
+            row[custom_ref_column[title]] = (format_refs(ref), "top_wrap")
+
+    return row
+
+
+def xls_table(baseline_rules):
+    """Returns the headers, the column widths and a generator of the rows of the spreadsheet for the resolved baseline rules
+    """
+    rules = [rule for rule in create_rules(baseline_rules)
+             if not (rule.rule_id.startswith("supplemental") or rule.rule_id.startswith("srg"))]
 
-        srg_refs = (str(rule.rule_srg)).strip('[]\'')
-        srg_refs = srg_refs.replace(", ", "\n").replace("\'", "")
+    # custom reference titles get a column each, in the order they are first used
+    custom_ref_column = {}
+    for rule in rules:
+        if rule.rule_custom_refs != ['None']:
+            for title in rule.rule_custom_refs:
+                custom_ref_column.setdefault(title, len(XLS_COLUMNS) + len(custom_ref_column))
 
-        sheet1.write(counter, 10, srg_refs, topWrap)
-        sheet1.col(10).width = 500 * 15
+    headers = [header for header, width in XLS_COLUMNS] + list(custom_ref_column)
+    widths = [width for header, width in XLS_COLUMNS] + [CUSTOM_REF_WIDTH] * len(custom_ref_column)
+    rows = (xls_rule_row(rule, custom_ref_column) for rule in rules)
+    return headers, widths, rows
 
-        disa_refs = (str(rule.rule_disa_stig)).strip('[]\'')
-        disa_refs = disa_refs.replace(", ", "\n").replace("\'", "")
 
-        sheet1.write(counter, 11, disa_refs, topWrap)
-        sheet1.col(11).width = 500 * 15
+def generate_xls(baseline_name, build_path, baseline_rules, table_format="xlsx"):
+    """Using the resolved baseline rules, create an XLSX document containing the YAML fields, or a CSV or TSV file when table_format is csv or tsv
+    """
+    headers, widths, rows = xls_table(baseline_rules)
 
-        cis = ""
-        if rule.rule_cis != ['None']:
-            for title, ref in rule.rule_cis.items():
-                if title.lower() == "benchmark":
-                    sheet1.write(counter, 12, ref, topWrap)
-                    sheet1.col(12).width = 500 * 15
-                if title.lower() == "controls v8":
-                    cis = (str(ref).strip('[]\''))
-                    cis = cis.replace(", ", "\n")
-                    sheet1.write(counter, 13, cis, topWrap)
-                    sheet1.col(13).width = 500 * 15
-        
-        cmmc_refs = (str(rule.rule_cmmc)).strip('[]\'')
-        cmmc_refs = cmmc_refs.replace(", ", "\n").replace("\'", "")
+    # Output files
+    xls_output_file = f"{build_path}/{baseline_name}.{table_format}"
+
+    if table_format in TABLE_DELIMITERS:
+        with open(xls_output_file, 'w', newline='', encoding='utf-8') as output_file:
+            writer = csv.writer(output_file, delimiter=TABLE_DELIMITERS[table_format])
+            writer.writerow(headers)
+            for row in rows:
+                writer.writerow([table_value(cell) for cell in row])
+    else:
+        with XlsxWorkbook(xls_output_file) as workbook:
+            write_xls_sheet(workbook, 'Sheet 1', headers, widths, rows)
 
-        sheet1.write(counter, 14, cmmc_refs, topWrap)
-        sheet1.col(14).width = 500 * 15
+    print(f"Finished building {xls_output_file}")
 
-        cci = (str(rule.rule_cci)).strip('[]\'')
-        cci = cci.replace(", ", "\n").replace("\'", "")
 
-        sheet1.write(counter, 15, cci, topWrap)
-        sheet1.col(15).width = 400 * 15
+def write_xls_sheet(workbook, name, headers, widths, rows):
+    sheet = workbook.add_sheet(name, widths, frozen_rows=1, frozen_columns=2)
+    sheet.write_row([(header, "header") for header in headers])
+    for row in rows:
+        sheet.write_row(row, height=XLS_ROW_HEIGHT)
 
-        customized = (str(rule.rule_customized)).strip('[]\'')
-        customized = customized.replace(", ", "\n").replace("\'", "")
 
-        sheet1.write(counter, 16, customized, topWrap)
-        sheet1.col(16).width = 400 * 15
+def generate_workbook(workbook_file, baselines):
+    """Writes one XLSX workbook with a sheet for each baseline, after a matrix sheet marking the baselines each rule is in.
+    baselines is a list of (baseline_name, resolved baseline rules)
+    """
+    # rule id -> positions of the baselines it is in
+    baseline_index = {}
+    for position, (baseline_name, baseline_rules) in enumerate(baselines):
+        for section, rules in baseline_rules:
+            for baseline_rule in rules:
+                baseline_index.setdefault(baseline_rule.rule_id, set()).add(position)
+
+    with XlsxWorkbook(workbook_file) as workbook:
+        sheet = workbook.add_sheet("Baseline Matrix", [XLS_COLUMNS[1][1]] + [MATRIX_COLUMN_WIDTH] * len(baselines), frozen_rows=1, frozen_columns=1)
+        sheet.write_row([("Rule ID", "header")] + [(baseline_name, "header") for baseline_name, baseline_rules in baselines])
+        for rule_id in sorted(baseline_index):
+            if rule_id.startswith("supplemental") or rule_id.startswith("srg"):
+                continue
+            positions = baseline_index[rule_id]
+            sheet.write_row([(rule_id, "top")] + [("X", "top") if position in positions else None for position in range(len(baselines))])
 
-        if rule.rule_custom_refs != ['None']:
-            for title, ref in rule.rule_custom_refs.items():
-                if title not in custom_ref_column:
-                    custom_ref_column[title] = column_counter
-                    column_counter = column_counter + 1
-                    sheet1.write(0, custom_ref_column[title], title, headers)
-                    sheet1.col(custom_ref_column[title]).width = 512 * 25
-                added_ref = (str(ref)).strip('[]\'')
-                added_ref = added_ref.replace(", ", "\n").replace("\'", "")
-                sheet1.write(counter, custom_ref_column[title], added_ref, topWrap)
+        for baseline_name, baseline_rules in baselines:
+            write_xls_sheet(workbook, baseline_name, *xls_table(baseline_rules))
 
+    print(f"Finished building {workbook_file}")
 
-        tall_style = xlwt.easyxf('font:height 640;')  # 36pt
 
-        sheet1.row(counter).set_style(tall_style)
-        counter = counter + 1
+# rule models by merge key, the spreadsheet writers only read them so they are shared between baselines
+_rule_models = {}
 
-    wb.save(xls_output_file)
-    print(f"Finished building {xls_output_file}")
 
-def create_rules(baseline_yaml):
-    """Takes a baseline yaml file and parses the rules, returns a list of containing rules
+def create_rules(baseline_rules):
+    """Takes the resolved baseline rules, returns a list of containing rules. A rule is only created once for all the
+    baselines sharing its parent values
     """
     all_rules = []
     #expected keys and references
@@ -1451,17 +1372,13 @@ def create_rules(baseline_yaml):
                   'custom']
 
 
-    for sections in baseline_yaml['profile']:
-        for profile_rule in sections['rules']:
-            if glob.glob('../custom/rules/**/{}.yaml'.format(profile_rule),recursive=True):
-                rule = glob.glob('../custom/rules/**/{}.yaml'.format(profile_rule),recursive=True)[0]
-                custom=True
-            elif glob.glob('../rules/*/{}.yaml'.format(profile_rule)):
-                rule = glob.glob('../rules/*/{}.yaml'.format(profile_rule))[0]
-                custom=False
-
-            #for rule in glob.glob('../rules/*/{}.yaml'.format(profile_rule)) + glob.glob('../custom/rules/**/{}.yaml'.format(profile_rule),recursive=True):
-            rule_yaml = get_rule_yaml(rule, baseline_yaml, custom)
+    for section, rules in baseline_rules:
+        for baseline_rule in rules:
+            merge_key = baseline_rule.merge_key()
+            if merge_key in _rule_models:
+                all_rules.append(_rule_models[merge_key])
+                continue
+            rule_yaml = baseline_rule.yaml()
 
             for key in keys:
                 try:
@@ -1477,28 +1394,8 @@ def create_rules(baseline_yaml):
                         except:
                             #print("expected reference '{}' is missing in key '{}' for rule{}".format(reference, key, rule))
                             rule_yaml[key].update({reference: ["None"]})
-            all_rules.append(MacSecurityRule(rule_yaml['title'].replace('|', '\|'),
-                                        rule_yaml['id'].replace('|', '\|'),
-                                        rule_yaml['severity'].replace('|', '\|'),
-                                        rule_yaml['discussion'].replace('|', '\|'),
-                                        rule_yaml['check'].replace('|', '\|'),
-                                        rule_yaml['fix'].replace('|', '\|'),
-                                        rule_yaml['references']['cci'],
-                                        rule_yaml['references']['cce'],
-                                        rule_yaml['references']['800-53r5'],
-                                        rule_yaml['references']['800-171r2'],
-                                        rule_yaml['references']['disa_stig'],
-                                        rule_yaml['references']['srg'],
-                                        rule_yaml['references']['cis'],
-                                        rule_yaml['references']['cmmc'],
-                                        rule_yaml['references']['custom'],
-                                        rule_yaml['odv'],
-                                        rule_yaml['tags'],
-                                        rule_yaml['result'],
-                                        rule_yaml['mobileconfig'],
-                                        rule_yaml['mobileconfig_info'],
-                                        rule_yaml['customized']
-                                        ))
+            _rule_models[merge_key] = MacSecurityRule.from_yaml(rule_yaml)
+            all_rules.append(_rule_models[merge_key])
 
     return all_rules
 
@@ -1507,8 +1404,10 @@ def create_args():
     """
     parser = argparse.ArgumentParser(
         description='Given a baseline, create guidance documents and files.')
-    parser.add_argument("baseline", default=None,
-                        help="Baseline YAML file used to create the guide.", type=argparse.FileType('rt'))
+    parser.add_argument("baseline", default=None, nargs="*",
+                        help="Baseline YAML files used to create the guides.")
+    parser.add_argument("-a", "--all_baselines", default=None,
+                        help="Create the guides for every baseline in the baselines folder, the rules are only parsed once.", action="store_true")
     parser.add_argument("-c", "--clean", default=None,
                         help=argparse.SUPPRESS, action="store_true")
     parser.add_argument("-d", "--debug", default=None,
@@ -1525,10 +1424,26 @@ def create_args():
     parser.add_argument("-g", "--gary", default=None,
                         help=argparse.SUPPRESS, action="store_true")
     parser.add_argument("-x", "--xls", default=None,
-                        help="Generate the excel (xls) document for the rules.", action="store_true")
+                        help="Generate the excel (xlsx) document for the rules.", action="store_true")
+    parser.add_argument("-t", "--table_format", default="xlsx", choices=["xlsx", "csv", "tsv"],
+                        help="Write the --xls document as an xlsx workbook (default), or as a csv or tsv file.", action="store")
+    parser.add_argument("-W", "--workbook", default=None, type=os.path.abspath,
+                        help="Write one xlsx workbook to this path with a sheet for every baseline given, and a matrix sheet of the baselines each rule is in.", action="store")
     parser.add_argument("-H", "--hash", default=None,
                         help="sign the configuration profiles with subject key ID (hash value without spaces)")
-    return parser.parse_args()
+    parser.add_argument("-w", "--workers", default=1, type=int,
+                        help="Number of worker processes used to parse the rule files and render the HTML and PDF guides, 0 uses every available core.", action="store")
+    parser.add_argument("-P", "--rule_pack", default=None, type=os.path.abspath,
+                        help="Load the rules, sections, baselines and includes from a rule pack built by generate_rule_pack.py.", action="store")
+    parser.add_argument("-R", "--render_socket", default=None, type=os.path.abspath,
+                        help="Render the HTML and PDF guides with asciidoc_render_worker.rb listening on this unix socket, which keeps asciidoctor loaded between builds.", action="store")
+    args = parser.parse_args()
+    if args.all_baselines and args.baseline:
+        parser.error("give either baseline files or --all_baselines, not both")
+    for baseline_file in args.baseline:
+        if not os.path.isfile(baseline_file):
+            parser.error(f"can't open '{baseline_file}'")
+    return args
 
 
 def is_asciidoctor_installed():
@@ -1553,6 +1468,174 @@ def is_asciidoctor_pdf_installed():
 
     return output.decode("utf-8").strip()
 
+def stale_renders(renders):
+    """Returns the renders that were not already rendered from the same inputs, renders is a list of (adoc_file, output_file, render_inputs)
+    """
+    build_cache = get_build_cache()
+    stale = []
+    for adoc_file, output_file, render_inputs in renders:
+        if os.path.exists(output_file) and build_cache.get('render', output_file, render_inputs):
+            print(f"{os.path.basename(output_file)} is up to date, skipping")
+        else:
+            stale.append((adoc_file, output_file, render_inputs))
+    return stale
+
+
+def output_mtime(output_file):
+    try:
+        return os.stat(output_file).st_mtime_ns
+    except OSError:
+        return None
+
+
+def run_render(command, renders):
+    """Runs one asciidoctor command for a batch of renders, returns the renders whose output was written
+    """
+    previous = [output_mtime(output_file) for adoc_file, output_file, render_inputs in renders]
+    # asciidoctor converts every file it is given, so the ruby startup is paid once per batch
+    cmd = command + "".join(f" \'{adoc_file}\'" for adoc_file, output_file, render_inputs in renders)
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, shell=True)
+    process.communicate()
+    # when one file fails the others in the batch may still have been written, an output counts if it changed
+    rendered = []
+    for render, mtime in zip(renders, previous):
+        current = output_mtime(render[1])
+        if current is not None and current != mtime:
+            rendered.append(render)
+        elif process.returncode != 0:
+            print(f"Unable to render {os.path.basename(render[1])}")
+    return rendered
+
+
+def render_adoc(jobs, workers=1):
+    """Renders every guide that was not already rendered from the same inputs, jobs is a list of (command, renders).
+    The stale renders of each command are split into at most workers batches, and the batches of every command run at the same time
+    """
+    if workers < 1:
+        workers = get_workers()
+    batches = []
+    for command, renders in jobs:
+        stale = stale_renders(renders)
+        count = min(workers, len(stale))
+        batches.extend((command, stale[batch::count]) for batch in range(count))
+    if not batches:
+        return
+
+    if workers == 1 or len(batches) == 1:
+        rendered = [run_render(command, renders) for command, renders in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(batches))) as executor:
+            rendered = list(executor.map(run_render, *zip(*batches)))
+
+    build_cache = get_build_cache()
+    for renders in rendered:
+        for adoc_file, output_file, render_inputs in renders:
+            build_cache.put('render', output_file, render_inputs, True)
+
+
+# seconds to wait for the render worker to answer, rendering the PDF of a large guide takes a few minutes
+RENDER_WORKER_TIMEOUT = 600
+
+
+def render_with_worker(socket_path, jobs):
+    """Sends the stale renders of each (backend, renders) job to asciidoc_render_worker.rb and waits for the results.
+    Returns the (backend, renders) jobs left for asciidoctor, all of them when no worker is listening on socket_path
+    and the renders that weren't finished when the worker stops answering
+    """
+    try:
+        worker = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        worker.settimeout(RENDER_WORKER_TIMEOUT)
+        worker.connect(socket_path)
+    except OSError:
+        print(f"No render worker is listening on {socket_path}, running asciidoctor instead")
+        return jobs
+
+    build_cache = get_build_cache()
+    unfinished = []
+    answering = True
+    stream = worker.makefile('rw', encoding='utf-8')
+    try:
+        for backend, renders in jobs:
+            left = []
+            for adoc_file, output_file, render_inputs in stale_renders(renders):
+                if answering:
+                    try:
+                        stream.write(json.dumps({"backend": backend, "file": os.path.abspath(adoc_file)}) + "\n")
+                        stream.flush()
+                        reply = stream.readline()
+                    except OSError as e:
+                        # socket.timeout is an OSError, the worker is hung or gone and the rest goes to asciidoctor
+                        print(f"The render worker stopped answering ({e}), running asciidoctor instead")
+                        answering = False
+                if not answering:
+                    left.append((adoc_file, output_file, render_inputs))
+                    continue
+                result = json.loads(reply) if reply else {"ok": False, "error": "the render worker closed the connection"}
+                if result.get("ok") and os.path.exists(output_file):
+                    build_cache.put('render', output_file, render_inputs, True)
+                else:
+                    print(f"Unable to render {os.path.basename(output_file)}: {result.get('error')}")
+            if left:
+                unfinished.append((backend, left))
+    finally:
+        # after a timeout the stream may not flush, the connection is dropped either way
+        try:
+            stream.close()
+        except OSError:
+            pass
+        worker.close()
+    return unfinished
+
+
+def render_guides(guides, gary=False, workers=1, render_socket=None):
+    """Renders the HTML and PDF files for each guide returned by generate_guide, through the render worker listening on
+    render_socket when one is running, otherwise using up to workers asciidoctor processes
+    """
+    html_renders = [(adoc_file, html_file, render_inputs) for adoc_file, html_file, pdf_file, render_inputs in guides]
+    pdf_renders = [(adoc_file, pdf_file, render_inputs) for adoc_file, html_file, pdf_file, render_inputs in guides]
+
+    # a running worker already has the converters loaded, so there is no ruby startup per render
+    if render_socket:
+        print('Sending the AsciiDoc files to the render worker...')
+        unfinished = dict(render_with_worker(render_socket, [("html5", html_renders)] + ([] if gary else [("pdf", pdf_renders)])))
+        if not unfinished:
+            return
+        html_renders = unfinished.get("html5", [])
+        pdf_renders = unfinished.get("pdf", [])
+
+    jobs = []
+
+    asciidoctor_path = is_asciidoctor_installed()
+    if asciidoctor_path != "":
+        print('Generating HTML file from AsciiDoc...')
+        jobs.append((asciidoctor_path, html_renders))
+    elif os.path.exists('../bin/asciidoctor'):
+        print('Generating HTML file from AsciiDoc...')
+        jobs.append(("'../bin/asciidoctor'", html_renders))
+    elif not os.path.exists('../bin/asciidoctor'):
+        print('Installing gem requirements - asciidoctor, asciidoctor-pdf, and rouge...')
+        cmd = ['/usr/bin/bundle', 'install', '--gemfile', '../Gemfile', '--binstubs', '--path', 'mscp_gems']
+        subprocess.run(cmd)
+        print('Generating HTML file from AsciiDoc...')
+        jobs.append(("'../bin/asciidoctor'", html_renders))
+    else:
+        print("If you would like to generate the PDF file from the AsciiDoc file, install the ruby gem for asciidoctor")
+
+    # Don't create PDF if we are generating SCAP
+    if not gary:
+        asciidoctorPDF_path = is_asciidoctor_pdf_installed()
+        if asciidoctorPDF_path != "":
+            print('Generating PDF file from AsciiDoc...')
+            jobs.append((asciidoctorPDF_path, pdf_renders))
+        elif os.path.exists('../bin/asciidoctor-pdf'):
+            print('Generating PDF file from AsciiDoc...')
+            jobs.append(("'../bin/asciidoctor-pdf'", pdf_renders))
+        else:
+            print("If you would like to generate the PDF file from the AsciiDoc file, install the ruby gem for asciidoctor-pdf")
+
+    render_adoc(jobs, workers)
+
+
 def verify_signing_hash(hash):
     """Attempts to validate the existence of the certificate provided by the hash
     """
@@ -1604,26 +1687,14 @@ def parse_cis_references(reference):
 
 # Might have to do something similar to above for cmmc
 
-def main():
-
-    args = create_args()
-    if args.debug:
-        logging.basicConfig(level=logging.DEBUG)
-    else:
-        logging.basicConfig(level=logging.WARNING)
-
+def generate_guide(args, baseline_file, baseline_yaml, parent_dir):
+    """Writes the AsciiDoc guide and the requested profiles, script and spreadsheet for a baseline,
+    returns the files needed to render the guide
+    """
     try:
-        output_basename = os.path.basename(args.baseline.name)
+        output_basename = os.path.basename(baseline_file)
         output_filename = os.path.splitext(output_basename)[0]
         baseline_name = os.path.splitext(output_basename)[0]#.capitalize()
-        file_dir = os.path.dirname(os.path.abspath(__file__))
-        parent_dir = os.path.dirname(file_dir)
-
-        # stash current working directory
-        original_working_directory = os.getcwd()
-
-        # switch to the scripts directory
-        os.chdir(file_dir)
 
         if args.logo:
             logo = args.logo
@@ -1643,7 +1714,7 @@ def main():
             except OSError:
                 print(f"Creation of the directory {build_path} failed")
         adoc_output_file = open(f"{build_path}/{output_filename}.adoc", 'w')
-        print('Profile YAML:', args.baseline.name)
+        print('Profile YAML:', baseline_file)
         print('Output path:', adoc_output_file.name)
 
         if args.hash:
@@ -1664,10 +1735,8 @@ def main():
         parser.error(str(msg))
 
 
-    baseline_yaml = yaml.load(args.baseline, Loader=yaml.SafeLoader)
     version_file = os.path.join(parent_dir, "VERSION.yaml")
-    with open(version_file) as r:
-        version_yaml = yaml.load(r, Loader=yaml.SafeLoader)
+    version_yaml = load_yaml_file(version_file)
 
     adoc_templates = [ "adoc_rule_ios",
                     "adoc_rule",
@@ -1825,19 +1894,24 @@ def main():
 
 
 
+    try:
+        parent_values = baseline_yaml['parent_values']
+    except KeyError:
+        parent_values = "recommended"
+
+    # the rules are resolved once, the guide and every other writer read the same list
+    baseline_rules = resolve_baseline(baseline_yaml)
+
+    # each rule fragment depends on its rule files, the rule templates and the version file
+    rule_template_inputs = [adoc_templates_dict[template] for template in ['adoc_rule_ios', 'adoc_rule', 'adoc_supplemental', 'adoc_rule_no_setting', 'adoc_rule_custom_refs']]
+    rule_template_inputs += [version_file] + _code_inputs
+    build_cache = get_build_cache()
+
     # Create sections and rules
-    for sections in baseline_yaml['profile']:
-        section_yaml_file = sections['section'].lower() + '.yaml'
-        #check for custom section
-        if section_yaml_file in glob.glob1('../custom/sections/', '*.yaml'):
-            #print(f"Custom settings found for section: {sections['section']}")
-            override_section = os.path.join(
-                f'../custom/sections/{section_yaml_file}')
-            with open(override_section) as r:
-                section_yaml = yaml.load(r, Loader=yaml.SafeLoader)
-        else:
-            with open(f'../sections/{section_yaml_file}') as s:
-                section_yaml = yaml.load(s, Loader=yaml.SafeLoader)
+    for section, rules in baseline_rules:
+        section_yaml_file = section.lower() + '.yaml'
+        # custom sections take precedence
+        section_yaml = load_yaml_file(get_catalog().section_path(section_yaml_file))
 
         # Read section info and output it
 
@@ -1850,28 +1924,29 @@ def main():
 
         # Read all rules in the section and output them
 
-        for rule in sections['rules']:
+        for baseline_rule in rules:
+            rule = baseline_rule.rule_id
             logging.debug(f'processing rule id: {rule}')
-            rule_path = glob.glob('../rules/*/{}.yaml'.format(rule))
+            rule_path, override_path = baseline_rule.rule_path, baseline_rule.override_path
             if not rule_path:
                 print(f"Rule file not found in library, checking in custom folder for rule: {rule}")
-                rule_path = glob.glob('../custom/rules/**/{}.yaml'.format(rule), recursive=True)
-            try:
-                rule_file = (os.path.basename(rule_path[0]))
-            except IndexError:
-                logging.debug(f'defined rule {rule} does not have valid yaml file, check that rule ID and filename match.')
+                if not override_path:
+                    logging.debug(f'defined rule {rule} does not have valid yaml file, check that rule ID and filename match.')
 
             #check for custom rule
-            if glob.glob('../custom/rules/**/{}'.format(rule_file), recursive=True):
-                print(f"Custom settings found for rule: {rule_file}")
-                #override_rule = glob.glob('../custom/rules/**/{}'.format(rule_file), recursive=True)[0]
-                rule_location = glob.glob('../custom/rules/**/{}'.format(rule_file), recursive=True)[0]
-                custom=True
-            else:
-                rule_location = rule_path[0]
-                custom=False
+            if baseline_rule.custom:
+                print(f"Custom settings found for rule: {rule}.yaml")
+
+            # the merged rule is part of the key, so a fragment follows the rule it was rendered from whether
+            # that was read from the rule files or from a rule pack
+            rule_params = baseline_rule.yaml()
+            rule_adoc = build_cache.get('adoc', (rule, parent_values), rule_template_inputs, rule_params)
+            if rule_adoc is not None:
+                adoc_output_file.write(rule_adoc)
+                continue
 
-            rule_yaml = get_rule_yaml(rule_location, baseline_yaml, custom)
+            # a copy of its own, the references are sorted in place below
+            rule_yaml = baseline_rule.yaml()
 
             # Determine if the references exist and set accordingly
             try:
@@ -2068,6 +2143,7 @@ def main():
                         rule_result=result_value
                     )
 
+            build_cache.put('adoc', (rule, parent_values), rule_template_inputs, rule_adoc, rule_params)
             adoc_output_file.write(rule_adoc)
 
     # Create footer
@@ -2080,54 +2156,73 @@ def main():
 
     if args.profiles:
         print("Generating configuration profiles...")
-        generate_profiles(baseline_name, build_path, parent_dir, baseline_yaml, signing, args.hash)
+        generate_profiles(baseline_name, build_path, parent_dir, baseline_rules, signing, args.hash)
 
     if args.script:
         print("Generating compliance script...")
-        generate_script(baseline_name, build_path, baseline_yaml, log_reference)
-        default_audit_plist(baseline_name, build_path, baseline_yaml)
+        generate_script(baseline_name, build_path, baseline_rules, log_reference)
+        default_audit_plist(baseline_name, build_path, baseline_rules)
 
     if args.xls:
         print('Generating excel document...')
-        generate_xls(baseline_name, build_path, baseline_yaml)
+        generate_xls(baseline_name, build_path, baseline_rules, args.table_format)
 
-    asciidoctor_path = is_asciidoctor_installed()
-    if asciidoctor_path != "":
-        print('Generating HTML file from AsciiDoc...')
-        cmd = f"{asciidoctor_path} \'{adoc_output_file.name}\'"
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, shell=True)
-        process.communicate()
-    elif os.path.exists('../bin/asciidoctor'):
-        print('Generating HTML file from AsciiDoc...')
-        cmd = f"'../bin/asciidoctor' \'{adoc_output_file.name}\'"
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, shell=True)
-        process.communicate()
-    elif not os.path.exists('../bin/asciidoctor'):
-        print('Installing gem requirements - asciidoctor, asciidoctor-pdf, and rouge...')
-        cmd = ['/usr/bin/bundle', 'install', '--gemfile', '../Gemfile', '--binstubs', '--path', 'mscp_gems']
-        subprocess.run(cmd)
-        print('Generating HTML file from AsciiDoc...')
-        cmd = f"'../bin/asciidoctor' \'{adoc_output_file.name}\'"
-        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, shell=True)
-        process.communicate()
+    # the HTML and PDF only need to be rendered again when the AsciiDoc or its theme and images changed
+    if pdf_theme == "mscp-theme.yml":
+        pdf_theme_path = "../templates/mscp-theme.yml"
     else:
-        print("If you would like to generate the PDF file from the AsciiDoc file, install the ruby gem for asciidoctor")
+        pdf_theme_path = pdf_theme
+    render_inputs = [adoc_output_file.name, pdf_theme_path, pdf_logo_path, "../templates/asciidoctor.css"]
+    html_output_file = f"{build_path}/{output_filename}.html"
+    pdf_output_file = f"{build_path}/{output_filename}.pdf"
 
-    # Don't create PDF if we are generating SCAP
-    if not args.gary:
-        asciidoctorPDF_path = is_asciidoctor_pdf_installed()
-        if asciidoctorPDF_path != "":
-            print('Generating PDF file from AsciiDoc...')
-            cmd = f"{asciidoctorPDF_path} \'{adoc_output_file.name}\'"
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, shell=True)
-            process.communicate()
-        elif os.path.exists('../bin/asciidoctor-pdf'):
-            print('Generating PDF file from AsciiDoc...')
-            cmd = f"'../bin/asciidoctor-pdf' \'{adoc_output_file.name}\'"
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, shell=True)
-            process.communicate()
-        else:
-            print("If you would like to generate the PDF file from the AsciiDoc file, install the ruby gem for asciidoctor-pdf")
+    return adoc_output_file.name, html_output_file, pdf_output_file, render_inputs
+
+
+def main():
+
+    args = create_args()
+    if args.debug:
+        logging.basicConfig(level=logging.DEBUG)
+    else:
+        logging.basicConfig(level=logging.WARNING)
+
+    file_dir = os.path.dirname(os.path.abspath(__file__))
+    parent_dir = os.path.dirname(file_dir)
+
+    # stash current working directory
+    original_working_directory = os.getcwd()
+
+    # switch to the scripts directory
+    os.chdir(file_dir)
+
+    if args.rule_pack:
+        if not use_rule_pack(args.rule_pack):
+            sys.exit(1)
+    set_workers(args.workers)
+
+    if args.all_baselines:
+        baseline_files = sorted(glob.glob('../baselines/*.yaml'))
+        baselines = [(baseline_file, load_yaml_file(baseline_file)) for baseline_file in baseline_files]
+    elif args.baseline:
+        # the baseline paths are relative to the directory the script was started from
+        baselines = [(baseline_file, load_yaml_file(os.path.join(original_working_directory, baseline_file))) for baseline_file in args.baseline]
+    else:
+        sys.exit("Provide one or more baseline files, or use --all_baselines")
+
+    # parse every rule in the baselines up front, the baselines and writers below share the parsed rules
+    preload_rules(rule for baseline_file, baseline_yaml in baselines for sections in baseline_yaml['profile'] for rule in sections['rules'])
+
+    guides = []
+    for baseline_file, baseline_yaml in baselines:
+        guides.append(generate_guide(args, baseline_file, baseline_yaml, parent_dir))
+
+    if args.workbook:
+        print('Generating excel workbook...')
+        generate_workbook(args.workbook, [(os.path.splitext(os.path.basename(baseline_file))[0], resolve_baseline(baseline_yaml))
+                                          for baseline_file, baseline_yaml in baselines])
+
+    render_guides(guides, args.gary, get_workers(), args.render_socket)
 
     # finally revert back to the prior directory
     os.chdir(original_working_directory)
@@ -5,96 +5,12 @@ import csv
 import os
 import io
 import glob
-import yaml
 import re
 import argparse
 from pathlib import Path
+from rule_catalog import get_catalog, get_rule_yaml, load_yaml, load_yaml_file, preload_rules, set_workers, use_rule_pack
 
 
-def get_rule_yaml(rule_file, custom=False):
-
-    global resulting_yaml
-    resulting_yaml = {}
-    names = [os.path.basename(x) for x in glob.glob('../custom/rules/**/*.yaml', recursive=True)]
-    file_name = os.path.basename(rule_file)
-
-    if custom:
-        print(f"Custom settings found for rule: {rule_file}")
-        try:
-            override_path = glob.glob('../custom/rules/**/{}'.format(file_name), recursive=True)[0]
-        except IndexError:
-            override_path = glob.glob('../custom/rules/{}'.format(file_name), recursive=True)[0]
-        with open(override_path) as r:
-            rule_yaml = yaml.load(r, Loader=yaml.SafeLoader)
-    else:
-        with open(rule_file) as r:
-            rule_yaml = yaml.load(r, Loader=yaml.SafeLoader)
-
-    try:
-        og_rule_path = glob.glob('../rules/**/{}'.format(file_name), recursive=True)[0]
-    except IndexError:
-        #assume this is a completely new rule
-        og_rule_path = glob.glob('../custom/rules/**/{}'.format(file_name), recursive=True)[0]
-        resulting_yaml['customized'] = ["customized rule"]
-
-    # get original/default rule yaml for comparison
-    with open(og_rule_path) as og:
-        og_rule_yaml = yaml.load(og, Loader=yaml.SafeLoader)
-
-    for yaml_field in og_rule_yaml:
-        #print('processing field {} for rule {}'.format(yaml_field, file_name))
-        if yaml_field == "references":
-            if not 'references' in resulting_yaml:
-                resulting_yaml['references'] = {}
-            for ref in og_rule_yaml['references']:
-                try:
-                    if og_rule_yaml['references'][ref] == rule_yaml['references'][ref]:
-                        resulting_yaml['references'][ref] = og_rule_yaml['references'][ref]
-                    else:
-                        resulting_yaml['references'][ref] = rule_yaml['references'][ref]
-                except KeyError:
-                    #  reference not found in original rule yaml, trying to use reference from custom rule
-                    try:
-                        resulting_yaml['references'][ref] = rule_yaml['references'][ref]
-                    except KeyError:
-                        resulting_yaml['references'][ref] = og_rule_yaml['references'][ref]
-                try:
-                    if "custom" in rule_yaml['references']:
-                        resulting_yaml['references']['custom'] = rule_yaml['references']['custom']
-                        if 'customized' in resulting_yaml:
-                            if 'customized references' not in resulting_yaml['customized']:
-                                resulting_yaml['customized'].append("customized references")
-                        else:
-                            resulting_yaml['customized'] = ["customized references"]
-                except:
-                    pass
-        elif yaml_field == "tags":
-            # try to concatenate tags from both original yaml and custom yaml
-            try:
-                if og_rule_yaml["tags"] == rule_yaml["tags"]:
-                    #print("using default data in yaml field {}".format("tags"))
-                    resulting_yaml['tags'] = og_rule_yaml['tags']
-                else:
-                    #print("Found custom tags... concatenating them")
-                    resulting_yaml['tags'] = og_rule_yaml['tags'] + rule_yaml['tags']
-            except KeyError:
-                resulting_yaml['tags'] = og_rule_yaml['tags']
-        else:
-            try:
-                if og_rule_yaml[yaml_field] == rule_yaml[yaml_field]:
-                    #print("using default data in yaml field {}".format(yaml_field))
-                    resulting_yaml[yaml_field] = og_rule_yaml[yaml_field]
-                else:
-                    #print('using CUSTOM value for yaml field {} in rule {}'.format(yaml_field, file_name))
-                    resulting_yaml[yaml_field] = rule_yaml[yaml_field]
-                    if 'customized' in resulting_yaml:
-                        resulting_yaml['customized'].append("customized {}".format(yaml_field))
-                    else:
-                        resulting_yaml['customized'] = ["customized {}".format(yaml_field)]
-            except KeyError:
-                resulting_yaml[yaml_field] = og_rule_yaml[yaml_field]
-
-    return resulting_yaml
 
 def sort_nicely( l ):
 # """ Sort the given list in the way that humans expect.
@@ -123,6 +39,8 @@ def main():
     parser = argparse.ArgumentParser(description='Easily generate custom rules from compliance framework mappings')
     parser.add_argument("CSV", default=None, help="CSV to create custom rule files from a mapping.", type=argparse.FileType('rt'))
     parser.add_argument("-f", "--framework", default="800-53r5", help="Specify framework for the source. If no framework is specified, the default is 800-53r5.", action="store")
+    parser.add_argument("-w", "--workers", default=1, type=int, help="Number of worker processes used to parse the rule files, 0 uses every available core.", action="store")
+    parser.add_argument("-P", "--rule_pack", default=None, type=os.path.abspath, help="Load the rules, sections, baselines and includes from a rule pack built by generate_rule_pack.py.", action="store")
 
     try:
         results = parser.parse_args()
@@ -135,11 +53,16 @@ def main():
         parser.error(str(msg))
 
 
+    if results.rule_pack:
+        if not use_rule_pack(results.rule_pack):
+            sys.exit(1)
+
     version_file = "../VERSION.yaml"
-    with open(version_file) as r:
-        version_yaml = yaml.load(r, Loader=yaml.SafeLoader)
+    version_yaml = load_yaml_file(version_file)
 
-    for rule in glob.glob('../rules/**/*.yaml',recursive=True) + glob.glob('../custom/rules/**/*.yaml',recursive=True):
+    set_workers(results.workers)
+    preload_rules()
+    for rule in get_catalog().all_rule_files():
 
         sub_directory = rule.split(".yaml")[0].split("/")[2]
 
@@ -147,7 +70,7 @@ def main():
             continue
 
         # with open(rule) as r:
-        #     rule_yaml = yaml.load(r, Loader=yaml.SafeLoader)
+        #     rule_yaml = load_yaml(r)
         rule_yaml = get_rule_yaml(rule, custom=False)
 
         control_array = []
@@ -282,7 +205,7 @@ tags:
             continue
 
         with open(rule) as r:
-            custom_rule_yaml = yaml.load(r, Loader=yaml.SafeLoader)
+            custom_rule_yaml = load_yaml(r)
         othercontrols = []
 
         if other_header in custom_rule_yaml['references']['custom']:
@@ -331,7 +254,7 @@ tags:
             continue
 
         with open(rule) as r:
-            custom_rule = yaml.load(r, Loader=yaml.SafeLoader)
+            custom_rule = load_yaml(r)
             rule_id = rule.split(".yaml")[0].split("/")[5]
 
 
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# filename: generate_rule_pack.py
+# description: Compile the rules, sections, baselines and includes into a single rule pack for the generate_* scripts
+
+import os
+import argparse
+from rule_catalog import RuleCatalog, RulePack
+
+
+def create_args():
+    """configure the arguments used in the script, returns the parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description='Compile the rules, custom rules, sections, baselines and includes into a rule pack, load it in the other scripts with --rule_pack.')
+    parser.add_argument("-o", "--output", default=None,
+                        help="Path of the rule pack to write, defaults to build/rule_pack.pickle.", action="store")
+    return parser.parse_args()
+
+
+def main():
+    args = create_args()
+
+    file_dir = os.path.dirname(os.path.abspath(__file__))
+    parent_dir = os.path.dirname(file_dir)
+
+    original_working_directory = os.getcwd()
+    if args.output:
+        output_file = os.path.abspath(args.output)
+    else:
+        output_file = os.path.join(parent_dir, 'build', 'rule_pack.pickle')
+
+    os.chdir(file_dir)
+
+    pack = RulePack.build(RuleCatalog())
+    pack.save(output_file)
+
+    print(f"Rule pack with {len(pack.index['rules'])} rules, {len(pack.index['custom_rules'])} custom rules and {len(pack.documents)} files written to {output_file}")
+
+    os.chdir(original_working_directory)
+
+if __name__ == "__main__":
+    main()
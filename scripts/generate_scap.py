@@ -2,19 +2,30 @@
 # filename: generate_scap.py
 # description: Input a keyword for the baseline, output the scap/oval/xccdf
 
+import io
 import sys
+import copy
 import os
 import os.path
-import yaml
-import glob
 import re
 import warnings
 from pathlib import Path
 from datetime import datetime
-import shutil
 from time import sleep
 import argparse
 from xml.sax.saxutils import escape
+from xml.parsers.expat import ExpatError
+from contextlib import redirect_stdout
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+import rule_catalog
+from build_cache import get_build_cache
+from rule_catalog import TagIndex, get_catalog, get_rule_yaml, get_workers, load_yaml_file, preload_rules, set_workers, use_rule_pack
+from rule_model import MacSecurityRule
+from xml_writer import COMPRESSION_SUFFIXES, open_output, write_formatted
+
+# the generator itself is an input of every cached rule fragment
+_code_inputs = [os.path.abspath(__file__), os.path.abspath(rule_catalog.__file__)]
 
 warnings.filterwarnings("ignore", category=DeprecationWarning) 
 
@@ -82,442 +93,207 @@ def format_mobileconfig_fix(mobileconfig):
 
     return rulefix
 
-def replace_ocil(xccdf, x):
+def replace_ocil(scap_rules, rule_checks, x, ocil_checks=None):
+    """Points the rules that reference OVAL definition x at the OCIL questionnaire instead, recording the replacement in ocil_checks
+    """
     regex = r'''([\r\n].*?)(?:=?\r|\n)(.*?(?:def:{}\").*)'''.format(x)
     substr = '''<check system="http://scap.nist.gov/schema/ocil/2"><check-content-ref href="ocil.xml"/>'''
-    result = re.sub(regex, substr, xccdf, 0, re.MULTILINE)
-    return result
-
-
-def create_args():
-    
-    parser = argparse.ArgumentParser(
-        description="Easily generate xccdf, oval, or scap datastream. If no option is defined, it will generate an scap datastream file.")
-    parser.add_argument("-x", "--xccdf", default=None,
-                        help="Generate an xccdf file.", action="store_true")
-    parser.add_argument("-o", "--oval", default=None,
-                        help="Generate an oval file of the checks.", action="store_true")
-    parser.add_argument("-l", "--list_tags", default=None,
-                        help="List the available keyword tags to search for.", action="store_true")
-    parser.add_argument("-b", "--baseline", default="None",
-                        help="Choose a baseline to generate an xml file for, if none is specified it will generate for every rule found.", action="store")
-
-    return parser.parse_args()
-
-def generate_scap(all_rules, all_baselines, args):
-    
-    export_as = ""
+    for index in rule_checks.get(x, []):
+        scap_rules[index] = re.sub(regex, substr, scap_rules[index], 0, re.MULTILINE)
+    if ocil_checks is not None:
+        ocil_checks.append((x, len(scap_rules)))
+
+
+# substrings the check translators look for, every field of a rule is scanned for all of them at once
+CHECK_MARKERS = ("time_machine", "encrypted", "bluetooth", "unpaired", "[source,bash]", "hint", "dscl", "eficheck",
+                 "newsyslog.conf", "asl.conf", "aslmanager", "/usr/bin/pwpolicy getaccountpolicies", "find",
+                 "/usr/sbin/firmwarepasswd", "os_home_folders_secure", "sntp", "SPStorageDataType", "fdesetup",
+                 "profiles", "csrutil", "pfctl", "dump-keychain", "mdmclient", "nvram", "pmset", "standby", "sudo -V",
+                 "ssh_config", "sshd -T", "sshd -G", "fips", "socketfilterfw", "systemsetup", "defaults", "grep",
+                 "pgrep", "CURRENT_USER", "security", "/bin/rm", "/bin/ls", "ls", "stat", "awk", "launchctl")
+# the lookahead reports the longest marker starting at every position, the shorter markers it contains are implied
+CHECK_MARKER_SCAN = re.compile("(?=(" + "|".join(re.escape(marker) for marker in sorted(CHECK_MARKERS, key=len, reverse=True)) + "))")
+CHECK_MARKER_IMPLIES = {marker: frozenset(other for other in CHECK_MARKERS if other in marker) for marker in CHECK_MARKERS}
+
+_check_types = {}
+
+
+def find_markers(text):
+    """Returns the CHECK_MARKERS found in text, or None when there is no text"""
+    if text is None:
+        return None
+    found = set()
+    for match in CHECK_MARKER_SCAN.finditer(text):
+        found |= CHECK_MARKER_IMPLIES[match.group(1)]
+    return found
+
+
+def classify_check(rule_yaml):
+    """Returns the names of the check translators that match a rule, the result is cached per rule text
+    """
+    key = (rule_yaml['id'], rule_yaml['check'], rule_yaml['fix'], rule_yaml['discussion'], tuple(rule_yaml['tags']),
+           bool(rule_yaml['mobileconfig']))
+    if key in _check_types:
+        return _check_types[key]
+
+    command = rule_yaml['check'].split("/")
+    command_3 = command[3] if len(command) > 3 else None
+    command_3_words = command_3.split() if command_3 is not None else []
+    fields = {
+        'id': find_markers(rule_yaml['id']),
+        'check': find_markers(rule_yaml['check']),
+        'check_command': find_markers(rule_yaml['check'].split(" ")[0]),
+        'fix': find_markers(rule_yaml['fix']),
+        'discussion': find_markers(rule_yaml['discussion']),
+        'command_2': find_markers(command[2] if len(command) > 2 else None),
+        'command_3': find_markers(command_3),
+        'command_3_command': find_markers(command_3_words[0] if command_3_words else None)
+    }
+    check_types = set()
+    for name, matches, translate in CHECK_TRANSLATORS:
+        try:
+            if matches(fields, rule_yaml):
+                check_types.add(name)
+        except (TypeError, IndexError):
+            # a translator whose test fails on a missing field doesn't match
+            pass
+    _check_types[key] = frozenset(check_types)
+    return _check_types[key]
 
-    version_file = "../VERSION.yaml"
-    with open(version_file) as r:
-        version_yaml = yaml.load(r, Loader=yaml.SafeLoader)
-        
-    if args.xccdf:
-        export_as = "xccdf"
-    
-    if args.oval:
-        export_as = "oval"
-        if "ios" in version_yaml['cpe']:
-            print("OVAL generation is not available on iOS")
-            exit()
 
+OVAL_ITEM = re.compile(r'<(\w+_(?:object|state))\b([^>]*?)(/>|>.*?</\1>)', re.S)
+OVAL_ATTRIBUTE = re.compile(r'([\w:]+)\s*=\s*"([^"]*)"')
+OVAL_REFERENCE = re.compile(r'oval:mscp:(?:obj|ste):\d+\b')
 
-    if args.oval == None and args.xccdf == None:
-        export_as = "scap"
-        if "ios" in version_yaml['cpe']:
-            print("iOS will only export as XCCDF")
-            export_as = "xccdf"
 
-    now = datetime.now()
-    date_time_string = now.strftime("%Y-%m-%dT%H:%M:%S")
+def dedupe_oval_items(section):
+    """Drops objects or states that are identical to an earlier one apart from their id and comment, returns the section and a map of dropped ids to the kept ids
+    """
+    items = []
+    id_counts = {}
+    for match in OVAL_ITEM.finditer(section):
+        attributes = OVAL_ATTRIBUTE.findall(match.group(2))
+        item_id = dict(attributes).get("id")
+        key = (match.group(1),
+               tuple(sorted(attribute for attribute in attributes if attribute[0] not in ("id", "comment"))),
+               re.sub(r'>\s+<', '><', match.group(3).strip()))
+        items.append((match, item_id, key))
+        id_counts[item_id] = id_counts.get(item_id, 0) + 1
+
+    kept = {}
+    replaced = {}
+    parts = []
+    position = 0
+    for match, item_id, key in items:
+        # an id that is used more than once can't be pointed at another item
+        if item_id is None or id_counts[item_id] > 1:
+            continue
+        if key not in kept:
+            kept[key] = item_id
+            continue
+        replaced[item_id] = kept[key]
+        parts.append(section[position:match.start()])
+        position = match.end()
+    parts.append(section[position:])
+    return "".join(parts), replaced
 
-    filenameversion = version_yaml['version'].split(",")[1].replace(" ", "_")[1:]
-    output = "../build/macOS_{0}_Security_Compliance_Benchmark-{1}".format(version_yaml['os'],filenameversion)
-    if "ios" in version_yaml['cpe']:
-        output = "../build/iOS_{0}_Security_Compliance_Benchmark-{1}".format(version_yaml['os'],filenameversion)
-        
-    if export_as == "xccdf":
-        output = output + "_xccdf.xml"
-    
-    if export_as == "oval":
-        output = output + "_oval.xml"
-
-    if export_as == "scap":
-        output = output + ".xml"
-
-    oval_definition = str()
-    oval_test = str()
-    oval_object = str()
-    oval_state = str()
-    oval_variable = str()
-    xccdf_profiles = str()
-    total_scap = str()
-    scap_groups = str()
-    xccdf_rules = str()
-    x = 1
-    d = 1
 
-    ovalPrefix = '''<?xml version="1.0" encoding="UTF-8"?>
-    <oval_definitions xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:schemaLocation="   http://oval.mitre.org/XMLSchema/oval-definitions-5             https://raw.githubusercontent.com/OVALProject/Language/5.11.2/schemas/oval-definitions-schema.xsd  http://oval.mitre.org/XMLSchema/oval-definitions-5#independent https://raw.githubusercontent.com/OVALProject/Language/5.11.2/schemas/independent-definitions-schema.xsd    http://oval.mitre.org/XMLSchema/oval-definitions-5#macos       https://raw.githubusercontent.com/OVALProject/Language/5.11.2/schemas/macos-definitions-schema.xsd  http://oval.mitre.org/XMLSchema/oval-definitions-5#unix        https://raw.githubusercontent.com/OVALProject/Language/5.11.2/schemas/unix-definitions-schema.xsd">
-      <generator>
-        <oval:schema_version xmlns:oval="http://oval.mitre.org/XMLSchema/oval-common-5">5.11.2</oval:schema_version>
-        <oval:timestamp xmlns:oval="http://oval.mitre.org/XMLSchema/oval-common-5">{0}</oval:timestamp>
-        <terms_of_use>Copyright (c) 2020, NIST.</terms_of_use>
-        <oval:product_name xmlns:oval="http://oval.mitre.org/XMLSchema/oval-common-5">macOS Security Compliance Project</oval:product_name>
-      </generator>'''.format(date_time_string)
+def replace_oval_references(section, replaced):
+    if not replaced:
+        return section
+    return OVAL_REFERENCE.sub(lambda match: replaced.get(match.group(0), match.group(0)), section)
 
-    ostype = "macOS"
-    if "ios" in version_yaml['cpe']:
-        ostype = "iOS/iPadOS"
-    xccdfPrefix = '''<?xml version="1.0" encoding="UTF-8"?>
-    <Benchmark xmlns="http://checklists.nist.gov/xccdf/1.2" id="xccdf_gov.nist.mscp.content_benchmark_macOS_{1}" style="SCAP_1.3" resolved="true" xml:lang="en">
-      <status date="{3}">draft</status>
-      <title>{4} {1}: Security Configuration</title>
-      <description>
-        {4} {1}: Security Configuration
-      </description>
-      
-      
-      <reference href="https://csrc.nist.gov/projects/security-content-automation-protocol/scap-releases/scap-1-3">
-        <title xmlns="http://purl.org/dc/elements/1.1/">Security Content Automation Protocol</title>
-        <publisher xmlns="http://purl.org/dc/elements/1.1/">National Institute of Standards and Technology</publisher>
-      </reference>
-      <version time="{0}" update="https://github.com/usnistgov/macos_security">{2}</version>
-      <metadata>
-        <creator xmlns="http://purl.org/dc/elements/1.1/">National Institute of Standards and Technology</creator>
-        <publisher xmlns="http://purl.org/dc/elements/1.1/">National Institute of Standards and Technology</publisher>
-        <source xmlns="http://purl.org/dc/elements/1.1/">https://github.com/usnistgov/macos_security/releases/latest</source>
-        <contributor xmlns="http://purl.org/dc/elements/1.1/">Bob Gendler - National Institute of Standards and Technology</contributor>
-        <contributor xmlns="http://purl.org/dc/elements/1.1/">Dan Brodjieski - National Aeronautics and Space Administration</contributor>
-        <contributor xmlns="http://purl.org/dc/elements/1.1/">Allen Golbig - Jamf</contributor>
-      </metadata>
-    '''.format(date_time_string, version_yaml['os'], version_yaml['version'],date_time_string.split("T")[0] + "Z", ostype)
 
-    scapPrefix = '''<?xml version="1.0" encoding="UTF-8"?>
-<data-stream-collection xmlns="http://scap.nist.gov/schema/scap/source/1.2" id="scap_gov.nist.mscp.content_collection_macOS_{1}" schematron-version="1.3">
-  <data-stream timestamp="{0}" id="scap_gov.nist.mscp.content_datastream_macOS_{1}" scap-version="1.3" use-case="CONFIGURATION">
-    <dictionaries>
-      <component-ref xmlns:ns0="http://www.w3.org/1999/xlink" id="scap_gov.nist.mscp.content_cref_macOS_{1}_macOS-cpe-dictionary.xml" ns0:type="simple" ns0:href="#scap_gov.nist.mscp.content_comp_macOS_{1}_macOS-cpe-dictionary.xml">
-        <catalog xmlns="urn:oasis:names:tc:entity:xmlns:xml:catalog">
-          <uri name="macOS-cpe-oval.xml" uri="#scap_gov.nist.mscp.content_cref_macOS_{1}_macOS-cpe-oval.xml"/>
-        </catalog>
-      </component-ref>
-    </dictionaries>
-    <checklists>
-      <component-ref xmlns:ns0="http://www.w3.org/1999/xlink" id="scap_gov.nist.mscp.content_cref_macOS_{1}_xccdf.xml" ns0:type="simple" ns0:href="#scap_gov.nist.mscp.content_comp_macOS_{1}_xccdf.xml">
-        <catalog xmlns="urn:oasis:names:tc:entity:xmlns:xml:catalog">
-            <uri name="oval.xml" uri="#scap_gov.nist.mscp.content_cref_macOS_{1}_check_1"/>
-            <uri name="ocil.xml" uri="#scap_gov.nist.mscp.content_cref_macOS_{1}_check_2"/>
-        </catalog>
-      </component-ref>
-    </checklists>
-    <checks>
-      <component-ref xmlns:ns0="http://www.w3.org/1999/xlink" id="scap_gov.nist.mscp.content_cref_macOS_{1}_macOS-cpe-oval.xml" ns0:type="simple" ns0:href="#scap_gov.nist.mscp.content_comp_macOS_{1}_macOS-cpe-oval.xml"/>
-      <component-ref xmlns:ns0="http://www.w3.org/1999/xlink" id="scap_gov.nist.mscp.content_cref_macOS_{1}_check_1" ns0:type="simple" ns0:href="#scap_gov.nist.mscp.content_comp_macOS_{1}_check_1"/>
-      <component-ref xmlns:ns0="http://www.w3.org/1999/xlink" id="scap_gov.nist.mscp.content_cref_macOS_{1}_check_2" ns0:type="simple" ns0:href="#scap_gov.nist.mscp.content_comp_macOS_{1}_check_2"/>
-    </checks>
-  </data-stream>
-  <component id="scap_gov.nist.mscp.content_comp_macOS_{1}_xccdf.xml" timestamp="{0}">
-    <Benchmark xmlns="http://checklists.nist.gov/xccdf/1.2" id="xccdf_gov.nist.mscp.content_benchmark_macOS_{1}" style="SCAP_1.3" resolved="true" xml:lang="en">
-      <status date="{4}">draft</status>
-      <title>macOS {1}: Security Configuration</title>
-      <description>
-        macOS {1}: Security Configuration
-      </description>
-      
-      
-      <reference href="https://csrc.nist.gov/projects/security-content-automation-protocol/scap-releases/scap-1-3">
-        <title xmlns="http://purl.org/dc/elements/1.1/">Security Content Automation Protocol</title>
-        <publisher xmlns="http://purl.org/dc/elements/1.1/">National Institute of Standards and Technology</publisher>
-      </reference>
-      <reference href="macOS-cpe-dictionary.xml">platform-cpe-dictionary</reference>
-      <reference href="macOS-cpe-oval.xml">platform-cpe-oval</reference>
-      <platform idref="cpe:2.3:{2}:*:*:*:*:*:*:*"/>
-      <version time="{0}" update="https://github.com/usnistgov/macos_security">{3}</version>
-      <metadata>
-        <creator xmlns="http://purl.org/dc/elements/1.1/">National Institute of Standards and Technology</creator>
-        <publisher xmlns="http://purl.org/dc/elements/1.1/">National Institute of Standards and Technology</publisher>
-        <source xmlns="http://purl.org/dc/elements/1.1/">https://github.com/usnistgov/macos_security/releases/latest</source>
-        <contributor xmlns="http://purl.org/dc/elements/1.1/">Bob Gendler - National Institute of Standards and Technology</contributor>
-        <contributor xmlns="http://purl.org/dc/elements/1.1/">Dan Brodjieski - National Aeronautics and Space Administration</contributor>
-        <contributor xmlns="http://purl.org/dc/elements/1.1/">Allen Golbig - Jamf</contributor>
-      </metadata>
-    '''.format(date_time_string, version_yaml['os'], version_yaml['cpe'], version_yaml['version'],date_time_string.split("T")[0] + "Z")
+def dedupe_oval(oval_test, oval_object, oval_state, oval_variable):
+    """Emits identical OVAL states and objects once, returns the test, object, state and variable sections with the references pointing at the kept copies
+    """
+    tests = "".join(oval_test)
+    objects = "".join(oval_object)
+    variables = "".join(oval_variable)
+    # states first, objects that filter on merged states can then be merged too
+    states, replaced = dedupe_oval_items("".join(oval_state))
+    tests = replace_oval_references(tests, replaced)
+    objects = replace_oval_references(objects, replaced)
+    objects, replaced = dedupe_oval_items(objects)
+    tests = replace_oval_references(tests, replaced)
+    variables = replace_oval_references(variables, replaced)
+    return [tests], [objects], [states] if states else [], [variables] if variables else []
+
+
+def write_document(document, output_file, compression=None):
+    """Writes the fragments of an xml document to output_file, formatted the same way as xmllint and optionally compressed
+    """
+    try:
+        write_formatted(document, output_file, compression)
+    except ExpatError as e:
+        print(f"Unable to format {output_file}, the generated XML is not well formed: {e}")
+        with open_output(output_file, compression) as rite:
+            rite.writelines(document)
 
-    generated_baselines = {}
-    
-    for rule in all_rules:
-        
-        if glob.glob('../custom/rules/**/{}.yaml'.format(rule),recursive=True):
-            rule_file = glob.glob('../custom/rules/**/{}.yaml'.format(rule),recursive=True)[0]
-            custom=True
-    
-        elif glob.glob('../rules/*/{}.yaml'.format(rule)):
-            rule_file = glob.glob('../rules/*/{}.yaml'.format(rule))[0]
-            custom=False
-        odv_label = str()
-        og_rule_yaml = get_rule_yaml(rule_file, custom)
-        
 
-        loop = 1
-        if "odv" in og_rule_yaml:
-            loop = len(og_rule_yaml['odv'])
-            
-            if args.baseline != "None":
-                loop = 1
-        for a in range(0, loop):
-            
-            rule_yaml = get_rule_yaml(rule_file, custom)
-            
-            try:           
-                
-                # # odv_label = list(rule_yaml['odv'].keys())[a]
-                # # odv_label.remove('hint')
-                if args.baseline != "None":
-                    odv_label = args.baseline
-                    if args.baseline not in list(rule_yaml['odv'].keys())[a]:
-                        odv_label = "recommended"
-                # if args.baseline not in list(rule_yaml['odv'].keys())[a]:
-                #     odv_label = "recommended"
-                else:
-                    odv_label = list(rule_yaml['odv'].keys())[a]
+def write_documents(documents, workers=1, compression=None):
+    """Writes each (fragments, output file) pair, spread across worker processes when more than one is written
+    """
+    if workers == 1 or len(documents) == 1:
+        for document, output_file in documents:
+            write_document(document, output_file, compression)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(documents))) as executor:
+        list(executor.map(write_document, *zip(*documents), repeat(compression)))
 
-                    
-                    
 
-                # if odv_label == "hint":
-                #     continue
-                
-                
+def xccdf_profile(baseline, rule_ids):
+    """Returns the xccdf Profile of a baseline, selecting each of rule_ids
+    """
+    selects = "".join('''
+                <select idref="xccdf_gov.nist.mscp.content_rule_{0}" selected="true"/>'''.format(rule_id) for rule_id in rule_ids)
+    return '''
+        <Profile id="xccdf_gov.nist.mscp.content_profile_{1}">
+                <title>{0}</title>
+                <description>This profile selects all rules tagged as {0}.</description>{2}
+        </Profile>'''.format(baseline, baseline.replace(" ","_"), selects)
 
-                odv_value = str(rule_yaml['odv'][odv_label])
-                rule_yaml['title'] = rule_yaml['title'].replace("$ODV",str(odv_value))
-                rule_yaml['discussion'] = rule_yaml['discussion'].replace("$ODV",odv_value)
-                rule_yaml['check'] = rule_yaml['check'].replace("$ODV",odv_value)
-                
-                rule_yaml['fix'] = rule_yaml['fix'].replace("$ODV",odv_value)
-            
-                if "result" in rule_yaml:
-                    for result_value in rule_yaml['result']:
-                        if "$ODV" == rule_yaml['result'][result_value]:
-                            rule_yaml['result'][result_value] = rule_yaml['result'][result_value].replace("$ODV",odv_value)
-                
-                if rule_yaml['mobileconfig_info']:
-                    for mobileconfig_type in rule_yaml['mobileconfig_info']:
-                        if isinstance(rule_yaml['mobileconfig_info'][mobileconfig_type], dict):
-                            for mobileconfig_value in rule_yaml['mobileconfig_info'][mobileconfig_type]:
-                                
-                                if "$ODV" in str(resulting_yaml['mobileconfig_info'][mobileconfig_type][mobileconfig_value]):
-                                    if type(resulting_yaml['mobileconfig_info'][mobileconfig_type][mobileconfig_value]) == dict:
-                                        for k,v in resulting_yaml['mobileconfig_info'][mobileconfig_type][mobileconfig_value].items():
-                                            if v == "$ODV":
-                                                resulting_yaml['mobileconfig_info'][mobileconfig_type][mobileconfig_value][k] = odv_value
-                                    else:
-                                        resulting_yaml['mobileconfig_info'][mobileconfig_type][mobileconfig_value] = odv_value
-                                    
-                
-            except:
-                odv_label = "recommended"
-                
-            for baseline in all_baselines:
-                    found_rules = []
-                    for tag in rule_yaml['tags']:
-                        if tag == baseline:
-                            if odv_label != "recommended" and odv_label == tag or odv_label == "custom":
-                            
-                                if baseline in generated_baselines:
-                                    generated_baselines[baseline].append(rule_yaml['id'] + "_" + odv_label)
-                                else:
-                                    generated_baselines[baseline] = [rule_yaml['id'] + "_" + odv_label]
-                                continue
-                            elif odv_label == "recommended" or odv_label == "custom":
-                                
-                                if "odv" in rule_yaml:
-                                    if baseline not in rule_yaml['odv']:
-                                        if baseline in generated_baselines:
-                                            
-                                            generated_baselines[baseline].append(rule_yaml['id'] + "_" + odv_label)
-                                        else:
-                                            generated_baselines[baseline] = [rule_yaml['id'] + "_" + odv_label]
-                                else:
-                                    if baseline in generated_baselines:
-                                            
-                                        generated_baselines[baseline].append(rule_yaml['id'] + "_" + odv_label)
-                                    else:
-                                        generated_baselines[baseline] = [rule_yaml['id'] + "_" + odv_label]
 
-            if odv_label == "hint":
-                continue
-            result = str()
-            if "result" in rule_yaml:
-                result = "\nResult: {}".format(rule_yaml['result'])
+def strip_note(oval_definition, start):
+    """Removes an AsciiDoc [NOTE] block from the descriptions of the definitions appended since start
+    """
+    definitions = re.sub('(?=\n\[NOTE\])(.*)\=\n<', '<', "".join(oval_definition[start:]), flags=re.S)
+    del oval_definition[start:]
+    oval_definition.append(definitions)
 
-            else:
-                result = ""
-            severity = str()
 
-            if "severity" in rule_yaml:
-                severity = rule_yaml['severity']
-            else:
-                severity = "unknown"
-            check_rule = str()
-            if "inherent" in rule_yaml['tags'] or "n_a" in rule_yaml['tags'] or "permenant" in rule_yaml['tags']:
-                check_rule = '''
-            <check system="http://scap.nist.gov/schema/ocil/2">
-            <check-content-ref href="ocil.xml"/></check>'''
-            else:
-                check_rule = '''<check system="http://oval.mitre.org/XMLSchema/oval-definitions-5">
-            <check-content-ref href="oval.xml" name="oval:mscp:def:{0}"/>
-            </check>'''.format(x)
-            references = str()
-            
-            if "800-53r5" in rule_yaml['references'] and rule_yaml['references']['800-53r5'][0] != "N/A":
-                references = references + "<reference href=\"https://csrc.nist.gov/publications/detail/sp/800-53/rev-5/final\">NIST SP 800-53r5: "
-                for nist80053 in rule_yaml['references']['800-53r5']:
-                    references = references + nist80053 + ", "
-                references = references[:-2] + "</reference>"
-            if "800-53r4" in rule_yaml['references'] and rule_yaml['references']['800-53r4'][0] != "N/A":
-                references = references + "<reference href=\"https://csrc.nist.gov/publications/detail/sp/800-53/rev-4/final\">NIST SP 800-53r4: "
-                for nist80053 in rule_yaml['references']['800-53r4']:
-                    references = references + nist80053 + ", "
-                references = references[:-2] + "</reference>"
-            if "800-171r2" in rule_yaml['references'] and rule_yaml['references']['800-171r2'][0] != "N/A":
-                references = references + "<reference href=\"https://csrc.nist.gov/publications/detail/sp/800-171/rev-2/final\">NIST SP 800-171r2: "
-                for nist800171 in rule_yaml['references']['800-171r2']:
-                    references = references + nist800171 + ", "
-                references = references[:-2] + "</reference>"
-            if "disa_stig" in rule_yaml['references'] and rule_yaml['references']['disa_stig'][0] != "N/A":
-                references = references + "<reference href=\"https://public.cyber.mil/stigs/downloads/\">DISA STIG(s): "
-                for disa_stig in rule_yaml['references']['disa_stig']:
-                    references = references + disa_stig + ", "
-                references = references[:-2] + "</reference>"
-            if "cis" in rule_yaml['references']:
-                if "benchmark" in rule_yaml['references']['cis'] and rule_yaml['references']['cis']['benchmark'][0] != "N/A":
-                    references = references + "<reference href=\"https://www.cisecurity.org/cis-benchmarks/\">CIS Benchmark: "
-                    for benchmark in rule_yaml['references']['cis']['benchmark']:
-                        references = references + benchmark + ", "
-                    references = references[:-2] + "</reference>"
-                if "controls v8" in rule_yaml['references']['cis'] and rule_yaml['references']['cis']['controls v8'][0] != "N/A":
-                    references = references + "<reference href=\"https://www.cisecurity.org/controls\">CIS Controls V8: "
-                    for v8controls in rule_yaml['references']['cis']['controls v8']:
-                        references = references + str(v8controls) + ", "
-                    references = references[:-2] + "</reference>"
-            
-            for k,v in rule_yaml['references'].items():
-                if k == "cci" or k == "srg":
-                    continue
-                if k == "custom":
-                    
-                    
-                    for i,u in rule_yaml['references']['custom'].items():
-                        references = references + '<reference href="#">{0}: '.format(i)
-                        for refs in rule_yaml['references']['custom'][i]:
-                            references = references + '{0}, '.format(str(refs))
-                        references = references[:-2] +  "</reference>"
+# a translator returns TRANSLATED once it has written the checks of a rule, LAST_VARIANT to also skip the remaining
+# ODV variants of the rule, or None to pass the rule on to the next matching translator
+TRANSLATED = 1
+LAST_VARIANT = 2
 
 
-            cce = str()
-            if "cce" not in rule_yaml['references'] or rule_yaml['references']['cce'] == "N/A":
-                cce = "CCE-11111-1"
-            else:
-                cce = rule_yaml['references']['cce'][0]
+def manual_check(message=None):
+    """Returns a translator pointing the rule at the OCIL questionnaire, for checks with no OVAL equivalent
+    """
+    def translate(rule_yaml, odv_label, cce, fragments, first_definition):
+        if message is not None:
+            print(rule_yaml['id'] + message)
+        replace_ocil(fragments['scap_rules'], fragments['rule_checks'], fragments['x'], fragments['ocil_checks'])
+        fragments['x'] += 1
+        return TRANSLATED
+    return translate
 
-            if export_as == "scap":
-                mobileconfig_info = ""
-                if rule_yaml['mobileconfig']:
-                    mobileconfig_info = escape(format_mobileconfig_fix(rule_yaml['mobileconfig_info']))
-                xccdf_rules = xccdf_rules + '''
-            <Rule id="xccdf_gov.nist.mscp.content_rule_{0}" selected="false" role="full" severity="{1}" weight="1.0">
-            <title>{2}</title>
-            <description>{3}
-            
-            {4}
-            
-            {5}</description>{9}
-            <ident system="https://ncp.nist.gov/cce">{6}</ident>
-            <fixtext>{7}</fixtext>
-            {8}
-            </Rule>
-            '''.format(rule_yaml['id'] + "_" + odv_label, severity, rule_yaml['title'], rule_yaml['discussion'].replace("<","&lt;").replace(">","&gt;").replace("&","&amp;").rstrip(), rule_yaml['check'].replace("<","&lt;").replace(">","&gt;").replace("&","&amp;").rstrip(), result, cce,rule_yaml['fix'].replace("<","&lt;").replace(">","&gt;").replace("&","&amp;")  + "\n" + mobileconfig_info, check_rule, references)
 
-            if export_as == "xccdf":
-                mobileconfig_info = ""
-                if rule_yaml['mobileconfig']:
-                    mobileconfig_info = escape(format_mobileconfig_fix(rule_yaml['mobileconfig_info']))
+def skip_on_error(translate):
+    """Returns translate passing the rule on to the next translator when it fails, the fragments written so far are kept
+    """
+    def translate_or_skip(*args):
+        try:
+            return translate(*args)
+        except Exception:
+            return None
+    return translate_or_skip
 
-                xccdf_rules = xccdf_rules + '''
-            <Rule id="xccdf_gov.nist.mscp.content_rule_{0}" selected="false" role="full" severity="{1}" weight="1.0">
-            <title>{2}</title>
-            <description>{3}
-            
-            {4}
-            
-            {5}</description>{8}
-            <ident system="https://ncp.nist.gov/cce">{6}</ident>
-            <fixtext>{7}</fixtext>
-            
-            </Rule>
-            '''.format(rule_yaml['id'] + "_" + odv_label, severity, rule_yaml['title'], rule_yaml['discussion'].replace("<","&lt;").replace(">","&gt;").replace("&","&amp;").rstrip(), rule_yaml['check'].replace("<","&lt;").replace(">","&gt;").replace("&","&amp;").rstrip(), result, cce,rule_yaml['fix'].replace("<","&lt;").replace(">","&gt;").replace("&","&amp;") + "\n" + mobileconfig_info, references)
-                continue
-                
 
-            
-            if "inherent" in rule_yaml['tags'] or "n_a" in rule_yaml['tags'] or "permanent" in rule_yaml['tags']:
-                xccdf_rules = replace_ocil(xccdf_rules,x)
-                x += 1
-                continue
-            if "time_machine" in rule_yaml['id'] and "encrypted" in rule_yaml['id']:
-                print(rule_yaml['id'] + " - Manual Check Required")
-                xccdf_rules = replace_ocil(xccdf_rules,x)
-                x += 1
-                continue
-            if "bluetooth" in rule_yaml['id'] and "unpaired" in rule_yaml['id']:
-                print(rule_yaml['id'] + " - Manual Check Required")
-                xccdf_rules = replace_ocil(xccdf_rules,x)
-                x += 1
-                continue
-            if rule_yaml['check'][0] != "/" and "[source,bash]" not in rule_yaml['fix']:
-                print(rule_yaml['id'] + " - Manual Check")
-                xccdf_rules = replace_ocil(xccdf_rules,x)
-                x += 1
-                continue
-            if "hint" in rule_yaml['check'] and "dscl" in rule_yaml['check']:
-                print(rule_yaml['id'] + " - no relevant oval")
-                xccdf_rules = replace_ocil(xccdf_rules,x)
-                x += 1
-                continue
-            if "manual" in rule_yaml['tags']:
-                print(rule_yaml['id'] + " - Manual Check")
-                xccdf_rules = replace_ocil(xccdf_rules,x)
-                x += 1
-                continue
-            if "eficheck" in rule_yaml['check']:
-                print(rule_yaml['id'] + " - eficheck - no relevant oval")
-                xccdf_rules = replace_ocil(xccdf_rules,x)
-                x += 1
-                continue
-            if "newsyslog.conf" in rule_yaml['check'] or "asl.conf" in rule_yaml['check'] or "aslmanager" in rule_yaml['check']:
-                print(rule_yaml['id'] + " - Manual Check Required")
-                xccdf_rules = replace_ocil(xccdf_rules,x)
-                x += 1
-                continue
-            if "/usr/bin/pwpolicy getaccountpolicies" in rule_yaml['check']:
-                print(rule_yaml['id'] + " - pwpolicy getaccountpolicies - no relevant oval")
-                xccdf_rules = replace_ocil(xccdf_rules,x)
-                x += 1
-                continue
-            if "find" in rule_yaml['check'].split(" ")[0] and rule_yaml['id'] != "os_home_folders_secure":
-                print(rule_yaml['id'] + " - no relevant oval")
-                xccdf_rules = replace_ocil(xccdf_rules,x)
-                x += 1
-                continue
-            if "/usr/sbin/firmwarepasswd" in rule_yaml['check']:
-                print(rule_yaml['id'] + " - no relevant oval")
-                xccdf_rules = replace_ocil(xccdf_rules,x)
-                x += 1
-                continue
-            if "os_home_folders_secure" in rule_yaml['id']:
-                oval_definition = oval_definition + '''
+def translate_home_folders(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    fragments['oval_definition'].append('''
                         <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -528,15 +304,15 @@ def generate_scap(all_rules, all_baselines, args):
                 <criteria>
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                 </criteria>
-            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label, rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x)
+            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label, rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x))
 
-                oval_test = oval_test + '''
+    fragments['oval_test'].append('''
                     <file_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix" check="all" check_existence="all_exist" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
-            </file_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
+            </file_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
 
-                oval_object = oval_object + '''
+    fragments['oval_object'].append('''
             <file_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix" comment="{}_object" id="oval:mscp:obj:{}" version="1">
             <path datatype="string" operation="equals" var_ref="oval:mscp:var:{}"></path>
             <filename xsi:nil="true"/>
@@ -546,9 +322,9 @@ def generate_scap(all_rules, all_baselines, args):
             <accountinfo_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="user home directory" id="oval:mscp:obj:{}" version="1">
                 <username operation="pattern match">.*</username>
                 <filter action="include" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5">oval:mscp:ste:{}</filter>
-            </accountinfo_object>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x+999,x+999)
+            </accountinfo_object>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x+999,x+999))
 
-                oval_state = oval_state + '''
+    fragments['oval_state'].append('''
                 <file_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix" comment="{}_state" id="oval:mscp:ste:{}" version="1">
             <uread datatype="boolean">true</uread>
             <uwrite datatype="boolean">true</uwrite>
@@ -566,25 +342,28 @@ def generate_scap(all_rules, all_baselines, args):
                 <uid datatype="int" operation="not equal">0</uid>
                 <gid datatype="int" operation="not equal">0</gid>
                 <login_shell operation="not equal">/usr/bin/false</login_shell>
-            </accountinfo_state>'''.format(rule_yaml['id'] + "_" + odv_label,x,x+999)
+            </accountinfo_state>'''.format(rule_yaml['id'] + "_" + odv_label,x,x+999))
 
-                oval_variable = oval_variable + '''
+    fragments['oval_variable'].append('''
                     <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="home directory variable">
                 <object_component object_ref="oval:mscp:obj:{}" item_field="home_dir"/>
-        </local_variable>'''.format(x,x+999)
-                x = x + 1
-                continue
-            
-            if rule_yaml['mobileconfig']:
-                if "spctl" in rule_yaml['check']:
-                    
-                    if "verbose" in rule_yaml['check']:
-                        xccdf_rules = replace_ocil(xccdf_rules,x)
-                        x = x + 1
-                        continue
-                    else:
-                        
-                        oval_definition = oval_definition + '''
+        </local_variable>'''.format(x,x+999))
+    fragments['x'] = x + 1
+    return TRANSLATED
+
+
+def translate_mobileconfig(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    d = fragments['d']
+    if "spctl" in rule_yaml['check']:
+
+        if "verbose" in rule_yaml['check']:
+            replace_ocil(fragments['scap_rules'],fragments['rule_checks'],x,fragments['ocil_checks'])
+            fragments['x'] = x + 1
+            return TRANSLATED
+        else:
+
+            fragments['oval_definition'].append('''
             <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title>
@@ -596,69 +375,69 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
 
                 </criteria>
-            </definition>'''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x)
+            </definition>'''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x))
 
-                        oval_test = oval_test + '''
+            fragments['oval_test'].append('''
             <gatekeeper_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}"/>
                 <state state_ref="oval:mscp:ste:{}" />
-            </gatekeeper_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
+            </gatekeeper_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
 
-                        oval_object = oval_object + '''
+            fragments['oval_object'].append('''
             <gatekeeper_object id="oval:mscp:obj:{}" version="1" comment="{}_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos">
-            </gatekeeper_object>'''.format(x,rule_yaml['id'])
+            </gatekeeper_object>'''.format(x,rule_yaml['id']))
 
-                        oval_state = oval_state + '''
+            fragments['oval_state'].append('''
             <gatekeeper_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
                 <enabled datatype="boolean" operation="equals">true</enabled>
-            </gatekeeper_state>'''.format(rule_yaml['id'] + "_" + odv_label,x)
+            </gatekeeper_state>'''.format(rule_yaml['id'] + "_" + odv_label,x))
 
-                    
-                    x += 1
-                    continue
-                
-                for payload_type, info in rule_yaml['mobileconfig_info'].items():
-                    
-                    if payload_type == "com.apple.systempolicy.control":
-                        continue
-                    if payload_type == "com.apple.ManagedClient.preferences":
-                        for payload_domain, settings in info.items():
-                            oval_definition = oval_definition + '''
+
+        fragments['x'] = x + 1
+        return TRANSLATED
+
+    for payload_type, info in rule_yaml['mobileconfig_info'].items():
+
+        if payload_type == "com.apple.systempolicy.control":
+            continue
+        if payload_type == "com.apple.ManagedClient.preferences":
+            for payload_domain, settings in info.items():
+                fragments['oval_definition'].append('''
                             <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                             <metadata> 
                                 <title>{}</title>
                                 <reference source="CCE" ref_id="{}"/>
                                 <reference source="macos_security" ref_id="{}"/>
                                 <description>{}</description> 
-                            </metadata>'''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip())
-                            if len(settings) > 1:
-                                oval_definition = oval_definition + '''<criteria operator="AND">'''
-                            else:
-                                oval_definition = oval_definition + '''<criteria>'''
-                            
-                            for key, value in settings.items():
-                                state_kind = ""
-                                if type(value) == bool:
-                                    state_kind = "boolean"
-                                elif type(value) == int:
-                                    state_kind = "int"
-                                elif type(value) == str:
-                                    state_kind = "string"
-                                
-                                dz = d + 5000
-                                oval_definition = oval_definition + '''<criterion comment="{}" test_ref="oval:mscp:tst:{}" />'''.format(rule_yaml['id'] + '_' + odv_label + "_" + str(d), dz)
+                            </metadata>'''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip()))
+                if len(settings) > 1:
+                    fragments['oval_definition'].append('''<criteria operator="AND">''')
+                else:
+                    fragments['oval_definition'].append('''<criteria>''')
+
+                for key, value in settings.items():
+                    state_kind = ""
+                    if type(value) == bool:
+                        state_kind = "boolean"
+                    elif type(value) == int:
+                        state_kind = "int"
+                    elif type(value) == str:
+                        state_kind = "string"
+
+                    dz = d + 5000
+                    fragments['oval_definition'].append('''<criterion comment="{}" test_ref="oval:mscp:tst:{}" />'''.format(rule_yaml['id'] + '_' + odv_label + "_" + str(d), dz))
 
-                                oval_test = oval_test + '''
+                    fragments['oval_test'].append('''
                     <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                         <object object_ref="oval:mscp:obj:{}" />
                         <state state_ref="oval:mscp:ste:{}" />
                     </plist511_test>
                 
                 
-                '''.format(rule_yaml['id'] + "_" + odv_label + "_" + str(d),dz,dz,dz)
-                                if payload_domain == "com.apple.dock":
-                                    
-                                    oval_object = oval_object + '''
+                '''.format(rule_yaml['id'] + "_" + odv_label + "_" + str(d),dz,dz,dz))
+                    if payload_domain == "com.apple.dock":
+
+                        fragments['oval_object'].append('''
                 <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" version="1" comment="find a username" id="oval:mscp:obj:{}">
                     <filepath>/Library/Preferences/com.apple.loginwindow.plist</filepath>
                     <xpath>/plist/dict/key[string()="lastUserName"]/following-sibling::*[1]/text()</xpath>
@@ -666,43 +445,43 @@ def generate_scap(all_rules, all_baselines, args):
                     <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                 <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>
                 <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-            </plist511_object>'''.format(x+1999,key,dz,x,key)
+            </plist511_object>'''.format(x+1999,key,dz,x,key))
 
-                                    oval_variable = oval_variable + '''
+                        fragments['oval_variable'].append('''
         <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="user managed pref variable">
             <concat>
                     <literal_component datatype="string">/Library/Managed Preferences/</literal_component>
                     <object_component object_ref="oval:mscp:obj:{}" item_field="value_of"/>
                     <literal_component datatype="string">/com.apple.dock.plist</literal_component>
             </concat>
-        </local_variable>'''.format(x,x+1999)
+        </local_variable>'''.format(x,x+1999))
 
-                                else:
-                                    oval_object = oval_object + '''
+                    else:
+                        fragments['oval_object'].append('''
                         <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                             <filepath>/Library/Managed Preferences/{}.plist</filepath>
                             <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
 
                         </plist511_object>
-                        '''.format(rule_yaml['id'] + "_" + odv_label,dz,payload_domain,key)
-                                    
-                                
-                                oval_state = oval_state + '''
+                        '''.format(rule_yaml['id'] + "_" + odv_label,dz,payload_domain,key))
+
+
+                    fragments['oval_state'].append('''
                                     <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
                         <value_of datatype="{}" operation="equals">{}</value_of>
                         </plist511_state>
-                        '''.format(rule_yaml['id'] + "_" + odv_label,dz,state_kind,value)
-                                d += 1
-                                x += 1
-                        oval_definition = oval_definition + '''</criteria> </definition>'''
-                        continue
-                    for key, value in info.items():
-                        if key == "familyControlsEnabled":
-                            xpath_search = ""
-                            if len(info) > 1:
-                                
-                                xpath_search = info['pathBlackList']
-                                oval_definition = oval_definition + '''
+                        '''.format(rule_yaml['id'] + "_" + odv_label,dz,state_kind,value))
+                    d += 1
+                    x += 1
+            fragments['oval_definition'].append('''</criteria> </definition>''')
+            continue
+        for key, value in info.items():
+            if key == "familyControlsEnabled":
+                xpath_search = ""
+                if len(info) > 1:
+
+                    xpath_search = info['pathBlackList']
+                    fragments['oval_definition'].append('''
                     <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -714,33 +493,33 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                 </criteria> 
             </definition>
-            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x)
+            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x))
 
-                                oval_test = oval_test + '''
+                    fragments['oval_test'].append('''
             <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
             </plist511_test>
-        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
-                                ""
-                                oval_object = oval_object + '''
+        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
+                    ""
+                    fragments['oval_object'].append('''
             <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                     <filepath>/Library/Managed Preferences/com.apple.applicationaccess.new.plist</filepath>
                     <xpath>boolean(plist/dict/array/string/text() = "{}")</xpath>
             </plist511_object>
-            '''.format(rule_yaml['id'] + "_" + odv_label,x,str(xpath_search).replace('[',"").replace(']',"").replace("'",""))
-                            
-                                oval_state = oval_state + '''
+            '''.format(rule_yaml['id'] + "_" + odv_label,x,str(xpath_search).replace('[',"").replace(']',"").replace("'","")))
+
+                    fragments['oval_state'].append('''
                         <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
             <value_of datatype="boolean" operation="equals">true</value_of>
             </plist511_state>
-            '''.format(rule_yaml['id'] + "_" + odv_label,x)
-                                
-                                x = x + 1
-                                continue
-                            else:
-                                
-                                oval_definition = oval_definition + '''
+            '''.format(rule_yaml['id'] + "_" + odv_label,x))
+
+                    x = x + 1
+                    continue
+                else:
+
+                    fragments['oval_definition'].append('''
                     <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -752,46 +531,46 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                 </criteria> 
             </definition>
-            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x)
+            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x))
 
-                                oval_test = oval_test + '''
+                    fragments['oval_test'].append('''
             <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
             </plist511_test>
-        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
-                                                                
-                                oval_object = oval_object + '''
+        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
+
+                    fragments['oval_object'].append('''
             <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
-                <filepath>/Library/Managed Preferences/{}.plist</filepath>'''.format(rule_yaml['id'] + "_" + odv_label,x,payload_type)
-                    
-                                state_kind = ""
-                                if type(value) == bool:
-                                    oval_object = oval_object + '''
+                <filepath>/Library/Managed Preferences/{}.plist</filepath>'''.format(rule_yaml['id'] + "_" + odv_label,x,payload_type))
+
+                    state_kind = ""
+                    if type(value) == bool:
+                        fragments['oval_object'].append('''
     <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-    </plist511_object>'''.format(key)
-                                    state_kind = "boolean"
-                                elif type(value) == int:
-                                    state_kind = "int"
-                                    oval_object = oval_object + '''
+    </plist511_object>'''.format(key))
+                        state_kind = "boolean"
+                    elif type(value) == int:
+                        state_kind = "int"
+                        fragments['oval_object'].append('''
     <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-    </plist511_object>'''.format(key)
-                                elif type(value) == str:
-                                    state_kind = "string"
-                                    oval_object = oval_object + '''
+    </plist511_object>'''.format(key))
+                    elif type(value) == str:
+                        state_kind = "string"
+                        fragments['oval_object'].append('''
     <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-    </plist511_object>'''.format(key)
+    </plist511_object>'''.format(key))
 
-                                oval_state = oval_state + '''
+                    fragments['oval_state'].append('''
                         <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
             <value_of datatype="{}" operation="equals">{}</value_of>
             </plist511_state>
-            '''.format(rule_yaml['id'] + "_" + odv_label,x,state_kind,value)
+            '''.format(rule_yaml['id'] + "_" + odv_label,x,state_kind,value))
 
-                                x = x + 1
-                                continue
-                        if payload_type == "com.apple.finder":
-                            oval_definition = oval_definition + '''
+                    x = x + 1
+                    continue
+            if payload_type == "com.apple.finder":
+                fragments['oval_definition'].append('''
                     <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title>
@@ -803,61 +582,61 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                 </criteria> 
             </definition>
-            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x)
+            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x))
 
-                            oval_test = oval_test + '''
+                fragments['oval_test'].append('''
             <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
             </plist511_test>
-        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
+        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
 
-                            oval_object = oval_object + '''
+                fragments['oval_object'].append('''
             <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" version="1" comment="find a username" id="oval:mscp:obj:{}">
                 <filepath>/Library/Preferences/com.apple.loginwindow.plist</filepath>
                 <xpath>/plist/dict/key[string()="lastUserName"]/following-sibling::*[1]/text()</xpath>
             </plist511_object>
             <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                 <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>
-            '''.format(x+1999,rule_yaml['id'] + "_" + odv_label,x,x)
-                                                    
-                            state_kind = ""
-                            if type(value) == bool:
-                                oval_object = oval_object + '''
+            '''.format(x+1999,rule_yaml['id'] + "_" + odv_label,x,x))
+
+                state_kind = ""
+                if type(value) == bool:
+                    fragments['oval_object'].append('''
     <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-    </plist511_object>'''.format(key)
-                                state_kind = "boolean"
-                            elif type(value) == int:
-                                state_kind = "int"
-                                oval_object = oval_object + '''
+    </plist511_object>'''.format(key))
+                    state_kind = "boolean"
+                elif type(value) == int:
+                    state_kind = "int"
+                    fragments['oval_object'].append('''
     <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-    </plist511_object>'''.format(key)
-                            elif type(value) == str:
-                                state_kind = "string"
-                                oval_object = oval_object + '''
+    </plist511_object>'''.format(key))
+                elif type(value) == str:
+                    state_kind = "string"
+                    fragments['oval_object'].append('''
     <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-    </plist511_object>'''.format(key)
+    </plist511_object>'''.format(key))
 
-                            oval_state = oval_state + '''
+                fragments['oval_state'].append('''
                     <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
         <value_of datatype="{}" operation="equals">{}</value_of>
         </plist511_state>
-        '''.format(rule_yaml['id'] + "_" + odv_label,x,state_kind,value)
+        '''.format(rule_yaml['id'] + "_" + odv_label,x,state_kind,value))
 
 
-                            oval_variable = oval_variable +           '''    
+                fragments['oval_variable'].append('''    
             <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="user managed pref">
                 <concat>
                     <literal_component datatype="string">/Library/Managed Preferences/</literal_component>
                     <object_component object_ref="oval:mscp:obj:{}" item_field="value_of"/>
                     <literal_component datatype="string">/com.apple.finder.plist</literal_component>
                 </concat>
-            </local_variable>'''.format(x,x+1999)
-                            x += 1
-                            continue
-                        
-                        if payload_type == "com.apple.DiscRecording":
-                            oval_definition = oval_definition + '''
+            </local_variable>'''.format(x,x+1999))
+                x += 1
+                continue
+
+            if payload_type == "com.apple.DiscRecording":
+                fragments['oval_definition'].append('''
                     <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title>
@@ -869,60 +648,60 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                 </criteria> 
             </definition>
-            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x)
+            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x))
 
-                            oval_test = oval_test + '''
+                fragments['oval_test'].append('''
             <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
             </plist511_test>
-        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
+        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
 
-                            oval_object = oval_object + '''
+                fragments['oval_object'].append('''
             <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" version="1" comment="find a username" id="oval:mscp:obj:{}">
                 <filepath>/Library/Preferences/com.apple.loginwindow.plist</filepath>
                 <xpath>/plist/dict/key[string()="lastUserName"]/following-sibling::*[1]/text()</xpath>
             </plist511_object>
             <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                 <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>
-            '''.format(x+1999,rule_yaml['id'] + "_" + odv_label,x,x)
-                            
-                            state_kind = ""
-                            if type(value) == bool:
-                                oval_object = oval_object + '''
+            '''.format(x+1999,rule_yaml['id'] + "_" + odv_label,x,x))
+
+                state_kind = ""
+                if type(value) == bool:
+                    fragments['oval_object'].append('''
     <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-    </plist511_object>'''.format(key)
-                                state_kind = "boolean"
-                            elif type(value) == int:
-                                state_kind = "int"
-                                oval_object = oval_object + '''
+    </plist511_object>'''.format(key))
+                    state_kind = "boolean"
+                elif type(value) == int:
+                    state_kind = "int"
+                    fragments['oval_object'].append('''
     <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-    </plist511_object>'''.format(key)
-                            elif type(value) == str:
-                                state_kind = "string"
-                                oval_object = oval_object + '''
+    </plist511_object>'''.format(key))
+                elif type(value) == str:
+                    state_kind = "string"
+                    fragments['oval_object'].append('''
     <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-    </plist511_object>'''.format(key)
+    </plist511_object>'''.format(key))
 
-                            oval_state = oval_state + '''
+                fragments['oval_state'].append('''
                     <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
         <value_of datatype="{}" operation="equals">{}</value_of>
         </plist511_state>
-        '''.format(rule_yaml['id'] + "_" + odv_label,x,state_kind,value)
+        '''.format(rule_yaml['id'] + "_" + odv_label,x,state_kind,value))
 
 
-                            oval_variable = oval_variable +           '''    
+                fragments['oval_variable'].append('''    
             <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="user managed pref">
                 <concat>
                     <literal_component datatype="string">/Library/Managed Preferences/</literal_component>
                     <object_component object_ref="oval:mscp:obj:{}" item_field="value_of"/>
                     <literal_component datatype="string">/com.apple.DiscRecording.plist</literal_component>
                 </concat>
-            </local_variable>'''.format(x,x+1999)
-                            x += 1
-                            continue      
-                        if payload_type == "com.apple.Safari" and key == "AutoOpenSafeDownloads":
-                            oval_definition = oval_definition + '''
+            </local_variable>'''.format(x,x+1999))
+                x += 1
+                continue      
+            if payload_type == "com.apple.Safari" and key == "AutoOpenSafeDownloads":
+                fragments['oval_definition'].append('''
                     <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title>
@@ -934,61 +713,61 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                 </criteria> 
             </definition>
-            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x)
+            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x))
 
-                            oval_test = oval_test + '''
+                fragments['oval_test'].append('''
             <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
             </plist511_test>
-        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
+        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
 
-                            oval_object = oval_object + '''
+                fragments['oval_object'].append('''
             <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" version="1" comment="find a username" id="oval:mscp:obj:{}">
                 <filepath>/Library/Preferences/com.apple.loginwindow.plist</filepath>
                 <xpath>/plist/dict/key[string()="lastUserName"]/following-sibling::*[1]/text()</xpath>
             </plist511_object>
             <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                 <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>
-            '''.format(x+1999,rule_yaml['id'] + "_" + odv_label,x,x)
-                            
-                            state_kind = ""
-                            if type(value) == bool:
-                                oval_object = oval_object + '''
+            '''.format(x+1999,rule_yaml['id'] + "_" + odv_label,x,x))
+
+                state_kind = ""
+                if type(value) == bool:
+                    fragments['oval_object'].append('''
     <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-    </plist511_object>'''.format(key)
-                                state_kind = "boolean"
-                            elif type(value) == int:
-                                state_kind = "int"
-                                oval_object = oval_object + '''
+    </plist511_object>'''.format(key))
+                    state_kind = "boolean"
+                elif type(value) == int:
+                    state_kind = "int"
+                    fragments['oval_object'].append('''
     <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-    </plist511_object>'''.format(key)
-                            elif type(value) == str:
-                                state_kind = "string"
-                                oval_object = oval_object + '''
+    </plist511_object>'''.format(key))
+                elif type(value) == str:
+                    state_kind = "string"
+                    fragments['oval_object'].append('''
     <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-    </plist511_object>'''.format(key)
+    </plist511_object>'''.format(key))
 
-                            oval_state = oval_state + '''
+                fragments['oval_state'].append('''
                     <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
         <value_of datatype="{}" operation="equals">{}</value_of>
         </plist511_state>
-        '''.format(rule_yaml['id'] + "_" + odv_label,x,state_kind,value)
+        '''.format(rule_yaml['id'] + "_" + odv_label,x,state_kind,value))
 
 
-                            oval_variable = oval_variable +           '''    
+                fragments['oval_variable'].append('''    
             <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="user managed pref">
                 <concat>
                     <literal_component datatype="string">/Library/Managed Preferences/</literal_component>
                     <object_component object_ref="oval:mscp:obj:{}" item_field="value_of"/>
                     <literal_component datatype="string">/com.apple.Safari.plist</literal_component>
                 </concat>
-            </local_variable>'''.format(x,x+1999)
-                            x += 1
-                            continue                                                       
-                        if payload_type == "com.apple.systempreferences" and key == "DisabledPreferencePanes" or payload_type == "com.apple.systempreferences" and key == "HiddenPreferencePanes" or payload_type == "com.apple.systempreferences" and key == "DisabledSystemSettings": 
-                            
-                            oval_definition = oval_definition + '''
+            </local_variable>'''.format(x,x+1999))
+                x += 1
+                continue                                                       
+            if payload_type == "com.apple.systempreferences" and key == "DisabledPreferencePanes" or payload_type == "com.apple.systempreferences" and key == "HiddenPreferencePanes" or payload_type == "com.apple.systempreferences" and key == "DisabledSystemSettings": 
+
+                fragments['oval_definition'].append('''
                     <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title>
@@ -1000,16 +779,16 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                 </criteria> 
             </definition>
-            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x)
+            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x))
 
-                            oval_test = oval_test + '''
+                fragments['oval_test'].append('''
             <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
             </plist511_test>
-        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
+        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
 
-                            oval_object = oval_object + '''
+                fragments['oval_object'].append('''
             <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" version="1" comment="find a username" id="oval:mscp:obj:{}">
                 <filepath>/Library/Preferences/com.apple.loginwindow.plist</filepath>
                 <xpath>/plist/dict/key[string()="lastUserName"]/following-sibling::*[1]/text()</xpath>
@@ -1018,48 +797,48 @@ def generate_scap(all_rules, all_baselines, args):
                 <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>
                 <xpath>/plist/dict/key[string()="{}"]/following-sibling::*[1]/string[string()="{}"]/text()</xpath>
             </plist511_object>  
-            '''.format(x+1999,rule_yaml['id'] + "_" + odv_label,x,x,key,str(value).strip('[]').strip("'"))
-                            
-                    
-                            oval_state = oval_state + '''
+            '''.format(x+1999,rule_yaml['id'] + "_" + odv_label,x,x,key,str(value).strip('[]').strip("'")))
+
+
+                fragments['oval_state'].append('''
         
             <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
             <value_of datatype="string" operation="equals">{}</value_of>
             </plist511_state>
         
-            '''.format(rule_yaml['id'] + "_" + odv_label,x,str(value).strip('[]').strip("'"))
+            '''.format(rule_yaml['id'] + "_" + odv_label,x,str(value).strip('[]').strip("'")))
 
-                            oval_variable = oval_variable +           '''    
+                fragments['oval_variable'].append('''    
             <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="user managed pref">
                 <concat>
                     <literal_component datatype="string">/Library/Managed Preferences/</literal_component>
                     <object_component object_ref="oval:mscp:obj:{}" item_field="value_of"/>
                     <literal_component datatype="string">/com.apple.systempreferences.plist</literal_component>
                 </concat>
-            </local_variable>'''.format(x,x+1999)
-                            x += 1
-                            continue
-                        
-                        state_kind = ""
-                        if type(value) == bool:
-                            state_kind = "boolean"
-                        elif type(value) == int:
-                            state_kind = "int"
-                        elif type(value) == str:
-                            state_kind = "string"
-                            try:
-                                int(value)
-                                state_kind = "int"
-                            except:
-                                pass
-
-                        elif type(value) == dict:
-                            state_kind = "string"
-                        else:
-                            
-                            continue
-                        
-                        oval_definition = oval_definition + '''
+            </local_variable>'''.format(x,x+1999))
+                x += 1
+                continue
+
+            state_kind = ""
+            if type(value) == bool:
+                state_kind = "boolean"
+            elif type(value) == int:
+                state_kind = "int"
+            elif type(value) == str:
+                state_kind = "string"
+                try:
+                    int(value)
+                    state_kind = "int"
+                except:
+                    pass
+
+            elif type(value) == dict:
+                state_kind = "string"
+            else:
+
+                continue
+
+            fragments['oval_definition'].append('''
                     <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title>
@@ -1071,74 +850,56 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                 </criteria> 
             </definition>
-            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x)
+            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x))
 
-                        oval_test = oval_test + '''
+            fragments['oval_test'].append('''
             <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
             </plist511_test>
-        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
-                        
-                        oval_object = oval_object + '''
+        '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
+
+            fragments['oval_object'].append('''
             <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
-                <filepath>/Library/Managed Preferences/{}.plist</filepath>'''.format(rule_yaml['id'] + "_" + odv_label,x,payload_type)
-                        
-                        if state_kind == "boolean":
-                            oval_object = oval_object + '''
+                <filepath>/Library/Managed Preferences/{}.plist</filepath>'''.format(rule_yaml['id'] + "_" + odv_label,x,payload_type))
+
+            if state_kind == "boolean":
+                fragments['oval_object'].append('''
                 <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-            </plist511_object>'''.format(key)
-                        else:
-                            if payload_type == "com.apple.mobiledevice.passwordpolicy" and "customRegex" in info:
-                                oval_object = oval_object + '''
+            </plist511_object>'''.format(key))
+            else:
+                if payload_type == "com.apple.mobiledevice.passwordpolicy" and "customRegex" in info:
+                    fragments['oval_object'].append('''
                             <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-            </plist511_object>'''.format("passwordContentRegex")
-                                oval_state = oval_state + '''
+            </plist511_object>'''.format("passwordContentRegex"))
+                    fragments['oval_state'].append('''
                         <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
             <value_of datatype="{}" operation="equals">{}</value_of>
             </plist511_state>
-            '''.format(rule_yaml['id'] + "_" + odv_label,x,state_kind,value['passwordContentRegex'])
-                                x += 1
-                                continue
-                            else:
-                                oval_object = oval_object + '''
+            '''.format(rule_yaml['id'] + "_" + odv_label,x,state_kind,value['passwordContentRegex']))
+                    x += 1
+                    continue
+                else:
+                    fragments['oval_object'].append('''
                                 <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-                </plist511_object>'''.format(key)
-                          
-                        oval_state = oval_state + '''
+                </plist511_object>'''.format(key))
+
+            fragments['oval_state'].append('''
                         <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
             <value_of datatype="{}" operation="equals">{}</value_of>
             </plist511_state>
-            '''.format(rule_yaml['id'] + "_" + odv_label,x,state_kind,value)
-                        x += 1
-                        continue
-            else:
-                command = rule_yaml['check'].split("/")
-                if "sntp" in rule_yaml['check']:
-                    print(rule_yaml['id'] + " - No relevant oval test")
-                    xccdf_rules = replace_ocil(xccdf_rules,x)
-                    x += 1
-                    continue
+            '''.format(rule_yaml['id'] + "_" + odv_label,x,state_kind,value))
+            x += 1
+            continue
+    fragments['x'] = x
+    fragments['d'] = d
+    return TRANSLATED
 
-                if "SPStorageDataType" in rule_yaml['check']:
-                    
-                    print(rule_yaml['id'] + " - No relevant oval test")
-                    xccdf_rules = replace_ocil(xccdf_rules,x)
-                    x += 1
-                    continue
-                try:
-                    if "fdesetup" in command[3]:
-                        
-                        print(rule_yaml['id'] + " - No relevant oval test")
-                        xccdf_rules = replace_ocil(xccdf_rules,x)
-                        x += 1
-                        continue
-                except:
-                    pass
-                try:
-                    if "profiles" in command[3]:
-                        if "/usr/bin/profiles status -type enrollment" in rule_yaml['check']:
-                            oval_definition = oval_definition  + '''
+
+def translate_profiles(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    if "/usr/bin/profiles status -type enrollment" in rule_yaml['check']:
+        fragments['oval_definition'].append('''
                             <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                             <title>{}</title>
@@ -1151,9 +912,9 @@ def generate_scap(all_rules, all_baselines, args):
                         <criterion comment="com.apple.syspolicy.kernel-extension-policy" test_ref="oval:mscp:tst:{}" />
                         <criterion comment="com.apple.TCC.configuration-profile-policy" test_ref="oval:mscp:tst:{}" />
                     </criteria> 
-                </definition>'''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],x,x+899,x+799)
+                </definition>'''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],x,x+899,x+799))
 
-                            oval_test = oval_test + '''
+        fragments['oval_test'].append('''
                                 <file_test id="oval:mscp:tst:{}" version="1" comment="com.apple.extensiblesso_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix">
                     <object object_ref="oval:mscp:obj:{}"/>
                 </file_test>
@@ -1162,9 +923,9 @@ def generate_scap(all_rules, all_baselines, args):
                 </file_test>
                 <file_test id="oval:mscp:tst:{}" version="1" comment="com.apple.TCC.configuration-profile-policy_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix">
                     <object object_ref="oval:mscp:obj:{}"/>
-                </file_test>'''.format(x,x,x+899,x+899,x+799,x+799)
+                </file_test>'''.format(x,x,x+899,x+899,x+799,x+799))
 
-                            oval_object = oval_object + '''
+        fragments['oval_object'].append('''
                             <file_object id="oval:mscp:obj:{}" version="1" comment="com.apple.extensiblesso_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix">
                     <filepath operation="equals">/Library/Managed Preferences/com.apple.extensiblesso.plist</filepath>
                 </file_object>
@@ -1173,20 +934,21 @@ def generate_scap(all_rules, all_baselines, args):
                 </file_object>
                 <file_object id="oval:mscp:obj:{}" version="1" comment="com.apple.syspolicy.kernel-extension-policy_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix">
                     <filepath operation="equals">/Library/Managed Preferences/com.apple.TCC.configuration-profile-policy.plist</filepath>
-                </file_object> '''.format(x,x+899,x+799)
-                        x += 1
-                        continue
-                except:
-                    pass
-                try:
-                    if "csrutil" in command[3]:
-                        if "authenticated-root" in command[3]:
-                            
-                            print(rule_yaml['id'] + " - No relevant oval test")
-                            xccdf_rules = replace_ocil(xccdf_rules,x)
-                            x += 1
-                            continue
-                        oval_definition = oval_definition + '''
+                </file_object> '''.format(x,x+899,x+799))
+    fragments['x'] = x + 1
+    return TRANSLATED
+
+
+def translate_csrutil(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    command = rule_yaml['check'].split("/")
+    if "authenticated-root" in command[3]:
+
+        print(rule_yaml['id'] + " - No relevant oval test")
+        replace_ocil(fragments['scap_rules'],fragments['rule_checks'],x,fragments['ocil_checks'])
+        fragments['x'] = x + 1
+        return TRANSLATED
+    fragments['oval_definition'].append('''
                         <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                         <metadata> 
                             <title>{}</title> 
@@ -1198,65 +960,38 @@ def generate_scap(all_rules, all_baselines, args):
                         <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                     </criteria>
                 </definition>
-                '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x)
+                '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x))
 
-                        oval_test = oval_test + '''
+    fragments['oval_test'].append('''
                             <systemprofiler_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                     <object object_ref="oval:mscp:obj:{}" />
                     <state state_ref="oval:mscp:ste:{}" />
                 </systemprofiler_test>
-                '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
+                '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
 
-                        oval_object = oval_object + '''
+    fragments['oval_object'].append('''
                     <systemprofiler_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                 <data_type>SPSoftwareDataType</data_type>
 
         <xpath>//*[contains(text(), "system_integrity")]/following-sibling::string[position()=1]/text()</xpath>
                 </systemprofiler_object>
-                '''.format(rule_yaml['id'] + "_" + odv_label,x)
+                '''.format(rule_yaml['id'] + "_" + odv_label,x))
 
-                        oval_state = oval_state + '''
+    fragments['oval_state'].append('''
                                 <systemprofiler_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
                     <data_type>SPSoftwareDataType</data_type>
 
         <xpath>//*[contains(text(), "system_integrity")]/following-sibling::string[position()=1]/text()</xpath>
         <value_of>integrity_enabled</value_of>
                 </systemprofiler_state>
-                '''.format(rule_yaml['id'] + "_" + odv_label,x)
-                        x += 1
-                        continue
-                except:
-                    pass
-                if "pfctl" in rule_yaml['check']:
-                    print(rule_yaml['id'] + " - No relevant oval test")
-                    xccdf_rules = replace_ocil(xccdf_rules,x)
-                    x += 1
-                    continue
-                if "dump-keychain" in rule_yaml['check']:
-                    print(rule_yaml['id'] + " - No relevant oval test")
-                    xccdf_rules = replace_ocil(xccdf_rules,x)
-                    x += 1
-                    continue
-                try:
-                    if "mdmclient" in command[3]:
-                        print(rule_yaml['id'] + " - No relevant oval test")
-                        xccdf_rules = replace_ocil(xccdf_rules,x)
-                        x += 1
-                        continue
-                except:
-                    pass
-                try:
-                    if "nvram" in command[3]:
-                        print(rule_yaml['id'] + " - No relevant oval test")
-                        xccdf_rules = replace_ocil(xccdf_rules,x)
-                        x += 1
-                        continue
-                except:
-                    pass
+                '''.format(rule_yaml['id'] + "_" + odv_label,x))
+    fragments['x'] = x + 1
+    return TRANSLATED
 
-                try:
-                    if "pmset" in command[3] and "standby" in rule_yaml['check']:
-                        oval_definition = oval_definition + '''
+
+def translate_pmset_standby(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    fragments['oval_definition'].append('''
                             <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                         <metadata> 
                             <title>{}</title> 
@@ -1269,107 +1004,108 @@ def generate_scap(all_rules, all_baselines, args):
                         <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                         <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                     </criteria>
-                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] +"_standbydelayhigh",x, rule_yaml['id'] +"_standbydelaylow",x+877, rule_yaml['id'] +"_highstandbythreshold",x+888)
-                        
-                        
-                        oval_test = oval_test + '''
+                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] +"_standbydelayhigh",x, rule_yaml['id'] +"_standbydelaylow",x+877, rule_yaml['id'] +"_highstandbythreshold",x+888))
+
+
+    fragments['oval_test'].append('''
                 <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="at_least_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                     <object object_ref="oval:mscp:obj:{}" />
                     <state state_ref="oval:mscp:ste:{}" />
-                </plist511_test>'''.format(rule_yaml['id'] + "_standbydelayhigh",x,x,x)
+                </plist511_test>'''.format(rule_yaml['id'] + "_standbydelayhigh",x,x,x))
 
-                        oval_test = oval_test + '''
+    fragments['oval_test'].append('''
                 <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="at_least_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                     <object object_ref="oval:mscp:obj:{}" />
                     <state state_ref="oval:mscp:ste:{}" />
-                </plist511_test>'''.format(rule_yaml['id'] + "_standbydelaylow",x+877,x+877,x+877)
-                        
-                        oval_test = oval_test + '''
+                </plist511_test>'''.format(rule_yaml['id'] + "_standbydelaylow",x+877,x+877,x+877))
+
+    fragments['oval_test'].append('''
                 <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="at_least_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                     <object object_ref="oval:mscp:obj:{}" />
                     <state state_ref="oval:mscp:ste:{}" />
-                </plist511_test>'''.format(rule_yaml['id'] + "_highstandbythreshold",x+888,x+888,x+888)
+                </plist511_test>'''.format(rule_yaml['id'] + "_highstandbythreshold",x+888,x+888,x+888))
 
-                        
-                        standbydelayhigh = str()
-                        standbydelaylow = str()
-                        highstandbythreshold = str()
-
-                        for line in rule_yaml['fix'].split("----")[1].split("\n"):
-                            if line == "":
-                                continue
-                            if "standbydelayhigh" in line:
-                                standbydelayhigh = line.split(" ")[-1].rstrip()
-                            if "standbydelaylow" in line:
-                                standbydelaylow = line.split(" ")[-1].rstrip()
-                            if "highstandbythreshold" in line:
-                                highstandbythreshold = line.split(" ")[-1].rstrip()
-                            
-                        oval_object = oval_object + '''
+
+    standbydelayhigh = str()
+    standbydelaylow = str()
+    highstandbythreshold = str()
+
+    for line in rule_yaml['fix'].split("----")[1].split("\n"):
+        if line == "":
+            continue
+        if "standbydelayhigh" in line:
+            standbydelayhigh = line.split(" ")[-1].rstrip()
+        if "standbydelaylow" in line:
+            standbydelaylow = line.split(" ")[-1].rstrip()
+        if "highstandbythreshold" in line:
+            highstandbythreshold = line.split(" ")[-1].rstrip()
+
+    fragments['oval_object'].append('''
                                         <systemprofiler_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}" id="oval:mscp:obj:{}" version="1">
                 <data_type>SPHardwareDataType</data_type>
 
                     <xpath>//*[contains(text(), "platform_UUID")]/following-sibling::string[position()=1]/text()</xpath>
-                </systemprofiler_object> '''.format("hardware UUID",x+999)
+                </systemprofiler_object> '''.format("hardware UUID",x+999))
 
-                        oval_variable = oval_variable + '''       
+    fragments['oval_variable'].append('''       
             <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="uuid variable">
                 <concat>
                     <literal_component datatype="string">/Library/Preferences/com.apple.PowerManagement.</literal_component>
                     <object_component object_ref="oval:mscp:obj:{}" item_field="value_of"/>
                     <literal_component datatype="string">.plist</literal_component>
                 </concat>
-            </local_variable>'''.format(x,x+999)
+            </local_variable>'''.format(x,x+999))
 
-                        oval_object = oval_object + '''
+    fragments['oval_object'].append('''
                 <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
-                    <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>'''.format(rule_yaml['id'] + "_standbydelayhigh",x,x)
-                
-                        oval_object = oval_object + '''
+                    <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>'''.format(rule_yaml['id'] + "_standbydelayhigh",x,x))
+
+    fragments['oval_object'].append('''
                     <xpath>boolean(plist/dict[key="AC Power"]/dict[key="{}"]/integer/text() = "{}")</xpath>
-                </plist511_object>'''.format("High Standby Delay",standbydelayhigh)
-                    
+                </plist511_object>'''.format("High Standby Delay",standbydelayhigh))
 
-                        oval_object = oval_object + '''
+
+    fragments['oval_object'].append('''
                 <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
-                    <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>'''.format(rule_yaml['id'] + "_standbydelaylow",x+877, x)
-                
-                        oval_object = oval_object + '''
+                    <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>'''.format(rule_yaml['id'] + "_standbydelaylow",x+877, x))
+
+    fragments['oval_object'].append('''
                     <xpath>boolean(plist/dict[key="AC Power"]/dict[key="{}"]/integer/text() = "{}")</xpath>
-                </plist511_object>'''.format("Standby Delay",standbydelaylow)
+                </plist511_object>'''.format("Standby Delay",standbydelaylow))
 
-                        oval_object = oval_object + '''
+    fragments['oval_object'].append('''
                 <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
-                    <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>'''.format(rule_yaml['id'] + "_highstandbythreshold",x+888, x)
-                        
-                        oval_object = oval_object + '''
+                    <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>'''.format(rule_yaml['id'] + "_highstandbythreshold",x+888, x))
+
+    fragments['oval_object'].append('''
                     <xpath>boolean(plist/dict[key="AC Power"]/dict[key="{}"]/integer/text() = "{}")</xpath>
-                </plist511_object>'''.format("Standby Battery Threshold",highstandbythreshold)
-                        
-                        oval_state = oval_state + '''
+                </plist511_object>'''.format("Standby Battery Threshold",highstandbythreshold))
+
+    fragments['oval_state'].append('''
                             <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
                 <value_of datatype="boolean" operation="equals">true</value_of>
-                </plist511_state>'''.format(rule_yaml['id'] + "_standbydelayhigh",x)
+                </plist511_state>'''.format(rule_yaml['id'] + "_standbydelayhigh",x))
 
-                        oval_state = oval_state + '''
+    fragments['oval_state'].append('''
                             <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
                 <value_of datatype="boolean" operation="equals">true</value_of>
-                </plist511_state>'''.format(rule_yaml['id'] + "_standbydelaylow",x+877)
+                </plist511_state>'''.format(rule_yaml['id'] + "_standbydelaylow",x+877))
 
-                        oval_state = oval_state + '''
+    fragments['oval_state'].append('''
                             <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
                 <value_of datatype="boolean" operation="equals">true</value_of>
-                </plist511_state>'''.format(rule_yaml['id'] + "_highstandbythreshold",x+888)
+                </plist511_state>'''.format(rule_yaml['id'] + "_highstandbythreshold",x+888))
 
-                        x += 1
-                        continue
-                except:
-                    pass
-                if "sudo -V" in rule_yaml['check']:
-                    
-                    
-                    if "grep" in rule_yaml['check'].split("|")[1]:
-                        oval_definition = oval_definition + '''
+    fragments['x'] = x + 1
+    return TRANSLATED
+
+
+def translate_sudo(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+
+
+    if "grep" in rule_yaml['check'].split("|")[1]:
+        fragments['oval_definition'].append('''
                         <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -1381,47 +1117,47 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                     <criterion comment="{}_sudoers.d" test_ref="oval:mscp:tst:{}"/>
                 </criteria>
-            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label, x, rule_yaml['id'] + "_" + odv_label,x+5051)
-                    
-                        oval_test = oval_test + '''
+            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label, x, rule_yaml['id'] + "_" + odv_label,x+5051))
+
+        fragments['oval_test'].append('''
                 <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
             <object object_ref="oval:mscp:obj:{}"/>
         </textfilecontent54_test>
-        '''.format(x, rule_yaml['id'] + "_" + odv_label, x)
-                    
-                        oval_test = oval_test + '''
+        '''.format(x, rule_yaml['id'] + "_" + odv_label, x))
+
+        fragments['oval_test'].append('''
                 <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_sudoers.d_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
             <object object_ref="oval:mscp:obj:{}"/>
         </textfilecontent54_test>
-        '''.format(x+5051, rule_yaml['id'] + "_" + odv_label, x+5051)
+        '''.format(x+5051, rule_yaml['id'] + "_" + odv_label, x+5051))
 
-                        check_string = rule_yaml['fix'].split("echo")[1].split('"')[1]
-                        
-                        oval_object = oval_object + '''
+        check_string = rule_yaml['fix'].split("echo")[1].split('"')[1]
+
+        fragments['oval_object'].append('''
                     <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                     <behaviors ignore_case="true"/>
                     <filepath>/etc/sudoers</filepath>
                     <pattern operation="pattern match">{}</pattern>
                     <instance datatype="int">1</instance>
-                </textfilecontent54_object>'''.format(x, rule_yaml['id'] + "_" + odv_label, check_string)
+                </textfilecontent54_object>'''.format(x, rule_yaml['id'] + "_" + odv_label, check_string))
 
 
-                        oval_object = oval_object + '''
+        fragments['oval_object'].append('''
                 <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}__sudoers.d_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <behaviors ignore_case="true"/>
                 <path>/etc/sudoers.d/</path>
                 <filename operation="pattern match">*</filename>
                 <pattern operation="pattern match">{}</pattern>
                 <instance datatype="int">1</instance>
-            </textfilecontent54_object>'''.format(x+5051, rule_yaml['id'] + "_" + odv_label, check_string)
-                    
-                
-                        x = x + 1
-                        continue
+            </textfilecontent54_object>'''.format(x+5051, rule_yaml['id'] + "_" + odv_label, check_string))
+
 
-                    if "awk" in rule_yaml['check'].split("|")[1]:
-                        if "timestamp_type" in rule_yaml['fix'] and rule_yaml['result']['string'] == "tty":
-                            oval_definition = oval_definition + '''
+        fragments['x'] = x + 1
+        return TRANSLATED
+
+    if "awk" in rule_yaml['check'].split("|")[1]:
+        if "timestamp_type" in rule_yaml['fix'] and rule_yaml['result']['string'] == "tty":
+            fragments['oval_definition'].append('''
                         <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -1435,73 +1171,73 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}_tty_ticket" test_ref="oval:mscp:tst:{}" />
                     <criterion comment="{}_sudoers.d_tty_ticket" test_ref="oval:mscp:tst:{}"/>
                 </criteria>
-            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label, x+8000, rule_yaml['id'] + "_" + odv_label,x+8001, rule_yaml['id'] + "_" + odv_label,x+8002,rule_yaml['id'] + "_" + odv_label,x+8003)
-                    
-                            oval_test = oval_test + '''
+            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label, x+8000, rule_yaml['id'] + "_" + odv_label,x+8001, rule_yaml['id'] + "_" + odv_label,x+8002,rule_yaml['id'] + "_" + odv_label,x+8003))
+
+            fragments['oval_test'].append('''
                     <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_test" check_existence="none_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <object object_ref="oval:mscp:obj:{}"/>
             </textfilecontent54_test>
-            '''.format(x, rule_yaml['id'] + "_" + odv_label, x)
-                        
-                            oval_test = oval_test + '''
+            '''.format(x, rule_yaml['id'] + "_" + odv_label, x))
+
+            fragments['oval_test'].append('''
                     <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_sudoers.d_test" check_existence="none_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <object object_ref="oval:mscp:obj:{}"/>
             </textfilecontent54_test>
-            '''.format(x+8000, rule_yaml['id'] + "_" + odv_label, x+8000)
+            '''.format(x+8000, rule_yaml['id'] + "_" + odv_label, x+8000))
 
-                            oval_test = oval_test + '''
+            fragments['oval_test'].append('''
                     <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_sudoers.d_test" check_existence="none_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <object object_ref="oval:mscp:obj:{}"/>
             </textfilecontent54_test>
-            '''.format(x+8001, rule_yaml['id'] + "_" + odv_label, x+8001)
+            '''.format(x+8001, rule_yaml['id'] + "_" + odv_label, x+8001))
 
-                            oval_test = oval_test + '''
+            fragments['oval_test'].append('''
                     <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_sudoers.d_test" check_existence="none_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <object object_ref="oval:mscp:obj:{}"/>
             </textfilecontent54_test>
-            '''.format(x+8002, rule_yaml['id'] + "_" + odv_label, x+8002)
+            '''.format(x+8002, rule_yaml['id'] + "_" + odv_label, x+8002))
 
-                            
-                            oval_object = oval_object + '''
+
+            fragments['oval_object'].append('''
                         <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                         <behaviors ignore_case="true"/>
                         <filepath>/etc/sudoers</filepath>
                         <pattern operation="pattern match">timestamp_type</pattern>
                         <instance datatype="int">1</instance>
-                    </textfilecontent54_object>'''.format(x, rule_yaml['id'] + "_" + odv_label)
+                    </textfilecontent54_object>'''.format(x, rule_yaml['id'] + "_" + odv_label))
 
 
-                            oval_object = oval_object + '''
+            fragments['oval_object'].append('''
                     <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}__sudoers.d_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                     <behaviors ignore_case="true"/>
                     <path>/etc/sudoers.d/</path>
                     <filename operation="pattern match">*</filename>
                     <pattern operation="pattern match">timestamp_type</pattern>
                     <instance datatype="int">1</instance>
-                </textfilecontent54_object>'''.format(x+8000, rule_yaml['id'] + "_" + odv_label)
+                </textfilecontent54_object>'''.format(x+8000, rule_yaml['id'] + "_" + odv_label))
 
-                            oval_object = oval_object + '''
+            fragments['oval_object'].append('''
                     <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}__sudoers.d_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                     <behaviors ignore_case="true"/>
                     <path>/etc/sudoers.d/</path>
                     <filename operation="pattern match">*</filename>
                     <pattern operation="pattern match">!tty_tickets</pattern>
                     <instance datatype="int">1</instance>
-                </textfilecontent54_object>'''.format(x+8001, rule_yaml['id'] + "_" + odv_label)
-                            oval_object = oval_object + '''
+                </textfilecontent54_object>'''.format(x+8001, rule_yaml['id'] + "_" + odv_label))
+            fragments['oval_object'].append('''
                     <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}__sudoers.d_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                     <behaviors ignore_case="true"/>
                     <path>/etc/sudoers.d/</path>
                     <filename operation="pattern match">*</filename>
                     <pattern operation="pattern match">!tty_tickets</pattern>
                     <instance datatype="int">1</instance>
-                </textfilecontent54_object>'''.format(x+8002, rule_yaml['id'] + "_" + odv_label)
-                            x = x + 1
-                            continue
-                        else:
-                            check_string = "Defaults.*.timestamp_type={}".format(rule_yaml['result']['string'])
-                            
-                            oval_definition = oval_definition + '''
+                </textfilecontent54_object>'''.format(x+8002, rule_yaml['id'] + "_" + odv_label))
+            fragments['x'] = x + 1
+            return TRANSLATED
+        else:
+            check_string = "Defaults.*.timestamp_type={}".format(rule_yaml['result']['string'])
+
+            fragments['oval_definition'].append('''
                         <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -1513,44 +1249,46 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                     <criterion comment="{}_sudoers.d" test_ref="oval:mscp:tst:{}"/>
                 </criteria>
-            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label, x+8000, rule_yaml['id'] + "_" + odv_label,x+8001, rule_yaml['id'] + "_" + odv_label,x+8002,rule_yaml['id'] + "_" + odv_label,x+8003)
-                    
-                            oval_test = oval_test + '''
+            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label, x+8000, rule_yaml['id'] + "_" + odv_label,x+8001, rule_yaml['id'] + "_" + odv_label,x+8002,rule_yaml['id'] + "_" + odv_label,x+8003))
+
+            fragments['oval_test'].append('''
                     <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_test" check_existence="at_least_one_exists" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <object object_ref="oval:mscp:obj:{}"/>
             </textfilecontent54_test>
-            '''.format(x, rule_yaml['id'] + "_" + odv_label, x)
-                        
-                            oval_test = oval_test + '''
+            '''.format(x, rule_yaml['id'] + "_" + odv_label, x))
+
+            fragments['oval_test'].append('''
                     <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_sudoers.d_test" check_existence="at_least_one_exists" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <object object_ref="oval:mscp:obj:{}"/>
             </textfilecontent54_test>
-            '''.format(x+5000, rule_yaml['id'] + "_" + odv_label, x+7000)
+            '''.format(x+5000, rule_yaml['id'] + "_" + odv_label, x+7000))
 
-                            oval_object = oval_object + '''
+            fragments['oval_object'].append('''
                         <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                         <behaviors ignore_case="true"/>
                         <filepath>/etc/sudoers</filepath>
                         <pattern operation="pattern match">{}</pattern>
                         <instance datatype="int">1</instance>
-                    </textfilecontent54_object>'''.format(x, rule_yaml['id'] + "_" + odv_label, check_string)
+                    </textfilecontent54_object>'''.format(x, rule_yaml['id'] + "_" + odv_label, check_string))
 
-                        
-                            oval_object = oval_object + '''
+
+            fragments['oval_object'].append('''
                     <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}__sudoers.d_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                     <behaviors ignore_case="true"/>
                     <path>/etc/sudoers.d/</path>
                     <filename operation="pattern match">*</filename>
                     <pattern operation="pattern match">{}</pattern>
                     <instance datatype="int">1</instance>
-                </textfilecontent54_object>'''.format(x+7000, rule_yaml['id'] + "_" + odv_label, check_string)
+                </textfilecontent54_object>'''.format(x+7000, rule_yaml['id'] + "_" + odv_label, check_string))
 
-                        x = x + 1
-                        continue
+        fragments['x'] = x + 1
+        return TRANSLATED
 
-                if "ssh_config" in rule_yaml['discussion'] and "dscl" in rule_yaml['check']:
-                    
-                    oval_definition = oval_definition + '''
+
+def translate_ssh_config(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+
+    fragments['oval_definition'].append('''
                         <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -1563,52 +1301,52 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}_ssh_config.d" test_ref="oval:mscp:tst:{}"/>
                     <criterion comment="{}_.ssh" test_ref="oval:mscp:tst:{}"/>
                 </criteria>
-            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label, x+5000, rule_yaml['id'] + "_" + odv_label,x+5001)
-                    
-                    oval_test = oval_test + '''
+            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label, x+5000, rule_yaml['id'] + "_" + odv_label,x+5001))
+
+    fragments['oval_test'].append('''
                 <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
             <object object_ref="oval:mscp:obj:{}"/>
         </textfilecontent54_test>
-        '''.format(x, rule_yaml['id'] + "_" + odv_label, x)
-                    
-                    oval_test = oval_test + '''
+        '''.format(x, rule_yaml['id'] + "_" + odv_label, x))
+
+    fragments['oval_test'].append('''
                 <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_ssh_config.d_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
             <object object_ref="oval:mscp:obj:{}"/>
         </textfilecontent54_test>
-        '''.format(x+5000, rule_yaml['id'] + "_" + odv_label, x+5000)
-                    oval_test = oval_test + '''
+        '''.format(x+5000, rule_yaml['id'] + "_" + odv_label, x+5000))
+    fragments['oval_test'].append('''
                 <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_ssh_config.d_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
             <object object_ref="oval:mscp:obj:{}"/>
         </textfilecontent54_test>
-        '''.format(x+5001, rule_yaml['id'] + "_" + odv_label, x+5001)
-                    regex = r"(?<=grep).*$"
-                    matches = re.finditer(regex, rule_yaml['check'], re.MULTILINE)
-                    matchy_match = ""
-                    for matchNum, match in enumerate(matches, start=1):
-                        matchy_match = match.group()
-                                
-                    ssh_config_pattern = matchy_match.split('"')[1]
-                    
+        '''.format(x+5001, rule_yaml['id'] + "_" + odv_label, x+5001))
+    regex = r"(?<=grep).*$"
+    matches = re.finditer(regex, rule_yaml['check'], re.MULTILINE)
+    matchy_match = ""
+    for matchNum, match in enumerate(matches, start=1):
+        matchy_match = match.group()
 
-                    oval_object = oval_object + '''
+    ssh_config_pattern = matchy_match.split('"')[1]
+
+
+    fragments['oval_object'].append('''
                 <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <behaviors ignore_case="true"/>
                 <filepath>/etc/ssh/ssh_config</filepath>
                 <pattern operation="pattern match">{}</pattern>
                 <instance datatype="int">1</instance>
-            </textfilecontent54_object>'''.format(x, rule_yaml['id'] + "_" + odv_label, ssh_config_pattern)
+            </textfilecontent54_object>'''.format(x, rule_yaml['id'] + "_" + odv_label, ssh_config_pattern))
 
 
-                    oval_object = oval_object + '''
+    fragments['oval_object'].append('''
                 <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}__ssh_config.d_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <behaviors ignore_case="true"/>
                 <path>/etc/ssh/ssh_config.d/</path>
                 <filename operation="pattern match">*</filename>
                 <pattern operation="pattern match">{}</pattern>
                 <instance datatype="int">1</instance>
-            </textfilecontent54_object>'''.format(x+5000, rule_yaml['id'] + "_" + odv_label, ssh_config_pattern)
-                    
-                    oval_object = oval_object + '''
+            </textfilecontent54_object>'''.format(x+5000, rule_yaml['id'] + "_" + odv_label, ssh_config_pattern))
+
+    fragments['oval_object'].append('''
             <textfilecontent54_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent" id="oval:mscp:obj:{}" version="1" comment="{}_.ssh_object" >
             <filepath var_ref="oval:mscp:var:{}"></filepath>
             <pattern operation="pattern match">{}</pattern>
@@ -1620,30 +1358,33 @@ def generate_scap(all_rules, all_baselines, args):
             <accountinfo_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="user home directory" id="oval:mscp:obj:{}" version="1">
                 <username operation="pattern match">.*</username>
                 <filter action="include" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5">oval:mscp:ste:{}</filter>
-            </accountinfo_object>'''.format(x+5001,rule_yaml['id'] + "_" + odv_label,x,ssh_config_pattern,x+999,x+999)
-                
-                    oval_state = oval_state + '''
+            </accountinfo_object>'''.format(x+5001,rule_yaml['id'] + "_" + odv_label,x,ssh_config_pattern,x+999,x+999))
+
+    fragments['oval_state'].append('''
                        <accountinfo_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="accountinfo_state" id="oval:mscp:ste:{}" version="1">
                 <username operation="pattern match">^[^_\s].*</username>
                 <uid datatype="int" operation="not equal">0</uid>
                 <gid datatype="int" operation="not equal">0</gid>
                 <login_shell operation="not equal">/usr/bin/false</login_shell>
-            </accountinfo_state>'''.format(x+999)
+            </accountinfo_state>'''.format(x+999))
 
-                    oval_variable = oval_variable + '''
+    fragments['oval_variable'].append('''
                     <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="home directory variable">
                 <concat>
                 <object_component object_ref="oval:mscp:obj:{}" item_field="home_dir"/>
                 <literal_component datatype="string">/.ssh/config</literal_component>
                 </concat>
-        </local_variable>'''.format(x,x+999)
-                    x = x + 1
-                    continue
-                if "sshd -T" in rule_yaml['check'] and "fips" in rule_yaml['check'] or "sshd -G" in rule_yaml['check'] and "fips" in rule_yaml['check']:
-                    fipslist = rule_yaml['check'].split("\n")[0].split("(")[1].replace(")","").replace('" "',"\n").replace('"',"")
-                    
-                    
-                    oval_definition = oval_definition + '''
+        </local_variable>'''.format(x,x+999))
+    fragments['x'] = x + 1
+    return TRANSLATED
+
+
+def translate_sshd_fips(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    fipslist = rule_yaml['check'].split("\n")[0].split("(")[1].replace(")","").replace('" "',"\n").replace('"',"")
+
+
+    fragments['oval_definition'].append('''
                         <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -1655,43 +1396,45 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                     <criterion comment="{}_sshd_config.d" test_ref="oval:mscp:tst:{}"/>
                 </criteria>
-            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label, x+5000, rule_yaml['id'] + "_" + odv_label,x+5001)
-                    
-                    oval_test = oval_test + '''
+            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label, x+5000, rule_yaml['id'] + "_" + odv_label,x+5001))
+
+    fragments['oval_test'].append('''
                 <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
             <object object_ref="oval:mscp:obj:{}"/>
         </textfilecontent54_test>
-        '''.format(x, rule_yaml['id'] + "_" + odv_label, x)
-                    
-                    oval_test = oval_test + '''
+        '''.format(x, rule_yaml['id'] + "_" + odv_label, x))
+
+    fragments['oval_test'].append('''
                 <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_sshd_config.d_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
             <object object_ref="oval:mscp:obj:{}"/>
         </textfilecontent54_test>
-        '''.format(x+5000, rule_yaml['id'] + "_" + odv_label, x+5000)
-                    
-                    oval_object = oval_object + '''
+        '''.format(x+5000, rule_yaml['id'] + "_" + odv_label, x+5000))
+
+    fragments['oval_object'].append('''
                 <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <behaviors ignore_case="true"/>
                 <filepath>/etc/ssh/sshd_config</filepath>
                 <pattern operation="pattern match">{}</pattern>
                 <instance datatype="int">1</instance>
-            </textfilecontent54_object>'''.format(x, rule_yaml['id'] + "_" + odv_label, fipslist)
+            </textfilecontent54_object>'''.format(x, rule_yaml['id'] + "_" + odv_label, fipslist))
 
 
-                    oval_object = oval_object + '''
+    fragments['oval_object'].append('''
                 <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}__sshd_config.d_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <behaviors ignore_case="true"/>
                 <path>/etc/ssh/sshd_config.d/</path>
                 <filename operation="pattern match">*</filename>
                 <pattern operation="pattern match">{}</pattern>
                 <instance datatype="int">1</instance>
-            </textfilecontent54_object>'''.format(x+5000, rule_yaml['id'] + "_" + odv_label, fipslist)
-                    
-                    x = x + 1
-                    
-                    continue
-                if "sshd -T" in rule_yaml['check'] or "sshd -G" in rule_yaml['check']:
-                    oval_definition = oval_definition + '''
+            </textfilecontent54_object>'''.format(x+5000, rule_yaml['id'] + "_" + odv_label, fipslist))
+
+    fragments['x'] = x + 1
+    return TRANSLATED
+
+
+def translate_sshd(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    fragments['oval_definition'].append('''
                         <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -1703,61 +1446,63 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                     <criterion comment="{}_sshd_config.d" test_ref="oval:mscp:tst:{}"/>
                 </criteria>
-            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label, x+5000, rule_yaml['id'] + "_" + odv_label,x+5001)
-                    
-                    oval_test = oval_test + '''
+            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label, x+5000, rule_yaml['id'] + "_" + odv_label,x+5001))
+
+    fragments['oval_test'].append('''
                 <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
             <object object_ref="oval:mscp:obj:{}"/>
         </textfilecontent54_test>
-        '''.format(x, rule_yaml['id'] + "_" + odv_label, x)
-                    
-                    oval_test = oval_test + '''
+        '''.format(x, rule_yaml['id'] + "_" + odv_label, x))
+
+    fragments['oval_test'].append('''
                 <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_sshd_config.d_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
             <object object_ref="oval:mscp:obj:{}"/>
         </textfilecontent54_test>
-        '''.format(x+5000, rule_yaml['id'] + "_" + odv_label, x+5000)
-                    sshd_config_pattern = ""
-                    if "grep" in rule_yaml['check']:                        
-                        regex = r"(?<=grep).*$"
-                        matches = re.finditer(regex, rule_yaml['check'], re.MULTILINE)
-                        matchy_match = ""
-                        for matchNum, match in enumerate(matches, start=1):
-                            matchy_match = match.group()
-                        sshd_config_pattern = ""
-                        if '"' in matchy_match:
-                            sshd_config_pattern = matchy_match.split('"')[1]
-                        elif "'" in matchy_match:
-                            sshd_config_pattern = matchy_match.split("'")[1]
-                    
-                    if "awk" in rule_yaml['check']:
-                        matchy_match = rule_yaml['check'].split("'")[1].split("/")[1]
-                        for item in rule_yaml['result']:
-                            sshd_config_pattern = matchy_match + " " + str(rule_yaml['result'][item])
-                    
-                    oval_object = oval_object + '''
+        '''.format(x+5000, rule_yaml['id'] + "_" + odv_label, x+5000))
+    sshd_config_pattern = ""
+    if "grep" in rule_yaml['check']:                        
+        regex = r"(?<=grep).*$"
+        matches = re.finditer(regex, rule_yaml['check'], re.MULTILINE)
+        matchy_match = ""
+        for matchNum, match in enumerate(matches, start=1):
+            matchy_match = match.group()
+        sshd_config_pattern = ""
+        if '"' in matchy_match:
+            sshd_config_pattern = matchy_match.split('"')[1]
+        elif "'" in matchy_match:
+            sshd_config_pattern = matchy_match.split("'")[1]
+
+    if "awk" in rule_yaml['check']:
+        matchy_match = rule_yaml['check'].split("'")[1].split("/")[1]
+        for item in rule_yaml['result']:
+            sshd_config_pattern = matchy_match + " " + str(rule_yaml['result'][item])
+
+    fragments['oval_object'].append('''
                 <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <behaviors ignore_case="true"/>
                 <filepath>/etc/ssh/sshd_config</filepath>
                 <pattern operation="pattern match">{}</pattern>
                 <instance datatype="int">1</instance>
-            </textfilecontent54_object>'''.format(x, rule_yaml['id'] + "_" + odv_label, sshd_config_pattern)
+            </textfilecontent54_object>'''.format(x, rule_yaml['id'] + "_" + odv_label, sshd_config_pattern))
 
 
-                    oval_object = oval_object + '''
+    fragments['oval_object'].append('''
                 <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}__sshd_config.d_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <behaviors ignore_case="true"/>
                 <path>/etc/ssh/sshd_config.d/</path>
                 <filename operation="pattern match">*</filename>
                 <pattern operation="pattern match">{}</pattern>
                 <instance datatype="int">1</instance>
-            </textfilecontent54_object>'''.format(x+5000, rule_yaml['id'] + "_" + odv_label, sshd_config_pattern)
-                    
-                
-                    x = x + 1
-                    continue
-                try:
-                    if "pmset" in command[3]:
-                        oval_definition = oval_definition + '''
+            </textfilecontent54_object>'''.format(x+5000, rule_yaml['id'] + "_" + odv_label, sshd_config_pattern))
+
+
+    fragments['x'] = x + 1
+    return TRANSLATED
+
+
+def translate_pmset(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    fragments['oval_definition'].append('''
                             <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                         <metadata> 
                             <title>{}</title> 
@@ -1769,37 +1514,38 @@ def generate_scap(all_rules, all_baselines, args):
                         <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
 
                     </criteria>
-                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x)
-                        
-                        oval_test = oval_test + '''
+                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x))
+
+    fragments['oval_test'].append('''
                 <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="at_least_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                     <object object_ref="oval:mscp:obj:{}" />
                     <state state_ref="oval:mscp:ste:{}" />
-                </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
-                        
-                        oval_object = oval_object + '''
+                </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
+
+    fragments['oval_object'].append('''
                 <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
-                    <filepath>/Library/Preferences/com.apple.PowerManagement.plist</filepath>'''.format(rule_yaml['id'] + "_" + odv_label,x)
-                        pmset_key = str()
-                        if "powernap" in rule_yaml['check']:
-                            pmset_key = "DarkWakeBackgroundTasks"
-                        if "womp" in rule_yaml['check']:
-                            pmset_key = "Wake On LAN"
-
-                        oval_object = oval_object + '''
+                    <filepath>/Library/Preferences/com.apple.PowerManagement.plist</filepath>'''.format(rule_yaml['id'] + "_" + odv_label,x))
+    pmset_key = str()
+    if "powernap" in rule_yaml['check']:
+        pmset_key = "DarkWakeBackgroundTasks"
+    if "womp" in rule_yaml['check']:
+        pmset_key = "Wake On LAN"
+
+    fragments['oval_object'].append('''
                     <xpath>boolean(plist/dict[key="AC Power"]/dict[key="{}"]/integer/text() = "{}")</xpath>
-                </plist511_object>'''.format(pmset_key,rule_yaml['fix'].split("----")[1].replace("\n","")[-1])
+                </plist511_object>'''.format(pmset_key,rule_yaml['fix'].split("----")[1].replace("\n","")[-1]))
 
-                        oval_state = oval_state + '''
+    fragments['oval_state'].append('''
                             <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
                 <value_of datatype="boolean" operation="equals">true</value_of>
-                </plist511_state>'''.format(rule_yaml['id'] + "_" + odv_label,x)
-                        x += 1
-                        continue
-                except:
-                    pass
-                if "socketfilterfw" in rule_yaml['check']:
-                    oval_definition = oval_definition + '''
+                </plist511_state>'''.format(rule_yaml['id'] + "_" + odv_label,x))
+    fragments['x'] = x + 1
+    return TRANSLATED
+
+
+def translate_socketfilterfw(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    fragments['oval_definition'].append('''
             <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -1812,36 +1558,38 @@ def generate_scap(all_rules, all_baselines, args):
 
                 </criteria>
             </definition>
-            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x)
-                    oval_test = oval_test + '''
+            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x))
+    fragments['oval_test'].append('''
             <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
             </plist511_test>
-            '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
+            '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
 
-                    if rule_yaml['check'].split()[1] == "--getloggingmode":
-                        firewall_variable = "loggingenabled"
-                    elif rule_yaml['check'].split()[1] == "--getstealthmode":
-                        firewall_variable = "stealthenabled"
-                    elif rule_yaml['check'].split()[1] == "--getglobalstate":
-                        firewall_variable = "globalstate"
+    if rule_yaml['check'].split()[1] == "--getloggingmode":
+        firewall_variable = "loggingenabled"
+    elif rule_yaml['check'].split()[1] == "--getstealthmode":
+        firewall_variable = "stealthenabled"
+    elif rule_yaml['check'].split()[1] == "--getglobalstate":
+        firewall_variable = "globalstate"
 
-                    oval_object = oval_object + '''
+    fragments['oval_object'].append('''
                 <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                 <filepath>/Library/Preferences/com.apple.alf.plist</filepath>
                 <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-            </plist511_object>'''.format(rule_yaml['id'] + "_" + odv_label,x,firewall_variable)
+            </plist511_object>'''.format(rule_yaml['id'] + "_" + odv_label,x,firewall_variable))
 
-                    oval_state = oval_state + '''
+    fragments['oval_state'].append('''
             <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
             <value_of datatype="int" operation="equals">1</value_of>
-            </plist511_state>'''.format(rule_yaml['id'] + "_" + odv_label,x)
-                    x += 1
-                    continue
-                try:
-                    if "systemsetup" in command[3]:
-                        oval_definition = oval_definition + '''
+            </plist511_state>'''.format(rule_yaml['id'] + "_" + odv_label,x))
+    fragments['x'] = x + 1
+    return TRANSLATED
+
+
+def translate_systemsetup(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    fragments['oval_definition'].append('''
                             <definitions>
                     <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                         <metadata> 
@@ -1854,48 +1602,46 @@ def generate_scap(all_rules, all_baselines, args):
                         <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
 
                     </criteria>
-                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x)
+                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x))
 
-                        oval_test = oval_test + '''
+    fragments['oval_test'].append('''
                         <systemsetup_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                     <object object_ref="oval:mscp:obj:{}" />
                     <state state_ref="oval:mscp:ste:{}" />
-                </systemsetup_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
+                </systemsetup_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
 
-                        oval_object = oval_object + '''
+    fragments['oval_object'].append('''
                     <systemsetup_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
-                </systemsetup_object>'''.format(rule_yaml['id'] + "_" + odv_label,x)
-                        state_test = ""
-                        if "-getnetworktimeserver" in rule_yaml['check']:
-                            
-                                timeservers = rule_yaml['result']['string']
-                            
-                                state_test = '''
+                </systemsetup_object>'''.format(rule_yaml['id'] + "_" + odv_label,x))
+    state_test = ""
+    if "-getnetworktimeserver" in rule_yaml['check']:
+
+            timeservers = rule_yaml['result']['string']
+
+            state_test = '''
                                 <networktimeserver datatype="string" operation="equals">{}</networktimeserver>
                                 '''.format(timeservers)
-                        oval_state = oval_state + '''
+    fragments['oval_state'].append('''
                             <systemsetup_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
                 {}
-                </systemsetup_state>'''.format(rule_yaml['id'] + "_" + odv_label,x,state_test)
+                </systemsetup_state>'''.format(rule_yaml['id'] + "_" + odv_label,x,state_test))
 
 
-                except:
-                    pass
+def translate_defaults_current_user_grep(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    abc = 0
 
-                abc = 0
-                if "defaults" in rule_yaml['check'] and "grep" in rule_yaml['check'] and "CURRENT_USER" in rule_yaml['check']:
-                    
-                    regex = r"(?<=\()(.*?)(?=\))"
+    regex = r"(?<=\()(.*?)(?=\))"
 
-                    test_str = rule_yaml['check'].split("grep")[1]
+    test_str = rule_yaml['check'].split("grep")[1]
 
-                    matches = re.finditer(regex, test_str, re.MULTILINE)
-                    matchy_match = ""
-                    for matchNum, match in enumerate(matches, start=1):
-                        matchy_match = match.group()
-                    
-                    
-                    oval_definition = oval_definition + '''
+    matches = re.finditer(regex, test_str, re.MULTILINE)
+    matchy_match = ""
+    for matchNum, match in enumerate(matches, start=1):
+        matchy_match = match.group()
+
+
+    fragments['oval_definition'].append('''
                         <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -1904,95 +1650,96 @@ def generate_scap(all_rules, all_baselines, args):
                         <description>{}</description> 
                     </metadata> 
                 <criteria>
-                    '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x)
-                    
-                    for multi_grep in matchy_match.split("|"):
-                        
-                        oval_definition = oval_definition + '''
+                    '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x))
+
+    for multi_grep in matchy_match.split("|"):
+
+        fragments['oval_definition'].append('''
                         <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
-                        '''.format(rule_yaml['id']+"_"+str(abc),x)
-                        
-                        oval_test = oval_test + '''
+                        '''.format(rule_yaml['id']+"_"+str(abc),x))
+
+        fragments['oval_test'].append('''
                         <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="any_exist" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
-            </plist511_test>'''.format(rule_yaml['id']+"_"+str(abc),x,x,x)
+            </plist511_test>'''.format(rule_yaml['id']+"_"+str(abc),x,x,x))
+
+        key = matchy_match.split("|")[abc].split(" = ")[0].replace("\"","")
+        value = matchy_match.split("|")[abc].split(" = ")[1].replace(";","")
+        if "$CURRENT_USER" in rule_yaml['check']:
 
-                        key = matchy_match.split("|")[abc].split(" = ")[0].replace("\"","")
-                        value = matchy_match.split("|")[abc].split(" = ")[1].replace(";","")
-                        if "$CURRENT_USER" in rule_yaml['check']:
-                            
 
-                            oval_object = oval_object + '''
+            fragments['oval_object'].append('''
                             <accountinfo_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory" id="oval:mscp:obj:{}" version="1">
                 <username operation="pattern match">.*</username>
                 <filter action="include" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5">oval:mscp:ste:{}</filter>
             </accountinfo_object>
-            '''.format(x+1999,x+1999)
+            '''.format(x+1999,x+1999))
 
-                            oval_state = oval_state + '''
+            fragments['oval_state'].append('''
                         <accountinfo_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory state" id="oval:mscp:ste:{}" version="1">
                 <username operation="pattern match">^[^_\s].*</username>
                 <uid datatype="int" operation="not equal">0</uid>
                 <gid datatype="int" operation="not equal">0</gid>
                 <login_shell operation="not equal">/usr/bin/false</login_shell>
-            </accountinfo_state>'''.format(x+1999)
-                            plist = rule_yaml['check'].split("read")[1].split()[0].replace(".plist","")
+            </accountinfo_state>'''.format(x+1999))
+            plist = rule_yaml['check'].split("read")[1].split()[0].replace(".plist","")
+
 
-                            
 
-                            oval_variable = oval_variable + '''
+            fragments['oval_variable'].append('''
         <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="uuid variable">
             <concat>
                 <object_component object_ref="oval:mscp:obj:{}" item_field="home_dir"/>
                 <literal_component datatype="string">/Library/Preferences/{}.</literal_component>                    
                 <literal_component datatype="string">plist</literal_component>
             </concat>
-        </local_variable>'''.format(x,x+1999,plist)
+        </local_variable>'''.format(x,x+1999,plist))
 
-        
-                        oval_object = oval_object + '''
+
+        fragments['oval_object'].append('''
                 <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
-                <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>'''.format(rule_yaml['id']+"_"+str(abc),x,x)
+                <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>'''.format(rule_yaml['id']+"_"+str(abc),x,x))
 
-                        oval_datatype = ""
-                        try:
-                            int(value)
-                            
-                            oval_datatype = "int"     
-                            oval_object = oval_object + '''
+        oval_datatype = ""
+        try:
+            int(value)
+
+            oval_datatype = "int"     
+            fragments['oval_object'].append('''
                             <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-                            </plist511_object>'''.format(key)
-                        except:
-                            if value.lower() == "true" or value.lower == "false":
-                                oval_datatype = "boolean"
-                                oval_object = oval_object + '''
+                            </plist511_object>'''.format(key))
+        except:
+            if value.lower() == "true" or value.lower == "false":
+                oval_datatype = "boolean"
+                fragments['oval_object'].append('''
                         <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-                    </plist511_object>'''.format(key)
-                            else:
-                                oval_datatype = "string"
-                                oval_object = oval_object + '''
+                    </plist511_object>'''.format(key))
+            else:
+                oval_datatype = "string"
+                fragments['oval_object'].append('''
                             <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-                            </plist511_object>'''.format(key)
-                        oval_state = oval_state + '''
+                            </plist511_object>'''.format(key))
+        fragments['oval_state'].append('''
             <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
             <value_of datatype="{}" operation="equals">{}</value_of>
-            </plist511_state>'''.format(rule_yaml['id']+"_"+str(abc),x,oval_datatype,value)
-                        
-                        abc =+ 1
-                        x = x+1
-                    oval_definition = oval_definition + '''</criteria>
-            </definition>'''
-                    oval_definition = re.sub('(?=\n\[NOTE\])(?s)(.*)\=\n<', '<', oval_definition)
-                    
-                    x = x+1
-                    break
+            </plist511_state>'''.format(rule_yaml['id']+"_"+str(abc),x,oval_datatype,value))
 
-                        
-                if "defaults" in rule_yaml['check']:
-                    
-                    if rule_yaml['id'] == "system_settings_hot_corners_secure" or rule_yaml['id'] == "sysprefs_hot_corners_secure":
-                        oval_definition = oval_definition + '''
+        abc =+ 1
+        x = x+1
+    fragments['oval_definition'].append('''</criteria>
+            </definition>''')
+    strip_note(fragments['oval_definition'], first_definition)
+
+    fragments['x'] = x + 1
+    return LAST_VARIANT
+
+
+def translate_defaults(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+
+    if rule_yaml['id'] == "system_settings_hot_corners_secure" or rule_yaml['id'] == "sysprefs_hot_corners_secure":
+        fragments['oval_definition'].append('''
                         <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -2006,37 +1753,37 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}_3" test_ref="oval:mscp:tst:{}" />
                     <criterion comment="{}_4" test_ref="oval:mscp:tst:{}" />
                 </criteria>
-            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label,x+5000,rule_yaml['id'] + "_" + odv_label,x+5001,rule_yaml['id'] + "_" + odv_label,x+5002)
-                    
-                        oval_test = oval_test + '''
+            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label,x+5000,rule_yaml['id'] + "_" + odv_label,x+5001,rule_yaml['id'] + "_" + odv_label,x+5002))
+
+        fragments['oval_test'].append('''
                         <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="all_exist" comment="{}_1_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
-            </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
+            </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
 
-                        oval_test = oval_test + '''
+        fragments['oval_test'].append('''
                         <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="all_exist" comment="{}_2_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
-            </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x+5000,x+5000,x+5000)
+            </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x+5000,x+5000,x+5000))
 
-                        oval_test = oval_test + '''
+        fragments['oval_test'].append('''
                         <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="all_exist" comment="{}_3_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
-            </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x+5001,x+5001,x+5001)
+            </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x+5001,x+5001,x+5001))
 
-                        oval_test = oval_test + '''
+        fragments['oval_test'].append('''
                         <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="all_exist" comment="{}_4_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
-            </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x+5002,x+5002,x+5002)
+            </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x+5002,x+5002,x+5002))
 
-                        plist = rule_yaml['check'].split("read")[1].split()[0].replace(".plist","")
-                        check_length = len(rule_yaml['check'].split())
-                        key = rule_yaml['check'].split("\n")[0].replace(" 2>/dev/null","").split()[-1].replace('"','').replace(")",'')
-                            
-                        oval_object = oval_object + '''
+        plist = rule_yaml['check'].split("read")[1].split()[0].replace(".plist","")
+        check_length = len(rule_yaml['check'].split())
+        key = rule_yaml['check'].split("\n")[0].replace(" 2>/dev/null","").split()[-1].replace('"','').replace(")",'')
+
+        fragments['oval_object'].append('''
                             <accountinfo_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory" id="oval:mscp:obj:{}" version="1">
                 <username operation="pattern match">.*</username>
                 <filter action="include" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5">oval:mscp:ste:{}</filter>
@@ -2044,80 +1791,80 @@ def generate_scap(all_rules, all_baselines, args):
             
             <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_1_object" id="oval:mscp:obj:{}" version="1">
                 <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>    
-            '''.format(x+1999,x+1999,rule_yaml['id'] + "_" + odv_label,x,x)
-                        oval_object = oval_object + '''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-        </plist511_object>'''.format(key)    
+            '''.format(x+1999,x+1999,rule_yaml['id'] + "_" + odv_label,x,x))
+        fragments['oval_object'].append('''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
+        </plist511_object>'''.format(key))    
 
-                        key = rule_yaml['check'].split("\n")[1].replace(" 2>/dev/null","").split()[-1].replace('"','').replace(")",'')
-                        
-                        oval_object = oval_object + '''
+        key = rule_yaml['check'].split("\n")[1].replace(" 2>/dev/null","").split()[-1].replace('"','').replace(")",'')
+
+        fragments['oval_object'].append('''
                         <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_2_object" id="oval:mscp:obj:{}" version="1">
                 <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>    
-            '''.format(rule_yaml['id'] + "_" + odv_label,x+5000,x)
+            '''.format(rule_yaml['id'] + "_" + odv_label,x+5000,x))
 
-                        oval_object = oval_object + '''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-        </plist511_object>'''.format(key)
+        fragments['oval_object'].append('''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
+        </plist511_object>'''.format(key))
 
-                        key = rule_yaml['check'].split("\n")[2].replace(" 2>/dev/null","").split()[-1].replace('"','').replace(")",'')
-                        
-                        oval_object = oval_object + '''
+        key = rule_yaml['check'].split("\n")[2].replace(" 2>/dev/null","").split()[-1].replace('"','').replace(")",'')
+
+        fragments['oval_object'].append('''
                         <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_3_object" id="oval:mscp:obj:{}" version="1">
                 <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>    
-            '''.format(rule_yaml['id'] + "_" + odv_label,x+5001,x)
+            '''.format(rule_yaml['id'] + "_" + odv_label,x+5001,x))
 
-                        oval_object = oval_object + '''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-        </plist511_object>'''.format(key)
+        fragments['oval_object'].append('''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
+        </plist511_object>'''.format(key))
 
-                        key = rule_yaml['check'].split("\n")[3].replace(" 2>/dev/null","").split()[-1].replace('"','').replace(")",'')
-                        
-                        oval_object = oval_object + '''
+        key = rule_yaml['check'].split("\n")[3].replace(" 2>/dev/null","").split()[-1].replace('"','').replace(")",'')
+
+        fragments['oval_object'].append('''
                         <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_4_object" id="oval:mscp:obj:{}" version="1">
                 <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>    
-            '''.format(rule_yaml['id'] + "_" + odv_label,x+5002,x)
-                        oval_object = oval_object + '''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-        </plist511_object>'''.format(key)
+            '''.format(rule_yaml['id'] + "_" + odv_label,x+5002,x))
+        fragments['oval_object'].append('''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
+        </plist511_object>'''.format(key))
 
-                        oval_state = oval_state + '''
+        fragments['oval_state'].append('''
                         <accountinfo_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory state" id="oval:mscp:ste:{}" version="1">
                 <username operation="pattern match">^[^_\s].*</username>
                 <uid datatype="int" operation="not equal">0</uid>
                 <gid datatype="int" operation="not equal">0</gid>
                 <login_shell operation="not equal">/usr/bin/false</login_shell>
-            </accountinfo_state>'''.format(x+1999)
-                        
-                        
-                        after_user = plist.split('"')[2]
-                        oval_variable = oval_variable + '''
+            </accountinfo_state>'''.format(x+1999))
+
+
+        after_user = plist.split('"')[2]
+        fragments['oval_variable'].append('''
             <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="uuid variable">
                 <concat>
                     <object_component object_ref="oval:mscp:obj:{}" item_field="home_dir"/>
                     <literal_component datatype="string">{}</literal_component>
                     <literal_component datatype="string">.plist</literal_component>
                 </concat>
-            </local_variable>'''.format(x,x+1999,after_user,x+999)
-                        try:
-                            check_if = rule_yaml['check'].split("\n")[5]
-                        
-                            modifier = 0
-                            for n in check_if.split():
-                                
-                                if n.replace('"',"").isdigit():
-                                    if modifier >= 4999:
-                                        modifier = modifier + 1
-                                    oval_state = oval_state + '''<plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_plist_state" id="oval:mscp:ste:{}" version="1">
+            </local_variable>'''.format(x,x+1999,after_user,x+999))
+        try:
+            check_if = rule_yaml['check'].split("\n")[5]
+
+            modifier = 0
+            for n in check_if.split():
+
+                if n.replace('"',"").isdigit():
+                    if modifier >= 4999:
+                        modifier = modifier + 1
+                    fragments['oval_state'].append('''<plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_plist_state" id="oval:mscp:ste:{}" version="1">
                         <value_of datatype="int" operation="not equal">{}</value_of>
-                    </plist511_state>'''.format(rule_yaml['id'] + "_" + odv_label,x+modifier,n.replace('"',""))
-                                    if modifier == 0:
-                                        modifier = 4999
-                            x = x + 1
-                            continue
-                        except:      
-                            x = x + 1  
-                            continue
-                    
+                    </plist511_state>'''.format(rule_yaml['id'] + "_" + odv_label,x+modifier,n.replace('"',"")))
+                    if modifier == 0:
+                        modifier = 4999
+            fragments['x'] = x + 1
+            return TRANSLATED
+        except:      
+            fragments['x'] = x + 1
+            return TRANSLATED
 
 
-                    oval_definition = oval_definition + '''
+
+    fragments['oval_definition'].append('''
                         <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -2128,32 +1875,32 @@ def generate_scap(all_rules, all_baselines, args):
                 <criteria>
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                 </criteria>
-            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x)
-                    
-                    oval_test = oval_test + '''
+            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x))
+
+    fragments['oval_test'].append('''
                         <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="all_exist" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                 <object object_ref="oval:mscp:obj:{}" />
                 <state state_ref="oval:mscp:ste:{}" />
-            </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
+            </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
 
-                    plist = rule_yaml['check'].split("read")[1].split()[0].replace(".plist","")
-                    
-                    if "ByHost" in rule_yaml['fix'] or "currentHost" in rule_yaml['fix']:
-                        
-                        oval_object = oval_object + '''
+    plist = rule_yaml['check'].split("read")[1].split()[0].replace(".plist","")
+
+    if "ByHost" in rule_yaml['fix'] or "currentHost" in rule_yaml['fix']:
+
+        fragments['oval_object'].append('''
                                     <systemprofiler_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}" id="oval:mscp:obj:{}" version="1">
             <data_type>SPHardwareDataType</data_type>
 
                 <xpath>//*[contains(text(), "platform_UUID")]/following-sibling::string[position()=1]/text()</xpath>
-            </systemprofiler_object> '''.format("hardware UUID",x+999)
+            </systemprofiler_object> '''.format("hardware UUID",x+999))
 
-                        if "$CURRENT_USER" in rule_yaml['check']:
-                            
-                            
-                            check_length = len(rule_yaml['check'].split())
-                            key = rule_yaml['check'].split()[check_length-1]
-                            
-                            oval_object = oval_object + '''
+        if "$CURRENT_USER" in rule_yaml['check']:
+
+
+            check_length = len(rule_yaml['check'].split())
+            key = rule_yaml['check'].split()[check_length-1]
+
+            fragments['oval_object'].append('''
                             <accountinfo_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory" id="oval:mscp:obj:{}" version="1">
                 <username operation="pattern match">.*</username>
                 <filter action="include" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5">oval:mscp:ste:{}</filter>
@@ -2161,26 +1908,26 @@ def generate_scap(all_rules, all_baselines, args):
             
             <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                 <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>    
-            '''.format(x+1999,x+1999,rule_yaml['id'] + "_" + odv_label,x,x)
-                            
-                            try: 
-                                rule_yaml['result']['boolean']
-                                oval_object = oval_object + '''
+            '''.format(x+1999,x+1999,rule_yaml['id'] + "_" + odv_label,x,x))
+
+            try: 
+                rule_yaml['result']['boolean']
+                fragments['oval_object'].append('''
                         <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-    </plist511_object>'''.format(key)
-                            except:
-                                
-                                oval_object = oval_object + '''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-            </plist511_object>'''.format(key)
-                            oval_state = oval_state + '''
+    </plist511_object>'''.format(key))
+            except:
+
+                fragments['oval_object'].append('''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
+            </plist511_object>'''.format(key))
+            fragments['oval_state'].append('''
                         <accountinfo_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory state" id="oval:mscp:ste:{}" version="1">
                 <username operation="pattern match">^[^_\s].*</username>
                 <uid datatype="int" operation="not equal">0</uid>
                 <gid datatype="int" operation="not equal">0</gid>
                 <login_shell operation="not equal">/usr/bin/false</login_shell>
-            </accountinfo_state>'''.format(x+1999)
-                            
-                            oval_variable = oval_variable + '''
+            </accountinfo_state>'''.format(x+1999))
+
+            fragments['oval_variable'].append('''
         <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="uuid variable">
             <concat>
                 <object_component object_ref="oval:mscp:obj:{}" item_field="home_dir"/>
@@ -2188,46 +1935,46 @@ def generate_scap(all_rules, all_baselines, args):
                 <object_component object_ref="oval:mscp:obj:{}" item_field="value_of"/>
                 <literal_component datatype="string">.plist</literal_component>
             </concat>
-        </local_variable>'''.format(x,x+1999,plist,x+999)
+        </local_variable>'''.format(x,x+1999,plist,x+999))
 
-                        
 
-                        else:
-                            
-                            check_length = len(rule_yaml['check'].split())
-                            key = rule_yaml['check'].replace(" 2>/dev/null","").split()[check_length-1]
 
-                            oval_object = oval_object + '''
+        else:
+
+            check_length = len(rule_yaml['check'].split())
+            key = rule_yaml['check'].replace(" 2>/dev/null","").split()[check_length-1]
+
+            fragments['oval_object'].append('''
             <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                 <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>
-                '''.format(rule_yaml['id'] + "_" + odv_label,x,x)
+                '''.format(rule_yaml['id'] + "_" + odv_label,x,x))
 
-                            try:
-                                rule_yaml['result']['boolean']
-                                oval_object = oval_object + '''
+            try:
+                rule_yaml['result']['boolean']
+                fragments['oval_object'].append('''
                         <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-            </plist511_object>'''.format(key)
-                            except:
-                                oval_object = oval_object + '''
+            </plist511_object>'''.format(key))
+            except:
+                fragments['oval_object'].append('''
                             <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-            </plist511_object>'''.format(key)
-                            
-                            oval_variable = oval_variable + '''       
+            </plist511_object>'''.format(key))
+
+            fragments['oval_variable'].append('''       
         <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="uuid variable">
             <concat>
                 <literal_component datatype="string">{}.</literal_component>
                 <object_component object_ref="oval:mscp:obj:{}" item_field="value_of"/>
                 <literal_component datatype="string">.plist</literal_component>
             </concat>
-        </local_variable>'''.format(x,plist,x+999)
-                    
-                    elif "$CURRENT_USER" in rule_yaml['check']:
-                        
-                            
-                        check_length = len(rule_yaml['check'].split())
-                        key = rule_yaml['check'].replace(" 2>/dev/null","").split()[-1]
-                        
-                        oval_object = oval_object + '''
+        </local_variable>'''.format(x,plist,x+999))
+
+    elif "$CURRENT_USER" in rule_yaml['check']:
+
+
+        check_length = len(rule_yaml['check'].split())
+        key = rule_yaml['check'].replace(" 2>/dev/null","").split()[-1]
+
+        fragments['oval_object'].append('''
                         <accountinfo_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory" id="oval:mscp:obj:{}" version="1">
             <username operation="pattern match">.*</username>
             <filter action="include" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5">oval:mscp:ste:{}</filter>
@@ -2235,97 +1982,98 @@ def generate_scap(all_rules, all_baselines, args):
         
         <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
             <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>    
-        '''.format(x+1999,x+1999,rule_yaml['id'] + "_" + odv_label,x,x)
-                        
-                        try: 
-                            rule_yaml['result']['boolean']
-                            oval_object = oval_object + '''
+        '''.format(x+1999,x+1999,rule_yaml['id'] + "_" + odv_label,x,x))
+
+        try: 
+            rule_yaml['result']['boolean']
+            fragments['oval_object'].append('''
                     <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-    </plist511_object>'''.format(key)
-                        except:
-                            
-                            oval_object = oval_object + '''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-        </plist511_object>'''.format(key)
-                        oval_state = oval_state + '''
+    </plist511_object>'''.format(key))
+        except:
+
+            fragments['oval_object'].append('''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
+        </plist511_object>'''.format(key))
+        fragments['oval_state'].append('''
                     <accountinfo_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory state" id="oval:mscp:ste:{}" version="1">
             <username operation="pattern match">^[^_\s].*</username>
             <uid datatype="int" operation="not equal">0</uid>
             <gid datatype="int" operation="not equal">0</gid>
             <login_shell operation="not equal">/usr/bin/false</login_shell>
-        </accountinfo_state>'''.format(x+1999)
-                        
-                        oval_variable = oval_variable + '''
+        </accountinfo_state>'''.format(x+1999))
+
+        fragments['oval_variable'].append('''
     <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="uuid variable">
         <concat>
             <object_component object_ref="oval:mscp:obj:{}" item_field="home_dir"/>
             <literal_component datatype="string">/Library/Preferences/{}.</literal_component>
             <literal_component datatype="string">plist</literal_component>
         </concat>
-    </local_variable>'''.format(x,x+1999,plist,x+999)
+    </local_variable>'''.format(x,x+1999,plist,x+999))
 
-                    else:
-                        
-                        if plist[-6:] != ".plist":
-                            plist = plist + ".plist"
-                        
-                        plist_key = rule_yaml['check'].replace(" 2>/dev/null","").split(" ")[3].rstrip()
-                        oval_object = oval_object + '''
+    else:
+
+        if plist[-6:] != ".plist":
+            plist = plist + ".plist"
+
+        plist_key = rule_yaml['check'].replace(" 2>/dev/null","").split(" ")[3].rstrip()
+        fragments['oval_object'].append('''
                         <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
-                        <filepath>{}</filepath>'''.format(rule_yaml['id'] + "_" + odv_label,x,plist)
-                        
-                        try:
-                            rule_yaml['result']['boolean']
-                            oval_object = oval_object + '''
+                        <filepath>{}</filepath>'''.format(rule_yaml['id'] + "_" + odv_label,x,plist))
+
+        try:
+            rule_yaml['result']['boolean']
+            fragments['oval_object'].append('''
                         <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-                        </plist511_object>'''.format(plist_key)
-                        except:
-                            oval_object = oval_object + '''
+                        </plist511_object>'''.format(plist_key))
+        except:
+            fragments['oval_object'].append('''
                             <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-                        </plist511_object>'''.format(plist_key)
-                        
-                        
-                    datatype = ""
-                    plist_key = rule_yaml['check'].split(" ")[3].rstrip()
-                    for key in rule_yaml['result']:
-                        datatype = key
-                    if datatype == "integer":
-                        oval_datatype = "int"
+                        </plist511_object>'''.format(plist_key))
 
-                    else:
-                        oval_datatype = datatype
 
-                    if oval_datatype == "boolean" and rule_yaml['result'][datatype] == 0:
-                        value = "false"
-                    elif oval_datatype == "boolean" and rule_yaml['result'][datatype] == 1:
-                        value = "true"
-                    else:
-                        value = rule_yaml['result'][datatype]
-                        
-                    oval_state = oval_state + '''
+    datatype = ""
+    plist_key = rule_yaml['check'].split(" ")[3].rstrip()
+    for key in rule_yaml['result']:
+        datatype = key
+    if datatype == "integer":
+        oval_datatype = "int"
+
+    else:
+        oval_datatype = datatype
+
+    if oval_datatype == "boolean" and rule_yaml['result'][datatype] == 0:
+        value = "false"
+    elif oval_datatype == "boolean" and rule_yaml['result'][datatype] == 1:
+        value = "true"
+    else:
+        value = rule_yaml['result'][datatype]
+
+    fragments['oval_state'].append('''
             <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
             <value_of datatype="{}" operation="equals">{}</value_of>
-            </plist511_state>'''.format(rule_yaml['id'] + "_" + odv_label,x,oval_datatype,value)
-                    oval_definition = re.sub('(?=\n\[NOTE\])(?s)(.*)\=\n<', '<', oval_definition)
-                    x = x+1
-                
-                    continue
-                try:
-                    if "security" in command[3]:
-                        if rule_yaml['check'].split()[1] == "authorizationdb":
-                            check = rule_yaml['check'].split("|")
-                            
-                            authdb = rule_yaml['check'].split()[3]
-                            if len(check) > 2:
+            </plist511_state>'''.format(rule_yaml['id'] + "_" + odv_label,x,oval_datatype,value))
+    strip_note(fragments['oval_definition'], first_definition)
+    fragments['x'] = x + 1
+    return TRANSLATED
 
-                                matches = re.findall(r'(?<=\>)(.*)(?=\<)',check[1])
-                                key = str(matches).replace("[","").replace("]","").replace("'","")
 
-                                length = len(check[2].split())
-                                
-                                last_string = check[2].split()[length-1].replace('"',"").replace("<","").replace(">","").replace("/","")
-                                
+def translate_security(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    if rule_yaml['check'].split()[1] == "authorizationdb":
+        check = rule_yaml['check'].split("|")
+
+        authdb = rule_yaml['check'].split()[3]
+        if len(check) > 2:
+
+            matches = re.findall(r'(?<=\>)(.*)(?=\<)',check[1])
+            key = str(matches).replace("[","").replace("]","").replace("'","")
 
-                                oval_definition = oval_definition + '''
+            length = len(check[2].split())
+
+            last_string = check[2].split()[length-1].replace('"',"").replace("<","").replace(">","").replace("/","")
+
+
+            fragments['oval_definition'].append('''
                                     <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                         <metadata> 
                             <title>{}</title> 
@@ -2337,29 +2085,29 @@ def generate_scap(all_rules, all_baselines, args):
                         <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
 
                     </criteria>
-                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x)
+                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x))
 
-                                oval_test = oval_test + '''
+            fragments['oval_test'].append('''
                                     <authorizationdb_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                     <object object_ref="oval:mscp:obj:{}" />
                     <state state_ref="oval:mscp:ste:{}" />
-                </authorizationdb_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
-                                
-                                oval_object = oval_object + '''
+                </authorizationdb_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
+
+            fragments['oval_object'].append('''
                                     <authorizationdb_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                     <right_name>{}</right_name>
                     <xpath>boolean(//key[text()="{}"]/following-sibling::{})</xpath>
-                </authorizationdb_object>  '''.format(rule_yaml['id'] + "_" + odv_label,x,authdb,key,last_string)
+                </authorizationdb_object>  '''.format(rule_yaml['id'] + "_" + odv_label,x,authdb,key,last_string))
 
-                                oval_state = oval_state  + '''
+            fragments['oval_state'].append('''
                     <authorizationdb_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
                     
                 <value_of datatype="boolean" operation="equals">true</value_of>
-                </authorizationdb_state>'''.format(rule_yaml['id'] + "_" + odv_label,x)
-                            else:
-                                key = (check[1].split()[2].replace("'",""))
+                </authorizationdb_state>'''.format(rule_yaml['id'] + "_" + odv_label,x))
+        else:
+            key = (check[1].split()[2].replace("'",""))
 
-                                oval_definition = oval_definition + '''
+            fragments['oval_definition'].append('''
                 <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                         <metadata> 
                             <title>{}</title> 
@@ -2370,34 +2118,34 @@ def generate_scap(all_rules, all_baselines, args):
                     <criteria>
                         <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                     </criteria>
-                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x)
+                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x))
 
-                                oval_test = oval_test + '''
+            fragments['oval_test'].append('''
                 <authorizationdb_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                     <object object_ref="oval:mscp:obj:{}" />
                     <state state_ref="oval:mscp:ste:{}" />
-                </authorizationdb_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
+                </authorizationdb_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
 
-                                oval_object = oval_object + '''
+            fragments['oval_object'].append('''
                                 <authorizationdb_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                     <right_name>{}</right_name>
                     <xpath>//*[contains(text(), "{}")]/text()</xpath>
-                </authorizationdb_object>  '''.format(rule_yaml['id'] + "_" + odv_label,x,authdb,key)
+                </authorizationdb_object>  '''.format(rule_yaml['id'] + "_" + odv_label,x,authdb,key))
 
-                                oval_state = oval_state + '''
+            fragments['oval_state'].append('''
                                     <authorizationdb_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_test" id="oval:mscp:ste:{}" version="1">
                     <value_of>{}</value_of>
-                </authorizationdb_state>'''.format(rule_yaml['id'] + "_" + odv_label,x,key)
-                        
-                        else:
-                            if "authorizationdb" in rule_yaml['check']:
-                                regex = r"=\(.*.\)"
-                                matchy_match = []
-                                matches = re.finditer(regex, rule_yaml['check'], re.MULTILINE)
-                                for matchNum, match in enumerate(matches, start=1):
-                                    matchy_match = match.group().replace('=(',"").replace(")","").replace('"','').split()
-                                
-                                oval_definition = oval_definition + '''
+                </authorizationdb_state>'''.format(rule_yaml['id'] + "_" + odv_label,x,key))
+
+    else:
+        if "authorizationdb" in rule_yaml['check']:
+            regex = r"=\(.*.\)"
+            matchy_match = []
+            matches = re.finditer(regex, rule_yaml['check'], re.MULTILINE)
+            for matchNum, match in enumerate(matches, start=1):
+                matchy_match = match.group().replace('=(',"").replace(")","").replace('"','').split()
+
+            fragments['oval_definition'].append('''
                                     <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                         <metadata> 
                             <title>{}</title> 
@@ -2405,45 +2153,47 @@ def generate_scap(all_rules, all_baselines, args):
                             <reference source="macos_security" ref_id="{}"/>
                             <description>{}</description> 
                         </metadata> 
-                    <criteria operator="AND">'''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'])
+                    <criteria operator="AND">'''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion']))
+
+            for match in matchy_match:
 
-                                for match in matchy_match:
-                                    
-                                    oval_definition = oval_definition + '''
+                fragments['oval_definition'].append('''
                                 <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
-                                '''.format(rule_yaml['id'] + "+" + match, x)
-                                    oval_test = oval_test + '''
+                                '''.format(rule_yaml['id'] + "+" + match, x))
+                fragments['oval_test'].append('''
                                     <authorizationdb_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                     <object object_ref="oval:mscp:obj:{}" />
                     <state state_ref="oval:mscp:ste:{}" />
-                </authorizationdb_test>'''.format(match,x,x,x)
-                                    key="shared"
-                                    value=""
-                                    if "false" in rule_yaml["check"]: 
-                                        value="false"
-                                    else:
-                                        value="true"
-
-                                    oval_object = oval_object + '''
+                </authorizationdb_test>'''.format(match,x,x,x))
+                key="shared"
+                value=""
+                if "false" in rule_yaml["check"]: 
+                    value="false"
+                else:
+                    value="true"
+
+                fragments['oval_object'].append('''
                                     <authorizationdb_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                     <right_name>{}</right_name>
                     <xpath>boolean(//key[text()="{}"]/following-sibling::{})</xpath>
-                </authorizationdb_object>  '''.format(match,x,match,key,value)
+                </authorizationdb_object>  '''.format(match,x,match,key,value))
 
-                                    oval_state = oval_state  + '''
+                fragments['oval_state'].append('''
                     <authorizationdb_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
                     
                 <value_of datatype="boolean" operation="equals">true</value_of>
-                </authorizationdb_state>'''.format(match,x)
-                                    x += 1
-                                
-                                oval_definition = oval_definition + "</criteria></definition>"
-                        x += 1
-                        continue
-                except:
-                    pass
-                if "/bin/rm" in rule_yaml['fix'] and "/bin/ls" in rule_yaml['check']:
-                    oval_definition = oval_definition + '''
+                </authorizationdb_state>'''.format(match,x))
+                x += 1
+                fragments['x'] = x
+
+            fragments['oval_definition'].append("</criteria></definition>")
+    fragments['x'] = x + 1
+    return TRANSLATED
+
+
+def translate_rm_ls(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    fragments['oval_definition'].append('''
                     <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -2455,28 +2205,29 @@ def generate_scap(all_rules, all_baselines, args):
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                 
                 </criteria> 
-            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x)
-                    oval_test = oval_test + '''
+            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x))
+    fragments['oval_test'].append('''
                             <file_test id="oval:mscp:tst:{}" version="1" comment="{}_test" check_existence="none_exist" check="none satisfy" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix">
                 <object object_ref="oval:mscp:obj:{}"/>
-            </file_test>'''.format(x,rule_yaml['id'] + "_" + odv_label,x)
+            </file_test>'''.format(x,rule_yaml['id'] + "_" + odv_label,x))
 
-                    path = rule_yaml['fix'].split("----")[1].split(" ")[-1]
-                    
-                    oval_object = oval_object + '''
+    path = rule_yaml['fix'].split("----")[1].split(" ")[-1]
+
+    fragments['oval_object'].append('''
             <file_object id="oval:mscp:obj:{}" version="1" comment="{}_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix">
                 <path>{}</path>
                 <filename xsi:nil="true" />            
-            </file_object>'''.format(x,rule_yaml['id'] + "_" + odv_label,path.rstrip())
-                    x += 1
-                    continue
+            </file_object>'''.format(x,rule_yaml['id'] + "_" + odv_label,path.rstrip()))
+    fragments['x'] = x + 1
+    return TRANSLATED
 
-                try:
-                    if "ls" in command[2] or "stat" in command[3].split()[0]:
-                        if '/Library/Security/PolicyBanner.rtf' in rule_yaml['check']:
-                            
-                            
-                            oval_definition = oval_definition + '''
+
+def translate_file_attributes(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    if '/Library/Security/PolicyBanner.rtf' in rule_yaml['check']:
+
+
+        fragments['oval_definition'].append('''
                         <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                         <metadata> 
                             <title>{}</title> 
@@ -2488,17 +2239,17 @@ def generate_scap(all_rules, all_baselines, args):
                         <criterion comment="{}_rtf_enforce" test_ref="oval:mscp:tst:{}" />
                         <criterion comment="{}_rtfd_enforce" test_ref="oval:mscp:tst:{}" />
                     </criteria> 
-                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label,x+2999)
+                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label,x+2999))
 
-                            oval_test = oval_test + '''
+        fragments['oval_test'].append('''
                                 <file_test id="oval:mscp:tst:{}" version="1" comment="{}_rtf_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix">
                     <object object_ref="oval:mscp:obj:{}"/>
                 </file_test>
                 <file_test id="oval:mscp:tst:{}" version="1" comment="{}_rtfd_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix">
                     <object object_ref="oval:mscp:obj:{}"/>
-                </file_test>'''.format(x,rule_yaml['id'] + "_" + odv_label,x,x+2999,rule_yaml['id'] + "_" + odv_label,x+2999)
+                </file_test>'''.format(x,rule_yaml['id'] + "_" + odv_label,x,x+2999,rule_yaml['id'] + "_" + odv_label,x+2999))
 
-                            oval_object = oval_object + '''
+        fragments['oval_object'].append('''
                 <file_object id="oval:mscp:obj:{}" version="1" comment="{}_rtf_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix">
                     <path>/Library/Security/PolicyBanner.rtf</path>
                     <filename xsi:nil="true" />            
@@ -2506,51 +2257,51 @@ def generate_scap(all_rules, all_baselines, args):
                 <file_object id="oval:mscp:obj:{}" version="1" comment="{}_rtfd_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix">
                     <path>/Library/Security/PolicyBanner.rtfd</path>
                     <filename xsi:nil="true" />            
-                </file_object>'''.format(x,rule_yaml['id'] + "_" + odv_label,x+2999,rule_yaml['id'])
-                            x = x + 1
-                            continue
-                    
-                        s = rule_yaml['check']
-                        config_file = str()
-                        oval_variable_need = bool()
-                        if "grep" in s.split()[2]:
-                            
-                            
-                            oval_variable_need = True
-                            grep_search = re.search('\((.*?)\)', s).group(1)
-                        
-                            substring = grep_search.split("|")[0]
-                            regex = re.search('\'(.*?)\'', substring).group(1)
-                            
-                            try:
-                                regex = re.search('/(.*?)/', regex).group(1)
-                            except:
-                                regex = regex
+                </file_object>'''.format(x,rule_yaml['id'] + "_" + odv_label,x+2999,rule_yaml['id']))
+        fragments['x'] = x + 1
+        return TRANSLATED
+
+    s = rule_yaml['check']
+    config_file = str()
+    oval_variable_need = bool()
+    if "grep" in s.split()[2]:
 
-                            config_file = substring = grep_search.split("|")[0].split()[-1]                    
 
-                            oval_object = oval_object + '''
+        oval_variable_need = True
+        grep_search = re.search('\((.*?)\)', s).group(1)
+
+        substring = grep_search.split("|")[0]
+        regex = re.search('\'(.*?)\'', substring).group(1)
+
+        try:
+            regex = re.search('/(.*?)/', regex).group(1)
+        except:
+            regex = regex
+
+        config_file = substring = grep_search.split("|")[0].split()[-1]                    
+
+        fragments['oval_object'].append('''
                 <textfilecontent54_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent" version="1" comment="{}_var_object" id="oval:mscp:obj:{}">
                     <filepath datatype="string" operation="equals">{}</filepath>
                     <pattern datatype="string" operation="pattern match">{}:\s*(.*)$</pattern>
                     <instance datatype="int" operation="greater than or equal">1</instance>
                 </textfilecontent54_object>
-                '''.format(rule_yaml['id'] + "_" + odv_label, x+999, config_file, regex)
+                '''.format(rule_yaml['id'] + "_" + odv_label, x+999, config_file, regex))
 
-                            oval_variable = oval_variable + '''
+        fragments['oval_variable'].append('''
                     <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="{}_var">
                     <object_component object_ref="oval:mscp:obj:{}" item_field="subexpression"/>
-                    </local_variable>'''.format(x,rule_yaml['id'] + "_" + odv_label,x+999)
-                        
-                        else:
-                            oval_variable_need = False
-                            config_file = s.split()[2]
+                    </local_variable>'''.format(x,rule_yaml['id'] + "_" + odv_label,x+999))
 
-                        s = rule_yaml['fix']
+    else:
+        oval_variable_need = False
+        config_file = s.split()[2]
 
-                        fix_command = re.search('-\n(.*?)\n-', s).group(1).split('$')[0]
-                    
-                        oval_definition = oval_definition + '''
+    s = rule_yaml['fix']
+
+    fix_command = re.search('-\n(.*?)\n-', s).group(1).split('$')[0]
+
+    fragments['oval_definition'].append('''
                         
                     <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                         <metadata> 
@@ -2563,203 +2314,204 @@ def generate_scap(all_rules, all_baselines, args):
                         <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                     </criteria> 
                 </definition> 
-            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x)
+            '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x))
 
-                        oval_test = oval_test + '''
+    fragments['oval_test'].append('''
                 <file_test id="oval:mscp:tst:{}" version="1" comment="{}_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix">
                     <object object_ref="oval:mscp:obj:{}"/>
                     <state state_ref="oval:mscp:ste:{}"/>
-                </file_test>'''.format(x,rule_yaml['id'] + "_" + odv_label,x,x)
-                        
-                        if "-" in fix_command and "R" in fix_command or rule_yaml['fix'].split("\n")[2][-1] == "*":
-                            behavior = '<behaviors recurse="symlinks and directories" recurse_direction="down" max_depth="-1" recurse_file_system="local"></behaviors>'
-                            if "audit" in rule_yaml['id']:
-                                filename = '<filename datatype="string" operation="not equal">current</filename>'
-                        else:
-                            behavior = ""
-                            filename = '<filename xsi:nil="true"/>'
+                </file_test>'''.format(x,rule_yaml['id'] + "_" + odv_label,x,x))
+
+    if "-" in fix_command and "R" in fix_command or rule_yaml['fix'].split("\n")[2][-1] == "*":
+        behavior = '<behaviors recurse="symlinks and directories" recurse_direction="down" max_depth="-1" recurse_file_system="local"></behaviors>'
+        if "audit" in rule_yaml['id']:
+            filename = '<filename datatype="string" operation="not equal">current</filename>'
+    else:
+        behavior = ""
+        filename = '<filename xsi:nil="true"/>'
 
-                        if oval_variable_need == True:
-                            oval_object = oval_object + '''
+    if oval_variable_need == True:
+        fragments['oval_object'].append('''
                     <file_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix" version="1" comment="{}_object" id="oval:mscp:obj:{}">
                     {}
                     <path datatype="string" operation="equals" var_ref="oval:mscp:var:{}"></path>
                     {}
-                    </file_object>'''.format(rule_yaml['id'] + "_" + odv_label,x,behavior,x,filename)
-                        else:
-                            oval_object = oval_object + '''
+                    </file_object>'''.format(rule_yaml['id'] + "_" + odv_label,x,behavior,x,filename))
+    else:
+        fragments['oval_object'].append('''
                     <file_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix" version="1" comment="{}_object" id="oval:mscp:obj:{}">
                     {}
                     <filepath datatype="string" operation="equals">{}</filepath>
                     
-                    </file_object>'''.format(rule_yaml['id'] + "_" + odv_label,x,behavior,config_file)
-                        state_test = ""
-                        if "-" in fix_command and "N" in fix_command and "chmod" in fix_command:
-                            state_test = '''
+                    </file_object>'''.format(rule_yaml['id'] + "_" + odv_label,x,behavior,config_file))
+    state_test = ""
+    if "-" in fix_command and "N" in fix_command and "chmod" in fix_command:
+        state_test = '''
                             <has_extended_acl datatype="boolean">false</has_extended_acl>
                             '''
-                        
-                        elif "chgrp" in fix_command:
-                            state_test = '''
+
+    elif "chgrp" in fix_command:
+        state_test = '''
                             <group_id>{}</group_id>
                             '''.format(rule_yaml['result']['integer'])
 
-                        elif "chown" in fix_command:
-                    
-                            state_test = '''
+    elif "chown" in fix_command:
+
+        state_test = '''
                             <user_id>{}</user_id>
                             '''.format(rule_yaml['result']['integer'])
-                
 
-                        elif "chmod" in fix_command:
-                            
-                            perms = fix_command.split()[1]
-                            
-                            if perms[0] == "0":
-                                state_test = '''
+
+    elif "chmod" in fix_command:
+
+        perms = fix_command.split()[1]
+
+        if perms[0] == "0":
+            state_test = '''
                 <uread datatype="boolean">false</uread>
                 <uwrite datatype="boolean">false</uwrite>
                 <uexec datatype="boolean">false</uexec>'''
-                            if perms[0] == "1":
-                                state_test = '''
+        if perms[0] == "1":
+            state_test = '''
                 <uread datatype="boolean">false</uread>
                 <uwrite datatype="boolean">false</uwrite>
                 <uexec datatype="boolean">true</uexec>'''
-                            elif perms[0] == "2":
-                                state_test = '''
+        elif perms[0] == "2":
+            state_test = '''
                 <uread datatype="boolean">false</uread>
                 <uwrite datatype="boolean">true</uwrite>
                 <uexec datatype="boolean">false</uexec>'''
-                            elif perms[0] == "3":
-                                state_test = '''
+        elif perms[0] == "3":
+            state_test = '''
                 <uread datatype="boolean">false</uread>
                 <uwrite datatype="boolean">true</uwrite>
                 <uexec datatype="boolean">true</uexec>'''
-                            elif perms[0] == "4":
-                                
-                                state_test = '''
+        elif perms[0] == "4":
+
+            state_test = '''
                 <uread datatype="boolean">true</uread>
                 <uwrite datatype="boolean">false</uwrite>
                 <uexec datatype="boolean">false</uexec>'''
-                            elif perms[0] == "5":
-                                state_test = '''
+        elif perms[0] == "5":
+            state_test = '''
                 <uread datatype="boolean">true</uread>
                 <uwrite datatype="boolean">false</uwrite>
                 <uexec datatype="boolean">true</uexec>'''
-                            elif perms[0] == "6":
-                                state_test = '''
+        elif perms[0] == "6":
+            state_test = '''
                 <uread datatype="boolean">true</uread>
                 <uwrite datatype="boolean">true</uwrite>
                 <uexec datatype="boolean">false</uexec>'''
-                            elif perms[0] == "7":
-                                state_test = '''
+        elif perms[0] == "7":
+            state_test = '''
                 <uread datatype="boolean">true</uread>
                 <uwrite datatype="boolean">true</uwrite>
                 <uexec datatype="boolean">true</uexec>'''
-                            
-                            if perms[1] == "0":
-                                state_test = state_test + '''
+
+        if perms[1] == "0":
+            state_test = state_test + '''
                 <gread datatype="boolean">false</gread>
                 <gwrite datatype="boolean">false</gwrite>
                 <gexec datatype="boolean">false</gexec>'''
-                            elif perms[1] == "1":
-                                state_test = state_test + '''
+        elif perms[1] == "1":
+            state_test = state_test + '''
                 <gread datatype="boolean">false</gread>
                 <gwrite datatype="boolean">false</gwrite>
                 <gexec datatype="boolean">true</gexec>'''
-                            elif perms[1] == "2":
-                                state_test = state_test + '''
+        elif perms[1] == "2":
+            state_test = state_test + '''
                 <gread datatype="boolean">false</gread>
                 <gwrite datatype="boolean">true</gwrite>
                 <gexec datatype="boolean">false</gexec>'''
-                            elif perms[1] == "3":
-                                state_test = state_test + '''
+        elif perms[1] == "3":
+            state_test = state_test + '''
                 <gread datatype="boolean">false</gread>
                 <gwrite datatype="boolean">true</gwrite>
                 <gexec datatype="boolean">true</gexec>'''
-                            elif perms[1] == "4":
-                                
-                                state_test = state_test + '''
+        elif perms[1] == "4":
+
+            state_test = state_test + '''
                 <gread datatype="boolean">true</gread>
                 <gwrite datatype="boolean">false</gwrite>
                 <gexec datatype="boolean">false</gexec>'''
-                            elif perms[1] == "5":
-                                state_test = state_test + '''
+        elif perms[1] == "5":
+            state_test = state_test + '''
                 <gread datatype="boolean">true</gread>
                 <gwrite datatype="boolean">false</gwrite>
                 <gexec datatype="boolean">true</gexec>'''
-                            elif perms[1] == "6":
-                                state_test = state_test + '''
+        elif perms[1] == "6":
+            state_test = state_test + '''
                 <gread datatype="boolean">true</gread>
                 <gwrite datatype="boolean">true</gwrite>
                 <gexec datatype="boolean">false</gexec>'''
-                            elif perms[1] == "7":
-                                state_test = state_test + '''
+        elif perms[1] == "7":
+            state_test = state_test + '''
                 <gread datatype="boolean">true</gread>
                 <gwrite datatype="boolean">true</gwrite>
                 <gexec datatype="boolean">true</gexec>'''
 
-                            if perms[2] == "0":
-                                
-                                state_test = state_test + '''
+        if perms[2] == "0":
+
+            state_test = state_test + '''
                 <oread datatype="boolean">false</oread>
                 <owrite datatype="boolean">false</owrite>
                 <oexec datatype="boolean">false</oexec>'''        
-                            if perms[2] == "1":
-                                state_test = state_test + '''
+        if perms[2] == "1":
+            state_test = state_test + '''
                 <oread datatype="boolean">false</oread>
                 <owrite datatype="boolean">false</owrite>
                 <oexec datatype="boolean">true</oexec>'''
-                            elif perms[2] == "1":
-                                state_test = state_test + '''
+        elif perms[2] == "1":
+            state_test = state_test + '''
                 <oread datatype="boolean">false</oread>
                 <owrite datatype="boolean">false</owrite>
                 <oexec datatype="boolean">true</oexec>'''
-                            elif perms[2] == "2":
-                                state_test = state_test + '''
+        elif perms[2] == "2":
+            state_test = state_test + '''
                 <oread datatype="boolean">false</oread>
                 <owrite datatype="boolean">true</owrite>
                 <oexec datatype="boolean">false</oexec>'''
-                            elif perms[2] == "3":
-                                state_test = state_test + '''
+        elif perms[2] == "3":
+            state_test = state_test + '''
                 <oread datatype="boolean">false</oread>
                 <owrite datatype="boolean">true</owrite>
                 <oexec datatype="boolean">true</oexec>'''
-                            elif perms[2] == "4":
-                                state_test = state_test + '''
+        elif perms[2] == "4":
+            state_test = state_test + '''
                 <oread datatype="boolean">true</oread>
                 <owrite datatype="boolean">false</owrite>
                 <oexec datatype="boolean">false</oexec>'''
-                            elif perms[2] == "5":
-                                state_test = state_test + '''
+        elif perms[2] == "5":
+            state_test = state_test + '''
                 <oread datatype="boolean">true</oread>
                 <owrite datatype="boolean">false</owrite>
                 <oexec datatype="boolean">true</oexec>'''
-                            elif perms[2] == "6":
-                                state_test = state_test + '''
+        elif perms[2] == "6":
+            state_test = state_test + '''
                 <oread datatype="boolean">true</oread>
                 <owrite datatype="boolean">true</owrite>
                 <oexec datatype="boolean">false</oexec>'''
-                            elif perms[2] == "7":
-                                state_test = state_test + '''
+        elif perms[2] == "7":
+            state_test = state_test + '''
                 <oread datatype="boolean">true</oread>
                 <owrite datatype="boolean">true</owrite>
                 <oexec datatype="boolean">true</oexec>'''
 
-                        oval_state = oval_state + '''
+    fragments['oval_state'].append('''
                 <file_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#unix" version="1" comment="{}_state" id="oval:mscp:ste:{}">'''.format(rule_yaml['id'] + "_" + odv_label,x) + state_test + '''
                 </file_state>
-                        '''
-                    
-                        x += 1
-                        continue
-                except:
-                    pass
-                try:
-                    if "dscl" in command[3]:
-                            if "UserShell" in rule_yaml['check']:
-                                shell = rule_yaml['check'].split()[9].replace('"','')
-                                oval_definition = oval_definition + '''
+                        ''')
+
+    fragments['x'] = x + 1
+    return TRANSLATED
+
+
+def translate_dscl(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    command = rule_yaml['check'].split("/")
+    if "UserShell" in rule_yaml['check']:
+        shell = rule_yaml['check'].split()[9].replace('"','')
+        fragments['oval_definition'].append('''
                 <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                         <metadata> 
                             <title>{}</title> 
@@ -2771,70 +2523,70 @@ def generate_scap(all_rules, all_baselines, args):
                         <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                     </criteria>
                 </definition> 
-                '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x)
-                                
-                                oval_test = oval_test + '''
+                '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x))
+
+        fragments['oval_test'].append('''
                 <accountinfo_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                     <object object_ref="oval:mscp:obj:{}" />
                     <state state_ref="oval:mscp:ste:{}" />
                 </accountinfo_test>
-                '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
+                '''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
 
-                                oval_object = oval_object + '''
+        fragments['oval_object'].append('''
                     <accountinfo_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
                 <username>{}</username>
                 </accountinfo_object>
-                '''.format(rule_yaml['id'] + "_" + odv_label,x,command[5].split()[0])
-                                
-                                oval_state = oval_state + '''
+                '''.format(rule_yaml['id'] + "_" + odv_label,x,command[5].split()[0]))
+
+        fragments['oval_state'].append('''
                                 <accountinfo_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
                 <login_shell>{}</login_shell>
                 </accountinfo_state>
-                '''.format(rule_yaml['id'] + "_" + odv_label,x,shell)
-                                x += 1
-                                continue
-                except:
-                    pass
-                try:
-                    if "awk" in command[3]:
-                        awk_file = ""
-                        awk_search = ""
-                        field_sep = ""
-                        
-                        if "grep -qE" in rule_yaml['fix']:
-                            awk_file = rule_yaml['fix'].split(" ")[3].strip(" ")
-                            awk_search = rule_yaml['fix'].split(" ")[2].strip("\"")
-                            
-                        elif "grep" in rule_yaml['check']:
+                '''.format(rule_yaml['id'] + "_" + odv_label,x,shell))
+        fragments['x'] = x + 1
+        return TRANSLATED
 
-                            awk_file = rule_yaml['check'].split("|")[0].split(" ")[-2]
-                            awk_search = rule_yaml['check'].split("|")[-1].split(" ")[-2].strip("\'")
-                            
-                        else:
-                            awk_file = rule_yaml['check'].split("'")[2].strip(" ")
-                            awk_search = rule_yaml['check'].split("'")[1].split("/")[1]
-                            
-                            try: 
-                                field_sep = rule_yaml['check'].split("-F")[1].split(" ")[0].replace('\"',"")
 
-                            except:
-                                field_sep = " "
+def translate_awk(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    awk_file = ""
+    awk_search = ""
+    field_sep = ""
 
-                            try: 
-                        
-                                awk_result = rule_yaml['result']['string']
+    if "grep -qE" in rule_yaml['fix']:
+        awk_file = rule_yaml['fix'].split(" ")[3].strip(" ")
+        awk_search = rule_yaml['fix'].split(" ")[2].strip("\"")
 
-                            except: 
-                                
-                                awk_result = str(rule_yaml['result']['integer'])
-                            
-                            if awk_search[0] != "^":
-                                awk_search = "^" + awk_search + field_sep + awk_result
-                            else:
-                                awk_search = awk_search + field_sep + awk_result
+    elif "grep" in rule_yaml['check']:
 
-                        
-                        oval_definition = oval_definition + '''
+        awk_file = rule_yaml['check'].split("|")[0].split(" ")[-2]
+        awk_search = rule_yaml['check'].split("|")[-1].split(" ")[-2].strip("\'")
+
+    else:
+        awk_file = rule_yaml['check'].split("'")[2].strip(" ")
+        awk_search = rule_yaml['check'].split("'")[1].split("/")[1]
+
+        try: 
+            field_sep = rule_yaml['check'].split("-F")[1].split(" ")[0].replace('\"',"")
+
+        except:
+            field_sep = " "
+
+        try: 
+
+            awk_result = rule_yaml['result']['string']
+
+        except: 
+
+            awk_result = str(rule_yaml['result']['integer'])
+
+        if awk_search[0] != "^":
+            awk_search = "^" + awk_search + field_sep + awk_result
+        else:
+            awk_search = awk_search + field_sep + awk_result
+
+
+    fragments['oval_definition'].append('''
                 <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                         <metadata> 
                             <title>{}</title> 
@@ -2845,33 +2597,33 @@ def generate_scap(all_rules, all_baselines, args):
                     <criteria> 
                         <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                     </criteria> 
-                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x)
-                        oval_test = oval_test + '''
+                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x))
+    fragments['oval_test'].append('''
                         <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                     <object object_ref="oval:mscp:obj:{}"/>
                 </textfilecontent54_test>
-                '''.format(x, rule_yaml['id'] + "_" + odv_label, x)
-                        oval_object = oval_object + '''
+                '''.format(x, rule_yaml['id'] + "_" + odv_label, x))
+    fragments['oval_object'].append('''
                         <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                     <filepath>{}</filepath>
                     <pattern operation="pattern match">{}</pattern>
                     <instance datatype="int">1</instance>
                 </textfilecontent54_object>
-                '''.format(x,rule_yaml['id'] + "_" + odv_label,awk_file.rstrip(), awk_search)
-                        x += 1
-                        continue
-                except:
-                    pass
-                try:
-                    if "grep" in command[3] and not "pgrep" in command[3]:
-                        
-                        if "bannerText" in rule_yaml['check'] or "fips_" in rule_yaml['check']:
-                            
-                            text_to_find = rule_yaml['check'].split("=")[1].split('"')[1]
+                '''.format(x,rule_yaml['id'] + "_" + odv_label,awk_file.rstrip(), awk_search))
+    fragments['x'] = x + 1
+    return TRANSLATED
 
-                            matches = text_to_find.replace(".","\.").replace(")","\)").replace("(","\(").replace("*","\*")
-                            
-                            oval_definition = oval_definition + '''
+
+def translate_grep(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+
+    if "bannerText" in rule_yaml['check'] or "fips_" in rule_yaml['check']:
+
+        text_to_find = rule_yaml['check'].split("=")[1].split('"')[1]
+
+        matches = text_to_find.replace(".","\.").replace(")","\)").replace("(","\(").replace("*","\*")
+
+        fragments['oval_definition'].append('''
             <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                         <title>{}</title> 
@@ -2882,41 +2634,41 @@ def generate_scap(all_rules, all_baselines, args):
                 <criteria> 
                     <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                 </criteria> 
-            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x)
-                            oval_test = oval_test + '''
+            </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x))
+        fragments['oval_test'].append('''
                     <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <object object_ref="oval:mscp:obj:{}"/>
             </textfilecontent54_test>
-            '''.format(x, rule_yaml['id'] + "_" + odv_label, x)
-                            
-                            file_path = rule_yaml["check"].split(" ")[-1].rstrip()
-                            
-                            oval_object = oval_object + '''
+            '''.format(x, rule_yaml['id'] + "_" + odv_label, x))
+
+        file_path = rule_yaml["check"].split(" ")[-1].rstrip()
+
+        fragments['oval_object'].append('''
                     <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                 <filepath>{}</filepath>
                 <pattern operation="pattern match">{}</pattern>
                 <instance datatype="int">1</instance>
-            </textfilecontent54_object>'''.format(x,rule_yaml['id'] + "_" + odv_label,file_path,matches)
+            </textfilecontent54_object>'''.format(x,rule_yaml['id'] + "_" + odv_label,file_path,matches))
 
-                            x += 1
-                            continue
-                        else:
-                            
-                            s = rule_yaml['check']
-                            
-                            try: 
-                                
-                                grep_search = re.search('"(.*?)"', s).group(1)
-                                
-                            except: 
-                                
-                                grep_search = re.search('\'(.*?)\'', s).group(1)
-                                
-                            
-                            grep_file = rule_yaml['check'].split(grep_search,1)[1].split(" ")[1]
-                            
-                            
-                            oval_definition = oval_definition + '''
+        fragments['x'] = x + 1
+        return TRANSLATED
+    else:
+
+        s = rule_yaml['check']
+
+        try: 
+
+            grep_search = re.search('"(.*?)"', s).group(1)
+
+        except: 
+
+            grep_search = re.search('\'(.*?)\'', s).group(1)
+
+
+        grep_file = rule_yaml['check'].split(grep_search,1)[1].split(" ")[1]
+
+
+        fragments['oval_definition'].append('''
                 <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                         <metadata> 
                             <title>{}</title> 
@@ -2927,27 +2679,28 @@ def generate_scap(all_rules, all_baselines, args):
                     <criteria> 
                         <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                     </criteria> 
-                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x)
-                            oval_test = oval_test + '''
+                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x))
+        fragments['oval_test'].append('''
                         <textfilecontent54_test id="oval:mscp:tst:{}" version="1" comment="{}_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                     <object object_ref="oval:mscp:obj:{}"/>
                 </textfilecontent54_test>
-                '''.format(x, rule_yaml['id'] + "_" + odv_label, x)
-                            oval_object = oval_object + '''
+                '''.format(x, rule_yaml['id'] + "_" + odv_label, x))
+        fragments['oval_object'].append('''
                         <textfilecontent54_object id="oval:mscp:obj:{}" version="1" comment="{}_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#independent">
                     <filepath>{}</filepath>
                     <pattern operation="pattern match">{}</pattern>
                     <instance datatype="int">1</instance>
                 </textfilecontent54_object>
-                '''.format(x,rule_yaml['id'] + "_" + odv_label,grep_file.rstrip(),grep_search)
-                            x += 1
-                            continue
-                except:
-                    pass
-                try:
-                    if "launchctl" in command[2] or "launchctl" in rule_yaml['fix']:
-                        if "disable" in command[2] and "=> true" in rule_yaml['check'] or "unload -w" in rule_yaml['fix'] or "disable" in command[2] and "=> disabled" in rule_yaml['check']:
-                            oval_definition = oval_definition + '''
+                '''.format(x,rule_yaml['id'] + "_" + odv_label,grep_file.rstrip(),grep_search))
+        fragments['x'] = x + 1
+        return TRANSLATED
+
+
+def translate_launchctl(rule_yaml, odv_label, cce, fragments, first_definition):
+    x = fragments['x']
+    command = rule_yaml['check'].split("/")
+    if "disable" in command[2] and "=> true" in rule_yaml['check'] or "unload -w" in rule_yaml['fix'] or "disable" in command[2] and "=> disabled" in rule_yaml['check']:
+        fragments['oval_definition'].append('''
                 <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                             <title>{}</title> 
@@ -2959,9 +2712,9 @@ def generate_scap(all_rules, all_baselines, args):
                         <criterion comment="{}_plist" test_ref="oval:mscp:tst:{}" />
                         <criterion comment="{}_launchctl" test_ref="oval:mscp:tst:{}" />
                     </criteria>
-                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label,x+999)
+                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label,x+999))
 
-                            oval_test = oval_test + '''
+        fragments['oval_test'].append('''
                 <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="only_one_exists" comment="{}_plist_test" id="oval:mscp:tst:{}" version="2">
                     <object object_ref="oval:mscp:obj:{}" />
                     <state state_ref="oval:mscp:ste:{}" />
@@ -2969,37 +2722,37 @@ def generate_scap(all_rules, all_baselines, args):
                 <launchd_test id="oval:mscp:tst:{}" version="1" comment="{}_launchctl_test" check_existence="none_exist" check="none satisfy" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos">
                     <object object_ref="oval:mscp:obj:{}"/>
                 
-                </launchd_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x,x+999,rule_yaml['id'] + "_" + odv_label,x+999)
-                            
-                            domain = str()
-                            if "launchctl" not in rule_yaml['check']:
-                                domain = rule_yaml['fix'].split()[4].split('/')[4].replace(".plist","")
-                                
-                            else:
-                                s = command[5].split()[2]
-                                domain = re.search('"(.*?)"', s).group(1)
-                            
-                            oval_object = oval_object + '''
+                </launchd_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x,x+999,rule_yaml['id'] + "_" + odv_label,x+999))
+
+        domain = str()
+        if "launchctl" not in rule_yaml['check']:
+            domain = rule_yaml['fix'].split()[4].split('/')[4].replace(".plist","")
+
+        else:
+            s = command[5].split()[2]
+            domain = re.search('"(.*?)"', s).group(1)
+
+        fragments['oval_object'].append('''
                 <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_plist_object" id="oval:mscp:obj:{}" version="1">
                     <filepath>/var/db/com.apple.xpc.launchd/disabled.plist</filepath>
                     <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
                 </plist511_object>
                 <launchd_object id="oval:mscp:obj:{}" version="1" comment="{}_launchctl_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos">
                     <label>{}</label>
-                </launchd_object>'''.format(rule_yaml['id'] + "_" + odv_label,x,domain,x+999,rule_yaml['id'] + "_" + odv_label,domain.replace('(','').replace(')',''))
-                            
-                            status = ""
-                            if "enable" in rule_yaml["fix"]:
-                                status = "false"
-                            else:
-                                status = "true"
-                            oval_state = oval_state + '''
+                </launchd_object>'''.format(rule_yaml['id'] + "_" + odv_label,x,domain,x+999,rule_yaml['id'] + "_" + odv_label,domain.replace('(','').replace(')','')))
+
+        status = ""
+        if "enable" in rule_yaml["fix"]:
+            status = "false"
+        else:
+            status = "true"
+        fragments['oval_state'].append('''
                 <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_plist_state" id="oval:mscp:ste:{}" version="1">
                     <value_of datatype="boolean" operation="equals">{}</value_of>
-                </plist511_state>'''.format(rule_yaml['id'] + "_" + odv_label,x,status)
-                        
-                        elif "launchctl unload" in rule_yaml['fix']:
-                            oval_definition = oval_definition + '''
+                </plist511_state>'''.format(rule_yaml['id'] + "_" + odv_label,x,status))
+
+    elif "launchctl unload" in rule_yaml['fix']:
+        fragments['oval_definition'].append('''
                 <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                     <metadata> 
                             <title>{}</title> 
@@ -3010,32 +2763,32 @@ def generate_scap(all_rules, all_baselines, args):
                     <criteria>
                         <criterion comment="{}_launchctl" test_ref="oval:mscp:tst:{}" />
                     </criteria>
-                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label,x+999)
+                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x,rule_yaml['id'] + "_" + odv_label,x+999))
 
-                            oval_test = oval_test + '''
+        fragments['oval_test'].append('''
                 <launchd_test id="oval:mscp:tst:{}" version="1" comment="{}_launchctl_test" check_existence="none_exist" check="none satisfy" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos">
                     <object object_ref="oval:mscp:obj:{}"/>
-                </launchd_test>'''.format(x,rule_yaml['id'] + "_" + odv_label,x)
-                            
-                            domain = str()
-                            
-                            if "launchctl" not in rule_yaml['check']:
-                                domain = rule_yaml['fix'].split()[4].split('/')[4].replace(".plist","")
-                                
-                            else:
-                                s = command[5].split()[2]
-                                domain = re.search('"(.*?)"', s).group(1)
-                            
-                            oval_object = oval_object + '''
+                </launchd_test>'''.format(x,rule_yaml['id'] + "_" + odv_label,x))
+
+        domain = str()
+
+        if "launchctl" not in rule_yaml['check']:
+            domain = rule_yaml['fix'].split()[4].split('/')[4].replace(".plist","")
+
+        else:
+            s = command[5].split()[2]
+            domain = re.search('"(.*?)"', s).group(1)
+
+        fragments['oval_object'].append('''
                 <launchd_object id="oval:mscp:obj:{}" version="1" comment="{}_launchctl_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos">
                     <label>{}</label>
-                </launchd_object>'''.format(x, rule_yaml['id'] + "_" + odv_label,domain.replace('(','').replace(')',''))
-                        
+                </launchd_object>'''.format(x, rule_yaml['id'] + "_" + odv_label,domain.replace('(','').replace(')','')))
 
 
 
-                        elif "defaults write" in rule_yaml['fix']:
-                            oval_definition = oval_definition + '''
+
+    elif "defaults write" in rule_yaml['fix']:
+        fragments['oval_definition'].append('''
                                 <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
                             <metadata> 
                                 <title>{}</title> 
@@ -3046,238 +2799,810 @@ def generate_scap(all_rules, all_baselines, args):
                         <criteria>
                             <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
                         </criteria>
-                    </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x)
-                            
-                            oval_test = oval_test + '''
+                    </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'],rule_yaml['id'] + "_" + odv_label,x))
+
+        fragments['oval_test'].append('''
                                 <plist511_test xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" check="all" check_existence="all_exist" comment="{}_test" id="oval:mscp:tst:{}" version="2">
                         <object object_ref="oval:mscp:obj:{}" />
                         <state state_ref="oval:mscp:ste:{}" />
-                    </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x)
-                            plist = rule_yaml['fix'].split(" ")[2].replace(".plist","")
-                            # plist = rule_yaml['check'].split("read")[1].split()[0].replace(".plist","")
-                            
-                            if "ByHost" in rule_yaml['fix'] or "currentHost" in rule_yaml['fix']:
-                                
-                                oval_object = oval_object + '''
+                    </plist511_test>'''.format(rule_yaml['id'] + "_" + odv_label,x,x,x))
+        plist = rule_yaml['fix'].split(" ")[2].replace(".plist","")
+        # plist = rule_yaml['check'].split("read")[1].split()[0].replace(".plist","")
+
+        if "ByHost" in rule_yaml['fix'] or "currentHost" in rule_yaml['fix']:
+
+            fragments['oval_object'].append('''
                                             <systemprofiler_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}" id="oval:mscp:obj:{}" version="1">
                     <data_type>SPHardwareDataType</data_type>
 
-                        <xpath>//*[contains(text(), "platform_UUID")]/following-sibling::string[position()=1]/text()</xpath>
-                    </systemprofiler_object> '''.format("hardware UUID",x+999)
-
-                                if "$CURRENT_USER" in rule_yaml['check']:
-                                    
-                                    
-                                    
-                                    key = rule_yaml['fix'].split("defaults")[1].split(" ")[3]
-                                    
-                                    oval_object = oval_object + '''
-                                    <accountinfo_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory" id="oval:mscp:obj:{}" version="1">
-                        <username operation="pattern match">.*</username>
-                        <filter action="include" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5">oval:mscp:ste:{}</filter>
-                    </accountinfo_object>
-                    
-                    <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
-                        <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>    
-                    '''.format(x+1999,x+1999,rule_yaml['id'] + "_" + odv_label,x,x)
-                                    
-                                    if rule_yaml['fix'].split("defaults")[1].split(" ")[4] == "-bool":
-                                        rule_yaml['result']['boolean']
-                                        oval_object = oval_object + '''
-                                <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-            </plist511_object>'''.format(key)
-                                    else:
-                                        
-                                        oval_object = oval_object + '''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-                    </plist511_object>'''.format(key)
-                                    oval_state = oval_state + '''
-                                <accountinfo_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory state" id="oval:mscp:ste:{}" version="1">
-                        <username operation="pattern match">^[^_\s].*</username>
-                        <uid datatype="int" operation="not equal">0</uid>
-                        <gid datatype="int" operation="not equal">0</gid>
-                        <login_shell operation="not equal">/usr/bin/false</login_shell>
-                    </accountinfo_state>'''.format(x+1999)
-                                    
-                                    oval_variable = oval_variable + '''
-                <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="uuid variable">
-                    <concat>
-                        <object_component object_ref="oval:mscp:obj:{}" item_field="home_dir"/>
-                        <literal_component datatype="string">/Library/Preferences/ByHost/{}.</literal_component>
-                        <object_component object_ref="oval:mscp:obj:{}" item_field="value_of"/>
-                        <literal_component datatype="string">.plist</literal_component>
-                    </concat>
-                </local_variable>'''.format(x,x+1999,plist,x+999)
+                        <xpath>//*[contains(text(), "platform_UUID")]/following-sibling::string[position()=1]/text()</xpath>
+                    </systemprofiler_object> '''.format("hardware UUID",x+999))
+
+            if "$CURRENT_USER" in rule_yaml['check']:
+
+
+
+                key = rule_yaml['fix'].split("defaults")[1].split(" ")[3]
+
+                fragments['oval_object'].append('''
+                                    <accountinfo_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory" id="oval:mscp:obj:{}" version="1">
+                        <username operation="pattern match">.*</username>
+                        <filter action="include" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5">oval:mscp:ste:{}</filter>
+                    </accountinfo_object>
+                    
+                    <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
+                        <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>    
+                    '''.format(x+1999,x+1999,rule_yaml['id'] + "_" + odv_label,x,x))
+
+                if rule_yaml['fix'].split("defaults")[1].split(" ")[4] == "-bool":
+                    rule_yaml['result']['boolean']
+                    fragments['oval_object'].append('''
+                                <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
+            </plist511_object>'''.format(key))
+                else:
+
+                    fragments['oval_object'].append('''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
+                    </plist511_object>'''.format(key))
+                fragments['oval_state'].append('''
+                                <accountinfo_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory state" id="oval:mscp:ste:{}" version="1">
+                        <username operation="pattern match">^[^_\s].*</username>
+                        <uid datatype="int" operation="not equal">0</uid>
+                        <gid datatype="int" operation="not equal">0</gid>
+                        <login_shell operation="not equal">/usr/bin/false</login_shell>
+                    </accountinfo_state>'''.format(x+1999))
+
+                fragments['oval_variable'].append('''
+                <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="uuid variable">
+                    <concat>
+                        <object_component object_ref="oval:mscp:obj:{}" item_field="home_dir"/>
+                        <literal_component datatype="string">/Library/Preferences/ByHost/{}.</literal_component>
+                        <object_component object_ref="oval:mscp:obj:{}" item_field="value_of"/>
+                        <literal_component datatype="string">.plist</literal_component>
+                    </concat>
+                </local_variable>'''.format(x,x+1999,plist,x+999))
+
+
+
+            else:
+
+
+                key = rule_yaml['fix'].split("defaults")[1].split(" ")[3]
+
+                fragments['oval_object'].append('''
+                    <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
+                        <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>
+                        '''.format(rule_yaml['id'] + "_" + odv_label,x,x))
+
+
+                if rule_yaml['fix'].split("defaults")[1].split(" ")[4] == "-bool":
+
+                    fragments['oval_object'].append('''
+                                <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
+                    </plist511_object>'''.format(key))
+                else:
+                    fragments['oval_object'].append('''
+                                    <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
+                    </plist511_object>'''.format(key))
+
+                fragments['oval_variable'].append('''       
+                <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="uuid variable">
+                    <concat>
+                        <literal_component datatype="string">{}.</literal_component>
+                        <object_component object_ref="oval:mscp:obj:{}" item_field="value_of"/>
+                        <literal_component datatype="string">.plist</literal_component>
+                    </concat>
+                </local_variable>'''.format(x,plist,x+999))
+
+        elif "$CURRENT_USER" in rule_yaml['check']:
+
+
+            check_length = len(rule_yaml['check'].split())
+            key = rule_yaml['fix'].split("defaults")[1].split(" ")[3]
+
+            fragments['oval_object'].append('''
+                                <accountinfo_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory" id="oval:mscp:obj:{}" version="1">
+                    <username operation="pattern match">.*</username>
+                    <filter action="include" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5">oval:mscp:ste:{}</filter>
+                </accountinfo_object>
+                
+                <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
+                    <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>    
+                '''.format(x+1999,x+1999,rule_yaml['id'] + "_" + odv_label,x,x))
+
+            if rule_yaml['fix'].split("defaults")[1].split(" ")[4] == "-bool":
+
+                fragments['oval_object'].append('''
+                            <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
+            </plist511_object>'''.format(key))
+            else:
+
+                fragments['oval_object'].append('''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
+                </plist511_object>'''.format(key))
+            fragments['oval_state'].append('''
+                            <accountinfo_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory state" id="oval:mscp:ste:{}" version="1">
+                    <username operation="pattern match">^[^_\s].*</username>
+                    <uid datatype="int" operation="not equal">0</uid>
+                    <gid datatype="int" operation="not equal">0</gid>
+                    <login_shell operation="not equal">/usr/bin/false</login_shell>
+                </accountinfo_state>'''.format(x+1999))
+
+            fragments['oval_variable'].append('''
+            <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="uuid variable">
+                <concat>
+                    <object_component object_ref="oval:mscp:obj:{}" item_field="home_dir"/>
+                    <literal_component datatype="string">/Library/Preferences/{}.</literal_component>
+                    <literal_component datatype="string">plist</literal_component>
+                </concat>
+            </local_variable>'''.format(x,x+1999,plist,x+999))
+
+        else:
+
+            if plist[-6:] != ".plist":
+                plist = plist + ".plist"
+            plist_key = rule_yaml['fix'].split("defaults")[1].split(" ")[3]
+
+            fragments['oval_object'].append('''
+                                <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
+                                <filepath>{}</filepath>'''.format(rule_yaml['id'] + "_" + odv_label,x,plist))
+
+            try:
+                rule_yaml['result']['boolean']
+                fragments['oval_object'].append('''
+                                <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
+                                </plist511_object>'''.format(plist_key))
+            except:
+                fragments['oval_object'].append('''
+                                    <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
+                                </plist511_object>'''.format(plist_key))
+
+
+        datatype = ""
+        plist_key = rule_yaml['fix'].split("defaults")[1].split(" ")[3]
+
+        oval_datatype = rule_yaml['fix'].split("defaults")[1].split(" ")[4].replace("-","")
+
+        if oval_datatype == "integer":
+            oval_datatype = "int"
+
+        if oval_datatype == "bool":
+            oval_datatype = "boolean"
+
+        value = rule_yaml['fix'].split("defaults")[1].split(" ")[5].replace(";","")
+
+        fragments['oval_state'].append('''
+                    <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
+                    <value_of datatype="{}" operation="equals">{}</value_of>
+                    </plist511_state>'''.format(rule_yaml['id'] + "_" + odv_label,x,oval_datatype,value))
+        strip_note(fragments['oval_definition'], first_definition)
+
+
+        fragments['x'] = x + 1
+        return TRANSLATED
+
+
+    else:
+
+        fragments['oval_definition'].append('''
+                <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
+                        <metadata> 
+                            <title>{}</title> 
+                            <reference source="CCE" ref_id="{}"/>
+                            <reference source="macos_security" ref_id="{}"/>
+                            <description>{}</description> 
+                        </metadata> 
+                    <criteria> 
+                        <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
+                    </criteria> 
+                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x))
+
+        fragments['oval_test'].append('''
+                <launchd_test id="oval:mscp:tst:{}" version="1" comment="{}_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos">
+                    <object object_ref="oval:mscp:obj:{}"/>
+                </launchd_test>'''.format(x,rule_yaml['id'] + "_" + odv_label,x))
+
+        domain = command[5].split()[2]
+        domain = domain.replace('"','').replace("'",'')
+        ###########
+        label_obj = '<label>'
+        if 'E' in command[5].split()[1]:
+            label_obj = '<label operation="pattern match">'
+        else:
+            domain = domain.replace('(','').replace(')','')
+        fragments['oval_object'].append('''
+                <launchd_object id="oval:mscp:obj:{}" version="1" comment="{}_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos">
+                    {}{}</label>
+                </launchd_object>'''.format(x,rule_yaml['id'] + "_" + odv_label,label_obj,domain))
+    fragments['x'] = x + 1
+    return TRANSLATED
+
+
+# check translators in the order generate_rule_fragments tries them, with the fields of the rule they match on and
+# the function writing the checks of a matching rule. Fields missing from a check, such as a fourth path component,
+# are None and never match.
+CHECK_TRANSLATORS = (
+    ("ocil_tagged", lambda f, rule: "inherent" in rule['tags'] or "n_a" in rule['tags'] or "permanent" in rule['tags'],
+     manual_check()),
+    ("time_machine_encrypted", lambda f, rule: "time_machine" in f['id'] and "encrypted" in f['id'],
+     manual_check(" - Manual Check Required")),
+    ("bluetooth_unpaired", lambda f, rule: "bluetooth" in f['id'] and "unpaired" in f['id'],
+     manual_check(" - Manual Check Required")),
+    ("no_command", lambda f, rule: rule['check'][0] != "/" and "[source,bash]" not in f['fix'],
+     manual_check(" - Manual Check")),
+    ("dscl_hint", lambda f, rule: "hint" in f['check'] and "dscl" in f['check'],
+     manual_check(" - no relevant oval")),
+    ("manual_tagged", lambda f, rule: "manual" in rule['tags'],
+     manual_check(" - Manual Check")),
+    ("eficheck", lambda f, rule: "eficheck" in f['check'],
+     manual_check(" - eficheck - no relevant oval")),
+    ("log_config", lambda f, rule: "newsyslog.conf" in f['check'] or "asl.conf" in f['check'] or "aslmanager" in f['check'],
+     manual_check(" - Manual Check Required")),
+    ("pwpolicy_account_policies", lambda f, rule: "/usr/bin/pwpolicy getaccountpolicies" in f['check'],
+     manual_check(" - pwpolicy getaccountpolicies - no relevant oval")),
+    ("find", lambda f, rule: "find" in f['check_command'] and rule['id'] != "os_home_folders_secure",
+     manual_check(" - no relevant oval")),
+    ("firmwarepasswd", lambda f, rule: "/usr/sbin/firmwarepasswd" in f['check'],
+     manual_check(" - no relevant oval")),
+    ("home_folders", lambda f, rule: "os_home_folders_secure" in f['id'],
+     translate_home_folders),
+    ("mobileconfig", lambda f, rule: rule['mobileconfig'],
+     translate_mobileconfig),
+    ("sntp", lambda f, rule: "sntp" in f['check'],
+     manual_check(" - No relevant oval test")),
+    ("storage_data", lambda f, rule: "SPStorageDataType" in f['check'],
+     manual_check(" - No relevant oval test")),
+    ("fdesetup", lambda f, rule: "fdesetup" in f['command_3'],
+     skip_on_error(manual_check(" - No relevant oval test"))),
+    ("profiles", lambda f, rule: "profiles" in f['command_3'],
+     skip_on_error(translate_profiles)),
+    ("csrutil", lambda f, rule: "csrutil" in f['command_3'],
+     skip_on_error(translate_csrutil)),
+    ("pfctl", lambda f, rule: "pfctl" in f['check'],
+     manual_check(" - No relevant oval test")),
+    ("dump_keychain", lambda f, rule: "dump-keychain" in f['check'],
+     manual_check(" - No relevant oval test")),
+    ("mdmclient", lambda f, rule: "mdmclient" in f['command_3'],
+     skip_on_error(manual_check(" - No relevant oval test"))),
+    ("nvram", lambda f, rule: "nvram" in f['command_3'],
+     skip_on_error(manual_check(" - No relevant oval test"))),
+    ("pmset_standby", lambda f, rule: "pmset" in f['command_3'] and "standby" in f['check'],
+     skip_on_error(translate_pmset_standby)),
+    ("sudo", lambda f, rule: "sudo -V" in f['check'],
+     translate_sudo),
+    ("ssh_config", lambda f, rule: "ssh_config" in f['discussion'] and "dscl" in f['check'],
+     translate_ssh_config),
+    ("sshd_fips", lambda f, rule: "sshd -T" in f['check'] and "fips" in f['check'] or "sshd -G" in f['check'] and "fips" in f['check'],
+     translate_sshd_fips),
+    ("sshd", lambda f, rule: "sshd -T" in f['check'] or "sshd -G" in f['check'],
+     translate_sshd),
+    ("pmset", lambda f, rule: "pmset" in f['command_3'],
+     skip_on_error(translate_pmset)),
+    ("socketfilterfw", lambda f, rule: "socketfilterfw" in f['check'],
+     translate_socketfilterfw),
+    ("systemsetup", lambda f, rule: "systemsetup" in f['command_3'],
+     skip_on_error(translate_systemsetup)),
+    ("defaults_current_user_grep", lambda f, rule: "defaults" in f['check'] and "grep" in f['check'] and "CURRENT_USER" in f['check'],
+     translate_defaults_current_user_grep),
+    ("defaults", lambda f, rule: "defaults" in f['check'],
+     translate_defaults),
+    ("security", lambda f, rule: "security" in f['command_3'],
+     skip_on_error(translate_security)),
+    ("rm_ls", lambda f, rule: "/bin/rm" in f['fix'] and "/bin/ls" in f['check'],
+     translate_rm_ls),
+    ("file_attributes", lambda f, rule: "ls" in f['command_2'] or "stat" in f['command_3_command'],
+     skip_on_error(translate_file_attributes)),
+    ("dscl", lambda f, rule: "dscl" in f['command_3'],
+     skip_on_error(translate_dscl)),
+    ("awk", lambda f, rule: "awk" in f['command_3'],
+     skip_on_error(translate_awk)),
+    ("grep", lambda f, rule: "grep" in f['command_3'] and not "pgrep" in f['command_3'],
+     skip_on_error(translate_grep)),
+    ("launchctl", lambda f, rule: "launchctl" in f['command_2'] or "launchctl" in f['fix'],
+     skip_on_error(translate_launchctl)),
+)
+
+
+def create_args():
+    
+    parser = argparse.ArgumentParser(
+        description="Easily generate xccdf, oval, or scap datastream. If no option is defined, it will generate an scap datastream file.")
+    parser.add_argument("-x", "--xccdf", default=None,
+                        help="Generate an xccdf file.", action="store_true")
+    parser.add_argument("-o", "--oval", default=None,
+                        help="Generate an oval file of the checks.", action="store_true")
+    parser.add_argument("-a", "--all_formats", default=None,
+                        help="Generate the scap datastream, xccdf and oval files from a single pass over the rules.", action="store_true")
+    parser.add_argument("-l", "--list_tags", default=None,
+                        help="List the available keyword tags to search for.", action="store_true")
+    parser.add_argument("-b", "--baseline", default="None",
+                        help="Choose a baseline to generate an xml file for, if none is specified it will generate for every rule found.", action="store")
+    parser.add_argument("-w", "--workers", default=1, type=int,
+                        help="Number of worker processes used to parse the rule files, generate the rule fragments and write the xml files, 0 uses every available core.", action="store")
+    parser.add_argument("-z", "--compress", default=None, choices=sorted(COMPRESSION_SUFFIXES),
+                        help="Stream the generated files into gzip files or zip archives instead of plain xml.", action="store")
+    parser.add_argument("-s", "--split_oval", default=None,
+                        help="Write the OVAL checks of the scap datastream to the oval file and reference it from the datastream as an external component.", action="store_true")
+    parser.add_argument("-P", "--rule_pack", default=None, type=os.path.abspath,
+                        help="Load the rules, sections, baselines and includes from a rule pack built by generate_rule_pack.py.", action="store")
+
+    return parser.parse_args()
+
+def generate_rule_fragments(rule_file, custom, og_rule_yaml, baseline_positions, export_formats, args, x, d):
+    """Generates the xccdf rules and OVAL fragments of one rule from its merged yaml, numbering its OVAL ids from x and d.
+    Returns the fragments of each section together with the next free x and d
+    """
+    fragments = {
+        'oval_definition': [],
+        'oval_test': [],
+        'oval_object': [],
+        'oval_state': [],
+        'oval_variable': [],
+        'xccdf_rules': [],
+        'scap_rules': [],
+        # the indexes of the scap_rules checked by each OVAL definition
+        'rule_checks': {},
+        # OVAL definitions replaced by the OCIL questionnaire, with the number of scap_rules at the time
+        'ocil_checks': [],
+        'generated_baselines': {},
+        # the next free OVAL ids, the translators move them on as they write checks
+        'x': x,
+        'd': d
+    }
+    
+    odv_label = str()
+    
+
+    loop = 1
+    if "odv" in og_rule_yaml:
+        loop = len(og_rule_yaml['odv'])
+        
+        if args.baseline != "None":
+            loop = 1
+    for a in range(0, loop):
+        
+        # each ODV variant substitutes into its own copy of the merged rule
+        rule_yaml = copy.deepcopy(og_rule_yaml)
+        rule_definitions = len(fragments['oval_definition'])
+        
+        try:           
+            
+            # # odv_label = list(rule_yaml['odv'].keys())[a]
+            # # odv_label.remove('hint')
+            if args.baseline != "None":
+                odv_label = args.baseline
+                if args.baseline not in list(rule_yaml['odv'].keys())[a]:
+                    odv_label = "recommended"
+            # if args.baseline not in list(rule_yaml['odv'].keys())[a]:
+            #     odv_label = "recommended"
+            else:
+                odv_label = list(rule_yaml['odv'].keys())[a]
+
+                
+                
+
+            # if odv_label == "hint":
+            #     continue
+            
+            
+
+            odv_value = str(rule_yaml['odv'][odv_label])
+            rule_yaml['title'] = rule_yaml['title'].replace("$ODV",str(odv_value))
+            rule_yaml['discussion'] = rule_yaml['discussion'].replace("$ODV",odv_value)
+            rule_yaml['check'] = rule_yaml['check'].replace("$ODV",odv_value)
+            
+            rule_yaml['fix'] = rule_yaml['fix'].replace("$ODV",odv_value)
+        
+            if "result" in rule_yaml:
+                for result_value in rule_yaml['result']:
+                    if "$ODV" == rule_yaml['result'][result_value]:
+                        rule_yaml['result'][result_value] = rule_yaml['result'][result_value].replace("$ODV",odv_value)
+            
+            if rule_yaml['mobileconfig_info']:
+                for mobileconfig_type in rule_yaml['mobileconfig_info']:
+                    if isinstance(rule_yaml['mobileconfig_info'][mobileconfig_type], dict):
+                        for mobileconfig_value in rule_yaml['mobileconfig_info'][mobileconfig_type]:
+                            
+                            if "$ODV" in str(rule_yaml['mobileconfig_info'][mobileconfig_type][mobileconfig_value]):
+                                if type(rule_yaml['mobileconfig_info'][mobileconfig_type][mobileconfig_value]) == dict:
+                                    for k,v in rule_yaml['mobileconfig_info'][mobileconfig_type][mobileconfig_value].items():
+                                        if v == "$ODV":
+                                            rule_yaml['mobileconfig_info'][mobileconfig_type][mobileconfig_value][k] = odv_value
+                                else:
+                                    rule_yaml['mobileconfig_info'][mobileconfig_type][mobileconfig_value] = odv_value
+                                
+            
+        except:
+            odv_label = "recommended"
+            
+        # only the rule's own tags are looked up, in the order of the profiles
+        for baseline in sorted((tag for tag in rule_yaml['tags'] if tag in baseline_positions), key=baseline_positions.get):
+            if (odv_label != "recommended" and odv_label == baseline) or odv_label == "custom" or (odv_label == "recommended" and ("odv" not in rule_yaml or baseline not in rule_yaml['odv'])):
+                fragments['generated_baselines'].setdefault(baseline, []).append(rule_yaml['id'] + "_" + odv_label)
+
+        if odv_label == "hint":
+            continue
+        result = str()
+        if "result" in rule_yaml:
+            result = "\nResult: {}".format(rule_yaml['result'])
+
+        else:
+            result = ""
+        severity = str()
+
+        if "severity" in rule_yaml:
+            severity = rule_yaml['severity']
+        else:
+            severity = "unknown"
+        check_rule = str()
+        if "inherent" in rule_yaml['tags'] or "n_a" in rule_yaml['tags'] or "permenant" in rule_yaml['tags']:
+            check_rule = '''
+            <check system="http://scap.nist.gov/schema/ocil/2">
+            <check-content-ref href="ocil.xml"/></check>'''
+        else:
+            check_rule = '''<check system="http://oval.mitre.org/XMLSchema/oval-definitions-5">
+            <check-content-ref href="oval.xml" name="oval:mscp:def:{0}"/>
+            </check>'''.format(fragments['x'])
+        references = str()
+        
+        if "800-53r5" in rule_yaml['references'] and rule_yaml['references']['800-53r5'][0] != "N/A":
+            references = references + "<reference href=\"https://csrc.nist.gov/publications/detail/sp/800-53/rev-5/final\">NIST SP 800-53r5: "
+            for nist80053 in rule_yaml['references']['800-53r5']:
+                references = references + nist80053 + ", "
+            references = references[:-2] + "</reference>"
+        if "800-53r4" in rule_yaml['references'] and rule_yaml['references']['800-53r4'][0] != "N/A":
+            references = references + "<reference href=\"https://csrc.nist.gov/publications/detail/sp/800-53/rev-4/final\">NIST SP 800-53r4: "
+            for nist80053 in rule_yaml['references']['800-53r4']:
+                references = references + nist80053 + ", "
+            references = references[:-2] + "</reference>"
+        if "800-171r2" in rule_yaml['references'] and rule_yaml['references']['800-171r2'][0] != "N/A":
+            references = references + "<reference href=\"https://csrc.nist.gov/publications/detail/sp/800-171/rev-2/final\">NIST SP 800-171r2: "
+            for nist800171 in rule_yaml['references']['800-171r2']:
+                references = references + nist800171 + ", "
+            references = references[:-2] + "</reference>"
+        if "disa_stig" in rule_yaml['references'] and rule_yaml['references']['disa_stig'][0] != "N/A":
+            references = references + "<reference href=\"https://public.cyber.mil/stigs/downloads/\">DISA STIG(s): "
+            for disa_stig in rule_yaml['references']['disa_stig']:
+                references = references + disa_stig + ", "
+            references = references[:-2] + "</reference>"
+        if "cis" in rule_yaml['references']:
+            if "benchmark" in rule_yaml['references']['cis'] and rule_yaml['references']['cis']['benchmark'][0] != "N/A":
+                references = references + "<reference href=\"https://www.cisecurity.org/cis-benchmarks/\">CIS Benchmark: "
+                for benchmark in rule_yaml['references']['cis']['benchmark']:
+                    references = references + benchmark + ", "
+                references = references[:-2] + "</reference>"
+            if "controls v8" in rule_yaml['references']['cis'] and rule_yaml['references']['cis']['controls v8'][0] != "N/A":
+                references = references + "<reference href=\"https://www.cisecurity.org/controls\">CIS Controls V8: "
+                for v8controls in rule_yaml['references']['cis']['controls v8']:
+                    references = references + str(v8controls) + ", "
+                references = references[:-2] + "</reference>"
+        
+        for k,v in rule_yaml['references'].items():
+            if k == "cci" or k == "srg":
+                continue
+            if k == "custom":
+                
+                
+                for i,u in rule_yaml['references']['custom'].items():
+                    references = references + '<reference href="#">{0}: '.format(i)
+                    for refs in rule_yaml['references']['custom'][i]:
+                        references = references + '{0}, '.format(str(refs))
+                    references = references[:-2] +  "</reference>"
+
+
+        cce = str()
+        if "cce" not in rule_yaml['references'] or rule_yaml['references']['cce'] == "N/A":
+            cce = "CCE-11111-1"
+        else:
+            cce = rule_yaml['references']['cce'][0]
+
+        if "scap" in export_formats:
+            mobileconfig_info = ""
+            if rule_yaml['mobileconfig']:
+                mobileconfig_info = escape(format_mobileconfig_fix(rule_yaml['mobileconfig_info']))
+            fragments['scap_rules'].append('''
+            <Rule id="xccdf_gov.nist.mscp.content_rule_{0}" selected="false" role="full" severity="{1}" weight="1.0">
+            <title>{2}</title>
+            <description>{3}
+            
+            {4}
+            
+            {5}</description>{9}
+            <ident system="https://ncp.nist.gov/cce">{6}</ident>
+            <fixtext>{7}</fixtext>
+            {8}
+            </Rule>
+            '''.format(rule_yaml['id'] + "_" + odv_label, severity, rule_yaml['title'], rule_yaml['discussion'].replace("<","&lt;").replace(">","&gt;").replace("&","&amp;").rstrip(), rule_yaml['check'].replace("<","&lt;").replace(">","&gt;").replace("&","&amp;").rstrip(), result, cce,rule_yaml['fix'].replace("<","&lt;").replace(">","&gt;").replace("&","&amp;")  + "\n" + mobileconfig_info, check_rule, references))
+            fragments['rule_checks'].setdefault(fragments['x'], []).append(len(fragments['scap_rules']) - 1)
+
+        if "xccdf" in export_formats:
+            mobileconfig_info = ""
+            if rule_yaml['mobileconfig']:
+                mobileconfig_info = escape(format_mobileconfig_fix(rule_yaml['mobileconfig_info']))
+
+            fragments['xccdf_rules'].append('''
+            <Rule id="xccdf_gov.nist.mscp.content_rule_{0}" selected="false" role="full" severity="{1}" weight="1.0">
+            <title>{2}</title>
+            <description>{3}
+            
+            {4}
+            
+            {5}</description>{8}
+            <ident system="https://ncp.nist.gov/cce">{6}</ident>
+            <fixtext>{7}</fixtext>
+            
+            </Rule>
+            '''.format(rule_yaml['id'] + "_" + odv_label, severity, rule_yaml['title'], rule_yaml['discussion'].replace("<","&lt;").replace(">","&gt;").replace("&","&amp;").rstrip(), rule_yaml['check'].replace("<","&lt;").replace(">","&gt;").replace("&","&amp;").rstrip(), result, cce,rule_yaml['fix'].replace("<","&lt;").replace(">","&gt;").replace("&","&amp;") + "\n" + mobileconfig_info, references))
+            if export_formats == {"xccdf"}:
+                # the oval checks are only needed for the datastream and oval files
+                continue
+            
+
+        check_types = classify_check(rule_yaml)
+        translated = None
+        for name, matches, translate in CHECK_TRANSLATORS:
+            if name in check_types:
+                translated = translate(rule_yaml, odv_label, cce, fragments, rule_definitions)
+                if translated:
+                    break
+        if translated == LAST_VARIANT:
+            break
 
-                                
+    return fragments
 
-                                else:
-                                    
-                                    
-                                    key = rule_yaml['fix'].split("defaults")[1].split(" ")[3]
 
-                                    oval_object = oval_object + '''
-                    <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
-                        <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>
-                        '''.format(rule_yaml['id'] + "_" + odv_label,x,x)
+# OVAL ids of rules generated in worker processes are numbered from these bases, then moved into place in rule order
+LOCAL_X = 7000000000000
+LOCAL_D = 8000000000000
+# only the OVAL ids and references, and the number ending the generated comments of the OVAL tests and definitions,
+# are renumbered, the rule text written by the rule authors is left alone
+LOCAL_ID = re.compile(r'(oval:mscp:(?:def|tst|obj|ste|var):)(\d+)')
+LOCAL_COMMENT_ID = re.compile(r'(comment="[^"<>]*_)(\d+)(?=(?:_test)?")')
+OVAL_SECTIONS = ('oval_definition', 'oval_test', 'oval_object', 'oval_state', 'oval_variable')
 
-                                    
-                                    if rule_yaml['fix'].split("defaults")[1].split(" ")[4] == "-bool":
-                                        
-                                        oval_object = oval_object + '''
-                                <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-                    </plist511_object>'''.format(key)
-                                    else:
-                                        oval_object = oval_object + '''
-                                    <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-                    </plist511_object>'''.format(key)
-                                    
-                                    oval_variable = oval_variable + '''       
-                <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="uuid variable">
-                    <concat>
-                        <literal_component datatype="string">{}.</literal_component>
-                        <object_component object_ref="oval:mscp:obj:{}" item_field="value_of"/>
-                        <literal_component datatype="string">.plist</literal_component>
-                    </concat>
-                </local_variable>'''.format(x,plist,x+999)
-                            
-                            elif "$CURRENT_USER" in rule_yaml['check']:
-                                
-                                    
-                                check_length = len(rule_yaml['check'].split())
-                                key = rule_yaml['fix'].split("defaults")[1].split(" ")[3]
-                                
-                                oval_object = oval_object + '''
-                                <accountinfo_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory" id="oval:mscp:obj:{}" version="1">
-                    <username operation="pattern match">.*</username>
-                    <filter action="include" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5">oval:mscp:ste:{}</filter>
-                </accountinfo_object>
-                
-                <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
-                    <filepath datatype="string" operation="equals" var_check="at least one" var_ref="oval:mscp:var:{}"/>    
-                '''.format(x+1999,x+1999,rule_yaml['id'] + "_" + odv_label,x,x)
-                                
-                                if rule_yaml['fix'].split("defaults")[1].split(" ")[4] == "-bool":
-                                    
-                                    oval_object = oval_object + '''
-                            <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-            </plist511_object>'''.format(key)
-                                else:
-                                    
-                                    oval_object = oval_object + '''<xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-                </plist511_object>'''.format(key)
-                                oval_state = oval_state + '''
-                            <accountinfo_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="home directory state" id="oval:mscp:ste:{}" version="1">
-                    <username operation="pattern match">^[^_\s].*</username>
-                    <uid datatype="int" operation="not equal">0</uid>
-                    <gid datatype="int" operation="not equal">0</gid>
-                    <login_shell operation="not equal">/usr/bin/false</login_shell>
-                </accountinfo_state>'''.format(x+1999)
-                                
-                                oval_variable = oval_variable + '''
-            <local_variable id="oval:mscp:var:{}" version="1" datatype="string" comment="uuid variable">
-                <concat>
-                    <object_component object_ref="oval:mscp:obj:{}" item_field="home_dir"/>
-                    <literal_component datatype="string">/Library/Preferences/{}.</literal_component>
-                    <literal_component datatype="string">plist</literal_component>
-                </concat>
-            </local_variable>'''.format(x,x+1999,plist,x+999)
 
-                            else:
-                                
-                                if plist[-6:] != ".plist":
-                                    plist = plist + ".plist"
-                                plist_key = rule_yaml['fix'].split("defaults")[1].split(" ")[3]
-                                
-                                oval_object = oval_object + '''
-                                <plist511_object xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_object" id="oval:mscp:obj:{}" version="1">
-                                <filepath>{}</filepath>'''.format(rule_yaml['id'] + "_" + odv_label,x,plist)
-                                
-                                try:
-                                    rule_yaml['result']['boolean']
-                                    oval_object = oval_object + '''
-                                <xpath>name(//*[contains(text(), "{}")]/following-sibling::*[1])</xpath>
-                                </plist511_object>'''.format(plist_key)
-                                except:
-                                    oval_object = oval_object + '''
-                                    <xpath>//*[contains(text(), "{}")]/following-sibling::*[1]/text()</xpath>
-                                </plist511_object>'''.format(plist_key)
-                                
-                                
-                            datatype = ""
-                            plist_key = rule_yaml['fix'].split("defaults")[1].split(" ")[3]
-                            
-                            oval_datatype = rule_yaml['fix'].split("defaults")[1].split(" ")[4].replace("-","")
+def _generate_local_rule_fragments(params, export_formats, args):
+    output = io.StringIO()
+    with redirect_stdout(output):
+        fragments = generate_rule_fragments(*params, export_formats, args, LOCAL_X, LOCAL_D)
+    fragments['output'] = output.getvalue()
+    return fragments
 
-                            if oval_datatype == "integer":
-                                oval_datatype = "int"
-                            
-                            if oval_datatype == "bool":
-                                oval_datatype = "boolean"
 
-                            value = rule_yaml['fix'].split("defaults")[1].split(" ")[5].replace(";","")
-                                
-                            oval_state = oval_state + '''
-                    <plist511_state xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos" comment="{}_state" id="oval:mscp:ste:{}" version="1">
-                    <value_of datatype="{}" operation="equals">{}</value_of>
-                    </plist511_state>'''.format(rule_yaml['id'] + "_" + odv_label,x,oval_datatype,value)
-                            oval_definition = re.sub('(?=\n\[NOTE\])(?s)(.*)\=\n<', '<', oval_definition)
+def renumber_rule_fragments(fragments, x, d):
+    """Returns a copy of fragments numbered from LOCAL_X and LOCAL_D with its OVAL ids moved to start at x and d
+    """
+    def renumber(number):
+        number = int(number)
+        if number >= LOCAL_D:
+            return str(number - LOCAL_D + d)
+        if number >= LOCAL_X:
+            return str(number - LOCAL_X + x)
+        return str(number)
+    def renumber_id(match):
+        return match.group(1) + renumber(match.group(2))
+    renumbered = dict(fragments)
+    for section in OVAL_SECTIONS:
+        renumbered[section] = [LOCAL_COMMENT_ID.sub(renumber_id, LOCAL_ID.sub(renumber_id, fragment)) for fragment in fragments[section]]
+    for section in ('xccdf_rules', 'scap_rules'):
+        renumbered[section] = [LOCAL_ID.sub(renumber_id, fragment) for fragment in fragments[section]]
+    renumbered['rule_checks'] = {check - LOCAL_X + x: indexes for check, indexes in fragments['rule_checks'].items()}
+    renumbered['ocil_checks'] = [(check - LOCAL_X + x, count) for check, count in fragments['ocil_checks']]
+    renumbered['x'] = fragments['x'] - LOCAL_X + x
+    renumbered['d'] = fragments['d'] - LOCAL_D + d
+    return renumbered
+
+
+def rule_fragment_params(rule, baseline_positions):
+    """Returns the rule file, whether it is custom, the merged rule yaml and the profile positions, the arguments the fragments of a rule are generated from.
+    The rule is merged here rather than in the workers, so the notice of a custom rule is printed once
+    """
+    rule_file, custom = get_catalog().rule_path(rule)
+    rule_yaml = get_rule_yaml(rule_file, custom)
+    return (rule_file, custom, rule_yaml, baseline_positions)
 
 
-                            x = x+1
-                    
-                            continue
+def generate_all_rule_fragments(all_rules, all_baselines, export_formats, args, x, d):
+    """Yields the fragments of each rule in order. Rules unchanged since the last build with the same options are
+    read from the build cache, the others are generated in worker processes when more than one worker is set
+    """
+    build_cache = get_build_cache()
+    options = (args.baseline, tuple(sorted(export_formats)))
+    # position of each profile, the rules only check their own tags against it
+    baseline_positions = {baseline: position for position, baseline in enumerate(all_baselines)}
+    rule_params = [rule_fragment_params(rule, baseline_positions) for rule in all_rules]
+    cached = [build_cache.get('scap', (rule,) + options, _code_inputs, params) for rule, params in zip(all_rules, rule_params)]
+    stale = [params for params, fragments in zip(rule_params, cached) if fragments is None]
+
+    workers = get_workers()
+    executor = None
+    if workers > 1 and len(stale) > 1:
+        initializer, initargs = (use_rule_pack, (args.rule_pack,)) if args.rule_pack else (None, ())
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
+        generated = executor.map(_generate_local_rule_fragments, stale, repeat(export_formats), repeat(args),
+                                 chunksize=max(1, len(stale) // (workers * 4)))
+    else:
+        generated = (_generate_local_rule_fragments(params, export_formats, args) for params in stale)
+    try:
+        for rule, params, fragments in zip(all_rules, rule_params, cached):
+            if fragments is None:
+                fragments = next(generated)
+                build_cache.put('scap', (rule,) + options, _code_inputs, fragments, params)
+            sys.stdout.write(fragments['output'])
+            fragments = renumber_rule_fragments(fragments, x, d)
+            x = fragments['x']
+            d = fragments['d']
+            yield fragments
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
 
-                        else:
-                            
-                            oval_definition = oval_definition + '''
-                <definition id="oval:mscp:def:{}" version="1" class="compliance"> 
-                        <metadata> 
-                            <title>{}</title> 
-                            <reference source="CCE" ref_id="{}"/>
-                            <reference source="macos_security" ref_id="{}"/>
-                            <description>{}</description> 
-                        </metadata> 
-                    <criteria> 
-                        <criterion comment="{}" test_ref="oval:mscp:tst:{}" />
-                    </criteria> 
-                </definition> '''.format(x,rule_yaml['title'],cce,rule_yaml['id'] + "_" + odv_label,rule_yaml['discussion'].rstrip(),rule_yaml['id'] + "_" + odv_label,x)
+def generate_scap(all_rules, all_baselines, args):
+    
+    export_formats = set()
 
-                            oval_test = oval_test + '''
-                <launchd_test id="oval:mscp:tst:{}" version="1" comment="{}_test" check_existence="all_exist" check="all" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos">
-                    <object object_ref="oval:mscp:obj:{}"/>
-                </launchd_test>'''.format(x,rule_yaml['id'] + "_" + odv_label,x)
-                            
-                            domain = command[5].split()[2]
-                            domain = domain.replace('"','').replace("'",'')
-                            ###########
-                            label_obj = '<label>'
-                            if 'E' in command[5].split()[1]:
-                                label_obj = '<label operation="pattern match">'
-                            else:
-                                domain = domain.replace('(','').replace(')','')
-                            oval_object = oval_object + '''
-                <launchd_object id="oval:mscp:obj:{}" version="1" comment="{}_object" xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5#macos">
-                    {}{}</label>
-                </launchd_object>'''.format(x,rule_yaml['id'] + "_" + odv_label,label_obj,domain)
-                        x += 1
-                        continue    
-                except:
-                    pass
+    version_file = "../VERSION.yaml"
+    version_yaml = load_yaml_file(version_file)
         
-    for k in generated_baselines.keys():
-        xccdf_profiles = xccdf_profiles + '''
-        <Profile id="xccdf_gov.nist.mscp.content_profile_{1}">
-                <title>{0}</title>
-                <description>This profile selects all rules tagged as {0}.</description>'''.format(k, k.replace(" ","_"))
-        for v in generated_baselines[k]:
-            xccdf_profiles = xccdf_profiles + '''
-                <select idref="xccdf_gov.nist.mscp.content_rule_{0}" selected="true"/>'''.format(v)
-        xccdf_profiles = xccdf_profiles + '''
-        </Profile>'''
+    if args.xccdf:
+        export_formats.add("xccdf")
+    
+    if args.oval:
+        export_formats.add("oval")
+        if "ios" in version_yaml['cpe']:
+            print("OVAL generation is not available on iOS")
+            exit()
+
+    if args.all_formats:
+        export_formats.update(["scap", "xccdf", "oval"])
+
+    if not export_formats:
+        export_formats.add("scap")
+
+    if "ios" in version_yaml['cpe'] and export_formats != {"xccdf"}:
+        print("iOS will only export as XCCDF")
+        export_formats = {"xccdf"}
+
+    now = datetime.now()
+    date_time_string = now.strftime("%Y-%m-%dT%H:%M:%S")
+
+    filenameversion = version_yaml['version'].split(",")[1].replace(" ", "_")[1:]
+    output = "../build/macOS_{0}_Security_Compliance_Benchmark-{1}".format(version_yaml['os'],filenameversion)
+    if "ios" in version_yaml['cpe']:
+        output = "../build/iOS_{0}_Security_Compliance_Benchmark-{1}".format(version_yaml['os'],filenameversion)
+        
+    output_files = {
+        "xccdf": output + "_xccdf.xml",
+        "oval": output + "_oval.xml",
+        "scap": output + ".xml"
+    }
+
+    # each section is kept as a list of fragments and only written out once the document is complete
+    oval_definition = []
+    oval_test = []
+    oval_object = []
+    oval_state = []
+    oval_variable = []
+    xccdf_profiles = []
+    xccdf_rules = []
+    scap_rules = []
+    # positions in scap_rules of the rules that reference each OVAL definition
+    rule_checks = {}
+    x = 1
+    d = 1
+
+    ovalPrefix = '''<?xml version="1.0" encoding="UTF-8"?>
+    <oval_definitions xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:schemaLocation="   http://oval.mitre.org/XMLSchema/oval-definitions-5             https://raw.githubusercontent.com/OVALProject/Language/5.11.2/schemas/oval-definitions-schema.xsd  http://oval.mitre.org/XMLSchema/oval-definitions-5#independent https://raw.githubusercontent.com/OVALProject/Language/5.11.2/schemas/independent-definitions-schema.xsd    http://oval.mitre.org/XMLSchema/oval-definitions-5#macos       https://raw.githubusercontent.com/OVALProject/Language/5.11.2/schemas/macos-definitions-schema.xsd  http://oval.mitre.org/XMLSchema/oval-definitions-5#unix        https://raw.githubusercontent.com/OVALProject/Language/5.11.2/schemas/unix-definitions-schema.xsd">
+      <generator>
+        <oval:schema_version xmlns:oval="http://oval.mitre.org/XMLSchema/oval-common-5">5.11.2</oval:schema_version>
+        <oval:timestamp xmlns:oval="http://oval.mitre.org/XMLSchema/oval-common-5">{0}</oval:timestamp>
+        <terms_of_use>Copyright (c) 2020, NIST.</terms_of_use>
+        <oval:product_name xmlns:oval="http://oval.mitre.org/XMLSchema/oval-common-5">macOS Security Compliance Project</oval:product_name>
+      </generator>'''.format(date_time_string)
+
+    ostype = "macOS"
+    if "ios" in version_yaml['cpe']:
+        ostype = "iOS/iPadOS"
+    xccdfPrefix = '''<?xml version="1.0" encoding="UTF-8"?>
+    <Benchmark xmlns="http://checklists.nist.gov/xccdf/1.2" id="xccdf_gov.nist.mscp.content_benchmark_macOS_{1}" style="SCAP_1.3" resolved="true" xml:lang="en">
+      <status date="{3}">draft</status>
+      <title>{4} {1}: Security Configuration</title>
+      <description>
+        {4} {1}: Security Configuration
+      </description>
+      
+      
+      <reference href="https://csrc.nist.gov/projects/security-content-automation-protocol/scap-releases/scap-1-3">
+        <title xmlns="http://purl.org/dc/elements/1.1/">Security Content Automation Protocol</title>
+        <publisher xmlns="http://purl.org/dc/elements/1.1/">National Institute of Standards and Technology</publisher>
+      </reference>
+      <version time="{0}" update="https://github.com/usnistgov/macos_security">{2}</version>
+      <metadata>
+        <creator xmlns="http://purl.org/dc/elements/1.1/">National Institute of Standards and Technology</creator>
+        <publisher xmlns="http://purl.org/dc/elements/1.1/">National Institute of Standards and Technology</publisher>
+        <source xmlns="http://purl.org/dc/elements/1.1/">https://github.com/usnistgov/macos_security/releases/latest</source>
+        <contributor xmlns="http://purl.org/dc/elements/1.1/">Bob Gendler - National Institute of Standards and Technology</contributor>
+        <contributor xmlns="http://purl.org/dc/elements/1.1/">Dan Brodjieski - National Aeronautics and Space Administration</contributor>
+        <contributor xmlns="http://purl.org/dc/elements/1.1/">Allen Golbig - Jamf</contributor>
+      </metadata>
+    '''.format(date_time_string, version_yaml['os'], version_yaml['version'],date_time_string.split("T")[0] + "Z", ostype)
+
+    scapPrefix = '''<?xml version="1.0" encoding="UTF-8"?>
+<data-stream-collection xmlns="http://scap.nist.gov/schema/scap/source/1.2" id="scap_gov.nist.mscp.content_collection_macOS_{1}" schematron-version="1.3">
+  <data-stream timestamp="{0}" id="scap_gov.nist.mscp.content_datastream_macOS_{1}" scap-version="1.3" use-case="CONFIGURATION">
+    <dictionaries>
+      <component-ref xmlns:ns0="http://www.w3.org/1999/xlink" id="scap_gov.nist.mscp.content_cref_macOS_{1}_macOS-cpe-dictionary.xml" ns0:type="simple" ns0:href="#scap_gov.nist.mscp.content_comp_macOS_{1}_macOS-cpe-dictionary.xml">
+        <catalog xmlns="urn:oasis:names:tc:entity:xmlns:xml:catalog">
+          <uri name="macOS-cpe-oval.xml" uri="#scap_gov.nist.mscp.content_cref_macOS_{1}_macOS-cpe-oval.xml"/>
+        </catalog>
+      </component-ref>
+    </dictionaries>
+    <checklists>
+      <component-ref xmlns:ns0="http://www.w3.org/1999/xlink" id="scap_gov.nist.mscp.content_cref_macOS_{1}_xccdf.xml" ns0:type="simple" ns0:href="#scap_gov.nist.mscp.content_comp_macOS_{1}_xccdf.xml">
+        <catalog xmlns="urn:oasis:names:tc:entity:xmlns:xml:catalog">
+            <uri name="oval.xml" uri="#scap_gov.nist.mscp.content_cref_macOS_{1}_check_1"/>
+            <uri name="ocil.xml" uri="#scap_gov.nist.mscp.content_cref_macOS_{1}_check_2"/>
+        </catalog>
+      </component-ref>
+    </checklists>
+    <checks>
+      <component-ref xmlns:ns0="http://www.w3.org/1999/xlink" id="scap_gov.nist.mscp.content_cref_macOS_{1}_macOS-cpe-oval.xml" ns0:type="simple" ns0:href="#scap_gov.nist.mscp.content_comp_macOS_{1}_macOS-cpe-oval.xml"/>
+      <component-ref xmlns:ns0="http://www.w3.org/1999/xlink" id="scap_gov.nist.mscp.content_cref_macOS_{1}_check_1" ns0:type="simple" ns0:href="#scap_gov.nist.mscp.content_comp_macOS_{1}_check_1"/>
+      <component-ref xmlns:ns0="http://www.w3.org/1999/xlink" id="scap_gov.nist.mscp.content_cref_macOS_{1}_check_2" ns0:type="simple" ns0:href="#scap_gov.nist.mscp.content_comp_macOS_{1}_check_2"/>
+    </checks>
+  </data-stream>
+  <component id="scap_gov.nist.mscp.content_comp_macOS_{1}_xccdf.xml" timestamp="{0}">
+    <Benchmark xmlns="http://checklists.nist.gov/xccdf/1.2" id="xccdf_gov.nist.mscp.content_benchmark_macOS_{1}" style="SCAP_1.3" resolved="true" xml:lang="en">
+      <status date="{4}">draft</status>
+      <title>macOS {1}: Security Configuration</title>
+      <description>
+        macOS {1}: Security Configuration
+      </description>
+      
+      
+      <reference href="https://csrc.nist.gov/projects/security-content-automation-protocol/scap-releases/scap-1-3">
+        <title xmlns="http://purl.org/dc/elements/1.1/">Security Content Automation Protocol</title>
+        <publisher xmlns="http://purl.org/dc/elements/1.1/">National Institute of Standards and Technology</publisher>
+      </reference>
+      <reference href="macOS-cpe-dictionary.xml">platform-cpe-dictionary</reference>
+      <reference href="macOS-cpe-oval.xml">platform-cpe-oval</reference>
+      <platform idref="cpe:2.3:{2}:*:*:*:*:*:*:*"/>
+      <version time="{0}" update="https://github.com/usnistgov/macos_security">{3}</version>
+      <metadata>
+        <creator xmlns="http://purl.org/dc/elements/1.1/">National Institute of Standards and Technology</creator>
+        <publisher xmlns="http://purl.org/dc/elements/1.1/">National Institute of Standards and Technology</publisher>
+        <source xmlns="http://purl.org/dc/elements/1.1/">https://github.com/usnistgov/macos_security/releases/latest</source>
+        <contributor xmlns="http://purl.org/dc/elements/1.1/">Bob Gendler - National Institute of Standards and Technology</contributor>
+        <contributor xmlns="http://purl.org/dc/elements/1.1/">Dan Brodjieski - National Aeronautics and Space Administration</contributor>
+        <contributor xmlns="http://purl.org/dc/elements/1.1/">Allen Golbig - Jamf</contributor>
+      </metadata>
+    '''.format(date_time_string, version_yaml['os'], version_yaml['cpe'], version_yaml['version'],date_time_string.split("T")[0] + "Z")
+
+    generated_baselines = {}
+    
+    for fragments in generate_all_rule_fragments(all_rules, all_baselines, export_formats, args, x, d):
+        offset = len(scap_rules)
+        for check, indexes in fragments['rule_checks'].items():
+            rule_checks.setdefault(check, []).extend(offset + index for index in indexes)
+        oval_definition.extend(fragments['oval_definition'])
+        oval_test.extend(fragments['oval_test'])
+        oval_object.extend(fragments['oval_object'])
+        oval_state.extend(fragments['oval_state'])
+        oval_variable.extend(fragments['oval_variable'])
+        xccdf_rules.extend(fragments['xccdf_rules'])
+        scap_rules.extend(fragments['scap_rules'])
+        # a rule can reuse the definition number of the rule before it, which then points at OCIL as well
+        for check, count in fragments['ocil_checks']:
+            earlier = [index for index in rule_checks.get(check, []) if index < offset + count]
+            replace_ocil(scap_rules, {check: earlier}, check)
+        for baseline, rule_ids in fragments['generated_baselines'].items():
+            generated_baselines.setdefault(baseline, []).extend(rule_ids)
+        x = fragments['x']
+        d = fragments['d']
+
+    xccdf_profiles.extend(xccdf_profile(baseline, rule_ids) for baseline, rule_ids in generated_baselines.items())
     
 
-    total_xccdf = xccdfPrefix + xccdf_profiles + '''
+    group_start = '''
     <Group id="xccdf_gov.nist.mscp.content_group_all_rules">
         <title>All rules</title>
         <description>
@@ -3285,19 +3610,11 @@ def generate_scap(all_rules, all_baselines, args):
         </description>
         <warning category="general">
           The check/fix commands outlined in this section must be run with elevated privileges.
-        </warning>''' + xccdf_rules + '''      
+        </warning>'''
+    group_end = '''      
         </Group>  </Benchmark>'''
 
-    total_scap = scapPrefix + xccdf_profiles + '''
-    <Group id="xccdf_gov.nist.mscp.content_group_all_rules">
-        <title>All rules</title>
-        <description>
-         All the rules
-        </description>
-        <warning category="general">
-          The check/fix commands outlined in this section must be run with elevated privileges.
-        </warning>''' + xccdf_rules + '''      
-        </Group>  </Benchmark>
+    oval_start = '''
   </component>  
   <component id="scap_gov.nist.mscp.content_comp_macOS_{1}_check_1" timestamp="{0}">
     <oval_definitions xmlns="http://oval.mitre.org/XMLSchema/oval-definitions-5" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:schemaLocation="   http://oval.mitre.org/XMLSchema/oval-definitions-5             https://raw.githubusercontent.com/OVALProject/Language/5.11.2/schemas/oval-definitions-schema.xsd  http://oval.mitre.org/XMLSchema/oval-definitions-5#independent https://raw.githubusercontent.com/OVALProject/Language/5.11.2/schemas/independent-definitions-schema.xsd    http://oval.mitre.org/XMLSchema/oval-definitions-5#macos       https://raw.githubusercontent.com/OVALProject/Language/5.11.2/schemas/macos-definitions-schema.xsd  http://oval.mitre.org/XMLSchema/oval-definitions-5#unix        https://raw.githubusercontent.com/OVALProject/Language/5.11.2/schemas/unix-definitions-schema.xsd">
@@ -3308,17 +3625,16 @@ def generate_scap(all_rules, all_baselines, args):
         <oval:product_name xmlns:oval="http://oval.mitre.org/XMLSchema/oval-common-5">macOS Security Compliance Project</oval:product_name>
       </generator>
 '''.format(date_time_string,version_yaml['os'])
-    total_oval = "\n<definitions>\n" + oval_definition + "\n</definitions>\n<tests>\n" + oval_test + "\n</tests>\n<objects>\n" + oval_object + "\n</objects>\n"
-    if oval_state != "":
-        total_oval = total_oval + "<states>\n" + oval_state + "\n</states>\n"
-    if oval_variable != "":
-        total_oval = total_oval + "\n<variables>\n" + oval_variable + "\n</variables>\n"
-    
-    total_oval = total_oval + "\n</oval_definitions>"
+    oval_test, oval_object, oval_state, oval_variable = dedupe_oval(oval_test, oval_object, oval_state, oval_variable)
+    total_oval = ["\n<definitions>\n", *oval_definition, "\n</definitions>\n<tests>\n", *oval_test, "\n</tests>\n<objects>\n", *oval_object, "\n</objects>\n"]
+    if oval_state:
+        total_oval += ["<states>\n", *oval_state, "\n</states>\n"]
+    if oval_variable:
+        total_oval += ["\n<variables>\n", *oval_variable, "\n</variables>\n"]
     
-    final_oval = re.sub('(?=\n\[NOTE\])(?s)(.*)\=\n$.*', '<', total_oval)
+    total_oval.append("\n</oval_definitions>")
     
-    total_scap = total_scap + final_oval + '''
+    scap_end = '''
       </component>
       <component id="scap_gov.nist.mscp.content_comp_macOS_{2}_check_2" timestamp="{0}">
     <ocil xmlns="http://scap.nist.gov/schema/ocil/2.0" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:schemaLocation="http://scap.nist.gov/schema/ocil/2.0 ocil-2.0.xsd">
@@ -3422,147 +3738,25 @@ def generate_scap(all_rules, all_baselines, args):
     </oval_definitions>
   </component>
 </data-stream-collection>'''.format(date_time_string,version_yaml['cpe'],version_yaml['os'])
-    scap_file = output
-    with open(scap_file + "temp",'w') as rite:
-        if export_as == "scap":
-            rite.write(total_scap)
-        elif export_as == "xccdf":
-            rite.write(total_xccdf)
-        elif export_as == "oval":
-            total_oval = ovalPrefix + total_oval
-            rite.write(total_oval)
-
-        cmd = shutil.which('xmllint')
-        rite.close()
-        if cmd == None:
-            try:
-                os.rename(scap_file + "temp", scap_file)
-            except:
-                print("Error writing Oval file.")
-        else:
-            cmd = cmd + " " + scap_file + "temp --format --output " + scap_file
-            
-            os.popen(cmd).read()
-            if os.path.exists(scap_file):
-                os.remove(scap_file + "temp")    
+    # the fragments are streamed to the file as they are, the document is never joined in memory
+    documents = []
+    if "scap" in export_formats and args.split_oval:
+        # scap_end closes the xccdf component once the OVAL component is left out
+        oval_component = 'ns0:href="#scap_gov.nist.mscp.content_comp_macOS_{}_check_1"'.format(version_yaml['os'])
+        # the OVAL file is referenced by the name it is written under, compressed files get the suffix of their format
+        oval_href = os.path.basename(output_files["oval"]) + COMPRESSION_SUFFIXES.get(args.compress, "")
+        scapPrefix = scapPrefix.replace(oval_component, 'ns0:href="{}"'.format(oval_href))
+        documents.append(([scapPrefix, *xccdf_profiles, group_start, *scap_rules, group_end, scap_end], output_files["scap"]))
+        export_formats.add("oval")
+    elif "scap" in export_formats:
+        documents.append(([scapPrefix, *xccdf_profiles, group_start, *scap_rules, group_end, oval_start, *total_oval, scap_end], output_files["scap"]))
+    if "xccdf" in export_formats:
+        documents.append(([xccdfPrefix, *xccdf_profiles, group_start, *xccdf_rules, group_end], output_files["xccdf"]))
+    if "oval" in export_formats:
+        documents.append(([ovalPrefix, *total_oval], output_files["oval"]))
+
+    write_documents(documents, get_workers(), args.compress)
 
-def get_rule_yaml(rule_file, custom=False, baseline_name=""):
-    """ Takes a rule file, checks for a custom version, and returns the yaml for the rule
-    """
-    global resulting_yaml 
-    resulting_yaml = {}
-    names = [os.path.basename(x) for x in glob.glob('../custom/rules/**/*.yaml', recursive=True)]
-    file_name = os.path.basename(rule_file)
-
-    if custom:
-        print(f"Custom settings found for rule: {rule_file}")
-        try:
-            override_path = glob.glob('../custom/rules/**/{}'.format(file_name), recursive=True)[0]
-        except IndexError:
-            override_path = glob.glob('../custom/rules/{}'.format(file_name), recursive=True)[0]
-        with open(override_path) as r:
-            rule_yaml = yaml.load(r, Loader=yaml.SafeLoader)
-    else:
-        with open(rule_file) as r:
-            rule_yaml = yaml.load(r, Loader=yaml.SafeLoader)
-    
-    try:
-        og_rule_path = glob.glob('../rules/**/{}'.format(file_name), recursive=True)[0]
-    except IndexError:
-        og_rule_path = glob.glob('../custom/rules/**/{}'.format(file_name), recursive=True)[0]
-        resulting_yaml['customized'] = ["customized rule"]
-    
-    with open(og_rule_path) as og:
-        og_rule_yaml = yaml.load(og, Loader=yaml.SafeLoader)
-
-    for yaml_field in og_rule_yaml:
-        if yaml_field == "references":
-            if not 'references' in resulting_yaml:
-                resulting_yaml['references'] = {}
-            for ref in og_rule_yaml['references']:
-                try:
-                    if og_rule_yaml['references'][ref] == rule_yaml['references'][ref]:
-                        resulting_yaml['references'][ref] = og_rule_yaml['references'][ref]
-                    else:
-                        resulting_yaml['references'][ref] = rule_yaml['references'][ref]
-                except KeyError:
-                    try:
-                        resulting_yaml['references'][ref] = rule_yaml['references'][ref]
-                    except KeyError:
-                        resulting_yaml['references'][ref] = og_rule_yaml['references'][ref]
-                try: 
-                    if "custom" in rule_yaml['references']:
-                        resulting_yaml['references']['custom'] = rule_yaml['references']['custom']
-                        if 'customized' in resulting_yaml:
-                            if 'customized references' not in resulting_yaml['customized']:
-                                resulting_yaml['customized'].append("customized references")
-                        else:
-                            resulting_yaml['customized'] = ["customized references"]
-                except:
-                    pass
-        elif yaml_field == "tags":
-            # try to concatenate tags from both original yaml and custom yaml
-            try:
-                if og_rule_yaml["tags"] == rule_yaml["tags"]:
-                    #print("using default data in yaml field {}".format("tags"))
-                    resulting_yaml['tags'] = og_rule_yaml['tags']
-                else:
-                    #print("Found custom tags... concatenating them")
-                    resulting_yaml['tags'] = og_rule_yaml['tags'] + rule_yaml['tags']
-            except KeyError:
-                resulting_yaml['tags'] = og_rule_yaml['tags']
-        else: 
-            try:
-                if og_rule_yaml[yaml_field] == rule_yaml[yaml_field]:
-                    resulting_yaml[yaml_field] = og_rule_yaml[yaml_field]
-                else:
-                    resulting_yaml[yaml_field] = rule_yaml[yaml_field]
-                    if 'customized' in resulting_yaml:
-                        resulting_yaml['customized'].append("customized {}".format(yaml_field))
-                    else:
-                        resulting_yaml['customized'] = ["customized {}".format(yaml_field)]
-            except KeyError:
-                resulting_yaml[yaml_field] = og_rule_yaml[yaml_field]
-        
-    return resulting_yaml
-     
-                
-class MacSecurityRule():
-    def __init__(self, title, rule_id, severity, discussion, check, fix, cci, cce, nist_controls, disa_stig, srg, odv, tags, result_value, mobileconfig, mobileconfig_info):
-        self.rule_title = title
-        self.rule_id = rule_id
-        self.rule_severity = severity
-        self.rule_discussion = discussion
-        self.rule_check = check
-        self.rule_fix = fix
-        self.rule_cci = cci
-        self.rule_cce = cce
-        self.rule_80053r4 = nist_controls
-        self.rule_disa_stig = disa_stig
-        self.rule_srg = srg
-        self.rule_odv = odv
-        self.rule_result_value = result_value
-        self.rule_tags = tags
-        self.rule_mobileconfig = mobileconfig
-        self.rule_mobileconfig_info = mobileconfig_info
-
-    def create_asciidoc(self, adoc_rule_template):
-        """Pass an AsciiDoc template as file object to return formatted AsciiDOC"""
-        rule_adoc = ""
-        rule_adoc = adoc_rule_template.substitute(
-            rule_title=self.rule_title,
-            rule_id=self.rule_id,
-            rule_severity=self.rule_severity,
-            rule_discussion=self.rule_discussion,
-            rule_check=self.rule_check,
-            rule_fix=self.rule_fix,
-            rule_cci=self.rule_cci,
-            rule_80053r4=self.rule_80053r4,
-            rule_disa_stig=self.rule_disa_stig,
-            rule_srg=self.rule_srg,
-            rule_result=self.rule_result_value
-        )
-        return rule_adoc
 
 def collect_rules():
     """Takes a baseline yaml file and parses the rules, returns a list of containing rules
@@ -3587,7 +3781,7 @@ def collect_rules():
                   'srg']
 
 
-    for rule in glob.glob('../rules/**/*.yaml',recursive=True) + glob.glob('../custom/rules/**/*.yaml',recursive=True):
+    for rule in get_catalog().all_rule_files():
         if "supplemental" in rule:
             continue
         rule_yaml = get_rule_yaml(rule, custom=False)
@@ -3620,38 +3814,11 @@ def collect_rules():
         if "arm64" in rule_yaml['tags']:
             rule_yaml['tags'].remove("arm64")
 
-        all_rules.append(MacSecurityRule(rule_yaml['title'].replace('|', '\|'),
-                                    rule_yaml['id'].replace('|', '\|'),
-                                    rule_yaml['severity'].replace('|', '\|'),
-                                    rule_yaml['discussion'].replace('|', '\|'),
-                                    rule_yaml['check'].replace('|', '\|'),
-                                    rule_yaml['fix'].replace('|', '\|'),
-                                    rule_yaml['references']['cci'],
-                                    rule_yaml['references']['cce'],
-                                    rule_yaml['references']['800-53r4'],
-                                    rule_yaml['references']['disa_stig'],
-                                    rule_yaml['references']['srg'],
-                                    rule_yaml['odv'],
-                                    rule_yaml['tags'],
-                                    rule_yaml['result'],
-                                    rule_yaml['mobileconfig'],
-                                    rule_yaml['mobileconfig_info']
-                                    ))
+        all_rules.append(MacSecurityRule.from_yaml(rule_yaml))
     return all_rules
 
-def available_tags(all_rules):
-    all_tags = []
-    for rule in all_rules:
-        for tag in rule.rule_tags:
-            all_tags.append(tag)
-
-    available_tags = []
-    for tag in all_tags:
-        if tag not in available_tags:
-            available_tags.append(tag)
-    available_tags.sort()
-
-    return available_tags
+def available_tags(tag_index):
+    return tag_index.tags()
     
 def get_controls(all_rules):
     all_controls = []
@@ -3675,33 +3842,34 @@ def main():
 
     os.chdir(file_dir)
 
+    if args.rule_pack:
+        if not use_rule_pack(args.rule_pack):
+            sys.exit(1)
+    set_workers(args.workers)
+    preload_rules()
     all_rules = collect_rules()
-    
-    all_rules_pruned = []
+    tag_index = TagIndex(all_rules)
 
-    # for rule in all_rules:
-    #     if rule.rule_id not in all_rules_pruned:
-    #         all_rules_pruned.append(rule.rule_id)
+    all_rules_pruned = []
 
     if args.list_tags:
-        for tag in available_tags(all_rules):
+        for tag in available_tags(tag_index):
             print(tag)
         exit(0)
     all_baselines = []
 
     if args.baseline:
         all_baselines = [args.baseline]
-        for rule in all_rules:
-            if rule.rule_id not in all_rules_pruned and args.baseline in rule.rule_tags:
-            # if args.baseline in rule.rule_tags:
-                all_rules_pruned.append(rule.rule_id)
+        if tag_index.is_expression(args.baseline):
+            # the xccdf profile is named after the tag and built from the rule tags
+            print("Tag expressions are not supported for an scap baseline, generate the baseline with generate_baseline.py and use a single tag.")
+            exit(1)
+        all_rules_pruned = list(dict.fromkeys(rule.rule_id for rule in tag_index.select(args.baseline)))
 
     if all_baselines == ['None']:
-        all_baselines = available_tags(all_rules)
-        for rule in all_rules:
-            if rule.rule_id not in all_rules_pruned:
-                all_rules_pruned.append(rule.rule_id)
-    
+        all_baselines = available_tags(tag_index)
+        all_rules_pruned = list(dict.fromkeys(rule.rule_id for rule in all_rules))
+
     generate_scap(all_rules_pruned, all_baselines, args)
 
     os.chdir(original_working_directory)
@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+# filename: rule_catalog.py
+# description: Shared index of the rule library and custom rules, used by the generate_* scripts
+
+import os
+import atexit
+import hashlib
+import pickle
+import tempfile
+import yaml
+from concurrent.futures import ProcessPoolExecutor
+
+
+# use the libyaml C loader when PyYAML was built with it
+try:
+    SafeLoader = yaml.CSafeLoader
+except AttributeError:
+    SafeLoader = yaml.SafeLoader
+
+_parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_yaml(stream, loader=None):
+    """Parses a YAML string or file object with the fastest available safe loader
+    """
+    return yaml.load(stream, Loader=loader or SafeLoader)
+
+
+class RuleCatalog():
+    """Walks the rules and custom rules directories once and indexes every rule file by rule id.
+    """
+    def __init__(self, rules_dir='../rules', custom_rules_dir='../custom/rules', index=None):
+        self.rules_dir = rules_dir
+        self.custom_rules_dir = custom_rules_dir
+        if index is None:
+            self.rule_files = self._walk(rules_dir)
+            self.custom_rule_files = self._walk(custom_rules_dir)
+            self.section_files = self._list('../sections')
+            self.custom_section_files = self._list('../custom/sections')
+        else:
+            # file lists recorded in a rule pack, relative to the repository root
+            self.rule_files = [os.path.join('..', path) for path in index['rules']]
+            self.custom_rule_files = [os.path.join('..', path) for path in index['custom_rules']]
+            self.section_files = index['sections']
+            self.custom_section_files = index['custom_sections']
+
+        # first match wins, matching the glob(...)[0] lookups this replaces
+        self.original_paths = {}
+        for rule_file in self.rule_files:
+            self.original_paths.setdefault(rule_id_from_path(rule_file), rule_file)
+
+        self.override_paths = {}
+        for rule_file in self.custom_rule_files:
+            self.override_paths.setdefault(rule_id_from_path(rule_file), rule_file)
+
+    def _walk(self, directory):
+        """Returns the yaml files found under directory, in the same order a recursive glob would
+        """
+        found = []
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for name in files:
+                if name.endswith('.yaml') and not name.startswith('.'):
+                    found.append(os.path.join(root, name))
+        return found
+
+    def _list(self, directory):
+        """Returns the names of the yaml files directly inside directory
+        """
+        if not os.path.isdir(directory):
+            return []
+        return sorted(f for f in os.listdir(directory) if f.endswith('.yaml') and not f.startswith('.'))
+
+    def all_rule_files(self):
+        """Returns every rule file, library rules first, followed by the custom rules
+        """
+        return self.rule_files + self.custom_rule_files
+
+    def lookup(self, rule_id):
+        """Returns a tuple of (original_path, override_path) for the rule id, either may be None
+        """
+        return self.original_paths.get(rule_id), self.override_paths.get(rule_id)
+
+    def has_override(self, rule_id):
+        return rule_id in self.override_paths
+
+    def rule_path(self, rule_id):
+        """Returns the path of the file to load for a rule and whether it is a custom rule, custom rules take precedence
+        """
+        if rule_id in self.override_paths:
+            return self.override_paths[rule_id], True
+        if rule_id in self.original_paths:
+            return self.original_paths[rule_id], False
+        return None, False
+
+    def section_path(self, section_yaml_file):
+        """Returns the path of a section file, a custom section takes precedence
+        """
+        if section_yaml_file in self.custom_section_files:
+            return os.path.join('../custom/sections', section_yaml_file)
+        return os.path.join('../sections', section_yaml_file)
+
+    def files_for(self, rule_ids):
+        """Returns the original and override files needed to load the given rule ids, in rule order
+        """
+        files = []
+        seen = set()
+        for rule_id in rule_ids:
+            for path in self.lookup(rule_id):
+                if path and path not in seen:
+                    seen.add(path)
+                    files.append(path)
+        return files
+
+    def __contains__(self, rule_id):
+        return rule_id in self.original_paths or rule_id in self.override_paths
+
+
+class TagIndex():
+    """Maps each tag to the set of collected rules carrying it, and evaluates tag expressions such as "cis_lvl2 AND NOT 800-53r5_low".
+    """
+    OPERATORS = ('AND', 'OR', 'NOT', '(', ')')
+
+    def __init__(self, rules, all_tag='all_rules'):
+        # rules are indexed by position, a custom rule can carry different tags than the library rule with the same id
+        self.rules = rules
+        self.all_tag = all_tag
+        self.everything = frozenset(range(len(rules)))
+        self.tag_rules = {}
+        for position, rule in enumerate(rules):
+            for tag in rule.rule_tags:
+                self.tag_rules.setdefault(tag, set()).add(position)
+
+    def tags(self):
+        """Returns the sorted list of tags found on the rules
+        """
+        return sorted(self.tag_rules)
+
+    def __contains__(self, tag):
+        return tag in self.tag_rules
+
+    def lookup(self, tag):
+        if tag == self.all_tag:
+            return self.everything
+        return self.tag_rules.get(tag, frozenset())
+
+    def is_expression(self, expression):
+        return any(token in self.OPERATORS for token in self._tokenize(expression))
+
+    def select(self, expression, always_include=()):
+        """Returns the rules matched by a tag or tag expression, plus any rules with an always_include tag, in the order they were collected
+        """
+        positions = self.evaluate(expression) if expression else frozenset()
+        for tag in always_include:
+            positions = positions | self.lookup(tag)
+        return [rule for position, rule in enumerate(self.rules) if position in positions]
+
+    def rule_ids(self, expression):
+        """Returns the set of rule ids matched by a tag or tag expression
+        """
+        return {self.rules[position].rule_id for position in self.evaluate(expression)}
+
+    def evaluate(self, expression):
+        """Returns the positions of the rules matched by a tag expression, NOT binds tighter than AND, which binds tighter than OR
+        """
+        tokens = self._tokenize(expression)
+        if not tokens:
+            raise ValueError("empty tag expression")
+        positions, end = self._parse_or(tokens, 0)
+        if end != len(tokens):
+            raise ValueError(f"unexpected '{tokens[end]}' in tag expression")
+        return positions
+
+    def _tokenize(self, expression):
+        return expression.replace('(', ' ( ').replace(')', ' ) ').split()
+
+    def _parse_or(self, tokens, pos):
+        positions, pos = self._parse_and(tokens, pos)
+        while pos < len(tokens) and tokens[pos] == 'OR':
+            right, pos = self._parse_and(tokens, pos + 1)
+            positions = positions | right
+        return positions, pos
+
+    def _parse_and(self, tokens, pos):
+        positions, pos = self._parse_not(tokens, pos)
+        while pos < len(tokens) and tokens[pos] == 'AND':
+            right, pos = self._parse_not(tokens, pos + 1)
+            positions = positions & right
+        return positions, pos
+
+    def _parse_not(self, tokens, pos):
+        if pos < len(tokens) and tokens[pos] == 'NOT':
+            positions, pos = self._parse_not(tokens, pos + 1)
+            return self.everything - positions, pos
+        return self._parse_term(tokens, pos)
+
+    def _parse_term(self, tokens, pos):
+        if pos >= len(tokens):
+            raise ValueError("tag expression ends early")
+        token = tokens[pos]
+        if token == '(':
+            positions, pos = self._parse_or(tokens, pos + 1)
+            if pos >= len(tokens) or tokens[pos] != ')':
+                raise ValueError("missing ')' in tag expression")
+            return positions, pos + 1
+        if token in self.OPERATORS:
+            raise ValueError(f"unexpected '{token}' in tag expression")
+        return frozenset(self.lookup(token)), pos + 1
+
+
+# errors raised reading a pickle that is missing, truncated or was written by other code
+PICKLE_ERRORS = (OSError, EOFError, pickle.UnpicklingError, AttributeError, KeyError, TypeError)
+
+
+def read_pickle_store(path, version):
+    """Returns the dict written to path by write_pickle_store, or None if it was written with a different version.
+    Raises one of PICKLE_ERRORS when the file can't be read
+    """
+    with open(path, 'rb') as f:
+        stored = pickle.load(f)
+    if stored.get('version') != version:
+        return None
+    return stored
+
+
+def write_pickle_store(path, version, contents):
+    """Writes the contents dict and its version to path, raises OSError if it can't be written
+    """
+    store_dir = os.path.dirname(os.path.abspath(path))
+    os.makedirs(store_dir, exist_ok=True)
+    # write to a temporary file first, several generators may be running at once
+    with tempfile.NamedTemporaryFile('wb', dir=store_dir, delete=False) as f:
+        pickle.dump(dict(contents, version=version), f, pickle.HIGHEST_PROTOCOL)
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, path)
+
+
+def cache_path(file_name):
+    return os.path.join(_parent_dir, 'build', '.cache', file_name)
+
+
+def shared_cache(cache_class, file_name):
+    """Returns a cache_class stored as build/.cache/file_name, its save method is called when the script exits
+    """
+    cache = cache_class(cache_path(file_name))
+    atexit.register(cache.save)
+    return cache
+
+
+class ParsedYamlCache():
+    """On-disk cache of parsed YAML documents, invalidated per file by mtime, size and content hash.
+    """
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.dirty = False
+        try:
+            cached = read_pickle_store(cache_file, self.CACHE_VERSION)
+        except PICKLE_ERRORS:
+            cached = None
+        self.entries = cached['entries'] if cached else {}
+
+    def is_current(self, path):
+        """Returns True if the cached entry for path still matches the file on disk
+        """
+        entry = self.entries.get(os.path.abspath(path))
+        if not entry:
+            return False
+        stat = os.stat(path)
+        return entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size
+
+    def load(self, path):
+        """Returns the parsed contents of path, only parsing the file when it changed since it was cached
+        """
+        key = os.path.abspath(path)
+        if self.is_current(path):
+            return pickle.loads(self.entries[key]['data'])
+
+        entry = self.entries.get(key)
+        if entry:
+            # the stamp changed, only parse again if the content did too
+            stamp, digest, content = _read_file(path)
+            if entry['sha256'] == digest:
+                self._store(key, stamp, digest, entry['data'])
+                return pickle.loads(entry['data'])
+
+        result = _parse_yaml_file(path)
+        self._store(key, *result[1:])
+        return pickle.loads(result[-1])
+
+    def preload(self, paths, workers=1):
+        """Parses every stale file in paths ahead of time, spread across worker processes
+        """
+        stale = [path for path in paths if not self.is_current(path)]
+        if workers <= 1 or len(stale) < 2:
+            for path in stale:
+                self.load(path)
+            return
+
+        # results come back in submission order, so the cache is filled deterministically
+        chunksize = max(1, len(stale) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for path, stamp, digest, data in executor.map(_parse_yaml_file, stale, chunksize=chunksize):
+                self._store(os.path.abspath(path), stamp, digest, data)
+
+    def _store(self, key, stamp, digest, data):
+        self.entries[key] = {'mtime': stamp[0], 'size': stamp[1], 'sha256': digest, 'data': data}
+        self.dirty = True
+
+    def save(self):
+        """Writes the cache back to disk if anything was parsed
+        """
+        if not self.dirty:
+            return
+        try:
+            write_pickle_store(self.cache_file, self.CACHE_VERSION, {'entries': self.entries})
+            self.dirty = False
+        except OSError as e:
+            print(f"Unable to write the rule cache {self.cache_file}: {e}")
+
+
+class RulePack():
+    """Compiled bundle of the rules, custom rules, sections, baselines and includes, with an index of the rule files.
+    """
+    PACK_VERSION = 1
+    PACK_DIRECTORIES = ['rules', 'custom/rules', 'sections', 'custom/sections', 'baselines', 'includes']
+
+    def __init__(self, index, documents):
+        self.index = index
+        self.documents = documents
+
+    @classmethod
+    def build(cls, catalog):
+        """Parses every file the generators read from the repository, returns a new pack
+        """
+        index = {'rules': [_pack_key(path) for path in catalog.rule_files],
+                 'custom_rules': [_pack_key(path) for path in catalog.custom_rule_files],
+                 'sections': catalog.section_files,
+                 'custom_sections': catalog.custom_section_files}
+        documents = {}
+        for directory in cls.PACK_DIRECTORIES:
+            for path in catalog._walk(os.path.join(_parent_dir, directory)):
+                with open(path, 'rb') as f:
+                    documents[_pack_key(path)] = pickle.dumps(load_yaml(f), pickle.HIGHEST_PROTOCOL)
+        with open(os.path.join(_parent_dir, 'VERSION.yaml'), 'rb') as f:
+            documents['VERSION.yaml'] = pickle.dumps(load_yaml(f), pickle.HIGHEST_PROTOCOL)
+        return cls(index, documents)
+
+    @classmethod
+    def load(cls, pack_file):
+        """Reads a pack written by save(), returns None if it was built by a different version of the scripts
+        """
+        pack = read_pickle_store(pack_file, cls.PACK_VERSION)
+        if pack is None:
+            return None
+        return cls(pack['index'], pack['documents'])
+
+    def save(self, pack_file):
+        write_pickle_store(pack_file, self.PACK_VERSION, {'index': self.index, 'documents': self.documents})
+
+    def __contains__(self, path):
+        return _pack_key(path) in self.documents
+
+    def load_document(self, path):
+        """Returns a new copy of the parsed document stored for path
+        """
+        return pickle.loads(self.documents[_pack_key(path)])
+
+
+def _pack_key(path):
+    return os.path.relpath(os.path.abspath(path), _parent_dir).replace(os.sep, '/')
+
+
+def _read_file(path):
+    """Returns the stamp, sha256 and content of a file
+    """
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        content = f.read()
+    return (stat.st_mtime_ns, stat.st_size), hashlib.sha256(content).hexdigest(), content
+
+
+def _parse_yaml_file(path):
+    """Reads and parses a single file, returns the pickled document ready to be cached
+    """
+    stamp, digest, content = _read_file(path)
+    return path, stamp, digest, pickle.dumps(load_yaml(content), pickle.HIGHEST_PROTOCOL)
+
+
+def rule_id_from_path(rule_file):
+    return os.path.splitext(os.path.basename(rule_file))[0]
+
+
+def get_rule_yaml(rule_file, custom=False):
+    """ Takes a rule file, checks for a custom version, and returns the merged yaml for the rule
+    """
+    og_rule_path, override_path = get_catalog().lookup(rule_id_from_path(rule_file))
+
+    if custom:
+        print(f"Custom settings found for rule: {rule_file}")
+        rule_yaml = load_rule_yaml(override_path)
+    else:
+        rule_yaml = load_rule_yaml(rule_file)
+
+    new_rule = og_rule_path is None
+    if new_rule:
+        #assume this is a completely new rule
+        og_rule_path = override_path
+
+    # get original/default rule yaml for comparison
+    og_rule_yaml = load_rule_yaml(og_rule_path)
+
+    return merge_rule_yaml(og_rule_yaml, rule_yaml, new_rule)
+
+
+def merge_rule_yaml(og_rule_yaml, rule_yaml, new_rule=False):
+    """ Merges the custom rule yaml over the original rule yaml, recording which fields were customized
+    """
+    resulting_yaml = {}
+    if new_rule:
+        resulting_yaml['customized'] = ["customized rule"]
+
+    for yaml_field in og_rule_yaml:
+        if yaml_field == "references":
+            if not 'references' in resulting_yaml:
+                resulting_yaml['references'] = {}
+            for ref in og_rule_yaml['references']:
+                try:
+                    if og_rule_yaml['references'][ref] == rule_yaml['references'][ref]:
+                        resulting_yaml['references'][ref] = og_rule_yaml['references'][ref]
+                    else:
+                        resulting_yaml['references'][ref] = rule_yaml['references'][ref]
+                except KeyError:
+                    #  reference not found in original rule yaml, trying to use reference from custom rule
+                    try:
+                        resulting_yaml['references'][ref] = rule_yaml['references'][ref]
+                    except KeyError:
+                        resulting_yaml['references'][ref] = og_rule_yaml['references'][ref]
+                try:
+                    if "custom" in rule_yaml['references']:
+                        resulting_yaml['references']['custom'] = rule_yaml['references']['custom']
+                        if 'customized' in resulting_yaml:
+                            if 'customized references' not in resulting_yaml['customized']:
+                                resulting_yaml['customized'].append("customized references")
+                        else:
+                            resulting_yaml['customized'] = ["customized references"]
+                except:
+                    pass
+        elif yaml_field == "tags":
+            # try to concatenate tags from both original yaml and custom yaml
+            try:
+                if og_rule_yaml["tags"] == rule_yaml["tags"]:
+                    #print("using default data in yaml field {}".format("tags"))
+                    resulting_yaml['tags'] = og_rule_yaml['tags']
+                else:
+                    #print("Found custom tags... concatenating them")
+                    resulting_yaml['tags'] = og_rule_yaml['tags'] + rule_yaml['tags']
+            except KeyError:
+                resulting_yaml['tags'] = og_rule_yaml['tags']
+        else:
+            try:
+                if og_rule_yaml[yaml_field] == rule_yaml[yaml_field]:
+                    #print("using default data in yaml field {}".format(yaml_field))
+                    resulting_yaml[yaml_field] = og_rule_yaml[yaml_field]
+                else:
+                    #print('using CUSTOM value for yaml field {} in rule {}'.format(yaml_field, file_name))
+                    resulting_yaml[yaml_field] = rule_yaml[yaml_field]
+                    if 'customized' in resulting_yaml:
+                        resulting_yaml['customized'].append("customized {}".format(yaml_field))
+                    else:
+                        resulting_yaml['customized'] = ["customized {}".format(yaml_field)]
+            except KeyError:
+                resulting_yaml[yaml_field] = og_rule_yaml[yaml_field]
+
+    return resulting_yaml
+
+
+_catalog = None
+_yaml_cache = None
+_rule_pack = None
+_workers = 1
+
+
+def use_rule_pack(pack_file):
+    """Loads rules, sections, baselines and includes from a compiled rule pack instead of the files on disk
+    """
+    global _catalog, _rule_pack
+    try:
+        pack = RulePack.load(pack_file)
+    except PICKLE_ERRORS as e:
+        print(f"Unable to read the rule pack {pack_file}: {e}")
+        return False
+    if pack is None:
+        print(f"Rule pack {pack_file} was built by a different version of the scripts, rebuild it with generate_rule_pack.py")
+        return False
+    _rule_pack = pack
+    _catalog = RuleCatalog(index=pack.index)
+    return True
+
+
+def set_workers(workers):
+    """Sets the number of worker processes used to parse rule files, 0 uses every available core
+    """
+    global _workers
+    _workers = workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def get_workers():
+    """Returns the number of worker processes set with set_workers
+    """
+    return _workers
+
+
+def get_catalog():
+    """Returns the shared catalog, walking the rule directories on first use
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = RuleCatalog()
+    return _catalog
+
+
+def get_yaml_cache():
+    """Returns the shared parsed YAML cache, stored under build/.cache
+    """
+    global _yaml_cache
+    if _yaml_cache is None:
+        _yaml_cache = shared_cache(ParsedYamlCache, 'parsed_yaml.pickle')
+    return _yaml_cache
+
+
+def load_rule_yaml(rule_file):
+    """Returns the parsed yaml of a rule file, each call returns a new copy that is safe to modify
+    """
+    if _rule_pack is not None and rule_file in _rule_pack:
+        return _rule_pack.load_document(rule_file)
+    return get_yaml_cache().load(rule_file)
+
+
+def load_yaml_file(path):
+    """Returns the parsed yaml of a section, baseline, include or version file, using the rule pack when one is loaded
+    """
+    if _rule_pack is not None and path in _rule_pack:
+        return _rule_pack.load_document(path)
+    with open(path) as r:
+        return load_yaml(r)
+
+
+def preload_rules(rule_ids=None):
+    """Parses the files for the given rule ids, or the whole catalog, using the configured number of workers
+    """
+    if _rule_pack is not None:
+        return
+    catalog = get_catalog()
+    if rule_ids is None:
+        paths = catalog.all_rule_files()
+    else:
+        paths = catalog.files_for(rule_ids)
+    get_yaml_cache().preload(paths, _workers)
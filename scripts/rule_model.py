@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# filename: rule_model.py
+# description: Rule record shared by the generate_* scripts
+
+import copy
+
+# escape functions applied to the text fields of a rule for each output format
+ESCAPES = {
+    'adoc': lambda text: text.replace('|', '\\|'),
+}
+
+
+class MacSecurityRule():
+    """Immutable record of a merged rule. Text fields are stored once, escaped views are built on first use and cached per output format.
+
+    Only the attributes are immutable. from_yaml copies the references, odv, result, mobileconfig_info and customized
+    values so the record doesn't share them with the rule yaml, but they stay plain dicts and lists. The generators
+    share one record between their writers, which must treat these values as read only.
+    """
+    __slots__ = ('rule_id', '_title', '_severity', '_discussion', '_check', '_fix', 'rule_references',
+                 'rule_odv', 'rule_tags', 'rule_result_value', 'rule_mobileconfig', 'rule_mobileconfig_info',
+                 'rule_customized', '_views')
+
+    TEXT_FIELDS = ('title', 'severity', 'discussion', 'check', 'fix')
+
+    def __init__(self, title, rule_id, severity, discussion, check, fix, references, odv, tags, result_value, mobileconfig, mobileconfig_info, customized=""):
+        init = super().__setattr__
+        init('rule_id', rule_id)
+        init('_title', title)
+        init('_severity', severity)
+        init('_discussion', discussion)
+        init('_check', check)
+        init('_fix', fix)
+        init('rule_references', references)
+        init('rule_odv', odv)
+        init('rule_tags', tuple(tags))
+        init('rule_result_value', result_value)
+        init('rule_mobileconfig', mobileconfig)
+        init('rule_mobileconfig_info', mobileconfig_info)
+        init('rule_customized', customized)
+        init('_views', {})
+
+    @classmethod
+    def from_yaml(cls, rule_yaml):
+        """Creates a rule from merged rule yaml that has had its expected keys filled in, the dicts and lists are copied
+        """
+        return cls(rule_yaml['title'],
+                   rule_yaml['id'],
+                   rule_yaml['severity'],
+                   rule_yaml['discussion'],
+                   rule_yaml['check'],
+                   rule_yaml['fix'],
+                   copy.deepcopy(rule_yaml['references']),
+                   copy.deepcopy(rule_yaml['odv']),
+                   rule_yaml['tags'],
+                   copy.deepcopy(rule_yaml['result']),
+                   rule_yaml['mobileconfig'],
+                   copy.deepcopy(rule_yaml['mobileconfig_info']),
+                   copy.deepcopy(rule_yaml.get('customized', "")))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.rule_id!r})"
+
+    def text(self, field):
+        """Returns the unescaped value of a text field
+        """
+        return getattr(self, '_' + field)
+
+    def view(self, output_format):
+        """Returns the text fields escaped for an output format, the view is built once per rule and format
+        """
+        if output_format not in self._views:
+            escape = ESCAPES[output_format]
+            self._views[output_format] = {field: escape(self.text(field)) for field in self.TEXT_FIELDS}
+        return self._views[output_format]
+
+    # the AsciiDoc escaped text, as used for tables in the guides and spreadsheets
+    @property
+    def rule_title(self):
+        return self.view('adoc')['title']
+
+    @property
+    def rule_severity(self):
+        return self.view('adoc')['severity']
+
+    @property
+    def rule_discussion(self):
+        return self.view('adoc')['discussion']
+
+    @property
+    def rule_check(self):
+        return self.view('adoc')['check']
+
+    @property
+    def rule_fix(self):
+        return self.view('adoc')['fix']
+
+    @property
+    def rule_cci(self):
+        return self.rule_references.get('cci')
+
+    @property
+    def rule_cce(self):
+        return self.rule_references.get('cce')
+
+    @property
+    def rule_80053r4(self):
+        return self.rule_references.get('800-53r4')
+
+    @property
+    def rule_80053r5(self):
+        return self.rule_references.get('800-53r5')
+
+    @property
+    def rule_800171(self):
+        return self.rule_references.get('800-171r2')
+
+    @property
+    def rule_disa_stig(self):
+        return self.rule_references.get('disa_stig')
+
+    @property
+    def rule_srg(self):
+        return self.rule_references.get('srg')
+
+    @property
+    def rule_cis(self):
+        return self.rule_references.get('cis')
+
+    @property
+    def rule_cmmc(self):
+        return self.rule_references.get('cmmc')
+
+    @property
+    def rule_custom_refs(self):
+        return self.rule_references.get('custom')
+
+    def create_asciidoc(self, adoc_rule_template):
+        """Pass an AsciiDoc template as file object to return formatted AsciiDOC"""
+        rule_adoc = adoc_rule_template.substitute(
+            rule_title=self.rule_title,
+            rule_id=self.rule_id,
+            rule_severity=self.rule_severity,
+            rule_discussion=self.rule_discussion,
+            rule_check=self.rule_check,
+            rule_fix=self.rule_fix,
+            rule_cci=self.rule_cci,
+            rule_80053r4=self.rule_80053r4,
+            rule_80053r5=self.rule_80053r5,
+            rule_disa_stig=self.rule_disa_stig,
+            rule_cis=self.rule_cis,
+            rule_cmmc=self.rule_cmmc,
+            rule_srg=self.rule_srg,
+            rule_result=self.rule_result_value
+        )
+        return rule_adoc
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# filename: xlsx_writer.py
+# description: Writes xlsx workbooks row by row straight into the zip archive
+
+import io
+import os
+import re
+import zipfile
+
+# cell styles, the position of each is its id in styles.xml
+CELL_STYLES = ('default', 'top', 'top_wrap', 'header')
+_STYLE_IDS = {style: style_id for style_id, style in enumerate(CELL_STYLES)}
+
+# characters xml 1.0 can't hold
+_INVALID_CHARACTERS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+# sheet names are limited to 31 characters and can't contain any of []:*?/\
+_INVALID_SHEET_NAME = re.compile(r'[\[\]:*?/\\]')
+MAX_SHEET_NAME = 31
+# the most characters excel shows in a cell, longer text makes it report the workbook as unreadable
+MAX_CELL_TEXT = 32767
+
+_MAIN_NAMESPACE = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_RELATIONSHIPS_NAMESPACE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PACKAGE_RELATIONSHIPS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+_STYLES = _HEADER + '''<styleSheet xmlns="{0}">
+<fonts count="2"><font><sz val="10"/><name val="Arial"/></font><font><b/><sz val="10"/><name val="Arial"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="4">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0" applyAlignment="1"><alignment vertical="top"/></xf>
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0" applyAlignment="1"><alignment vertical="top" wrapText="1"/></xf>
+<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>
+</cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>'''.format(_MAIN_NAMESPACE)
+
+
+def escape_text(text):
+    text = _INVALID_CHARACTERS.sub('', text)
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def column_name(index):
+    """Returns the letters of a zero based column index, 0 is A and 26 is AA
+    """
+    name = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+
+def sheet_name(name, used=()):
+    """Returns name made valid for a sheet, and different from the names in used
+    """
+    name = _INVALID_SHEET_NAME.sub('_', name)[:MAX_SHEET_NAME] or "Sheet"
+    candidate = name
+    suffix = 1
+    while candidate.lower() in {other.lower() for other in used}:
+        suffix += 1
+        candidate = name[:MAX_SHEET_NAME - len(str(suffix)) - 1] + "_" + str(suffix)
+    return candidate
+
+
+class XlsxSheet():
+    """One worksheet being written, rows go straight to the archive so only the current row is held in memory.
+    Cell text is written inline instead of in a shared string table for the same reason.
+    """
+
+    def __init__(self, stream, column_widths=(), frozen_rows=0, frozen_columns=0):
+        self.stream = stream
+        self.row_count = 0
+        self.columns = []
+        stream.write(_HEADER + '<worksheet xmlns="{}" xmlns:r="{}">'.format(_MAIN_NAMESPACE, _RELATIONSHIPS_NAMESPACE))
+        if frozen_rows or frozen_columns:
+            stream.write('<sheetViews><sheetView workbookViewId="0"><pane xSplit="{0}" ySplit="{1}" topLeftCell="{2}{3}" activePane="bottomRight" state="frozen"/></sheetView></sheetViews>'.format(
+                frozen_columns, frozen_rows, self._column(frozen_columns), frozen_rows + 1))
+        if column_widths:
+            # widths are in characters
+            stream.write('<cols>' + "".join('<col min="{0}" max="{0}" width="{1:g}" customWidth="1"/>'.format(index + 1, width)
+                                            for index, width in enumerate(column_widths) if width) + '</cols>')
+        stream.write('<sheetData>')
+
+    def _column(self, index):
+        while len(self.columns) <= index:
+            self.columns.append(column_name(len(self.columns)))
+        return self.columns[index]
+
+    def write_row(self, cells, height=None):
+        """Writes the next row, cells is a list of (value, style) pairs or None for an empty cell.
+        Lists of values are written one per line, height is in points. Text longer than MAX_CELL_TEXT is cut short
+        """
+        self.row_count += 1
+        row = self.row_count
+        parts = ['<row r="{}"'.format(row)]
+        if height:
+            parts.append(' ht="{:g}" customHeight="1"'.format(height))
+        parts.append('>')
+        for index, cell in enumerate(cells):
+            if cell is None:
+                continue
+            value, style = cell
+            reference = self._column(index) + str(row)
+            style_id = _STYLE_IDS[style]
+            if isinstance(value, (list, tuple)):
+                value = "\n".join(str(item) for item in value)
+            if value is None or value == "":
+                parts.append('<c r="{}" s="{}"/>'.format(reference, style_id))
+            elif isinstance(value, bool):
+                parts.append('<c r="{}" s="{}" t="b"><v>{}</v></c>'.format(reference, style_id, int(value)))
+            elif isinstance(value, (int, float)):
+                parts.append('<c r="{}" s="{}"><v>{}</v></c>'.format(reference, style_id, value))
+            else:
+                text = str(value)
+                if len(text) > MAX_CELL_TEXT:
+                    print(f"Cell {reference} has {len(text)} characters, only the first {MAX_CELL_TEXT} were written")
+                    text = text[:MAX_CELL_TEXT]
+                parts.append('<c r="{}" s="{}" t="inlineStr"><is><t xml:space="preserve">{}</t></is></c>'.format(
+                    reference, style_id, escape_text(text)))
+        parts.append('</row>')
+        self.stream.write("".join(parts))
+
+    def close(self):
+        self.stream.write('</sheetData></worksheet>')
+        self.stream.close()
+
+
+class XlsxWorkbook():
+    """Writes an xlsx workbook one sheet at a time, the parts describing the sheets are added when it is closed
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.archive = zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED)
+        self.sheet_names = []
+        self.sheet = None
+
+    def add_sheet(self, name, column_widths=(), frozen_rows=0, frozen_columns=0):
+        """Finishes the current sheet and starts a new one, returns the XlsxSheet to write its rows to
+        """
+        if self.sheet is not None:
+            self.sheet.close()
+        self.sheet_names.append(sheet_name(name, self.sheet_names))
+        part = 'xl/worksheets/sheet{}.xml'.format(len(self.sheet_names))
+        stream = io.TextIOWrapper(self.archive.open(part, 'w', force_zip64=True), encoding='utf-8')
+        self.sheet = XlsxSheet(stream, column_widths, frozen_rows, frozen_columns)
+        return self.sheet
+
+    def close(self):
+        if self.sheet is not None:
+            self.sheet.close()
+            self.sheet = None
+        if not self.sheet_names:
+            self.add_sheet("Sheet 1").close()
+        sheet_count = len(self.sheet_names)
+        self.archive.writestr('[Content_Types].xml', _HEADER +
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>' +
+            "".join('<Override PartName="/xl/worksheets/sheet{}.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'.format(number)
+                    for number in range(1, sheet_count + 1)) +
+            '</Types>')
+        self.archive.writestr('_rels/.rels', _HEADER +
+            '<Relationships xmlns="{}"><Relationship Id="rId1" Type="{}/officeDocument" Target="xl/workbook.xml"/></Relationships>'.format(
+                _PACKAGE_RELATIONSHIPS, _RELATIONSHIPS_NAMESPACE))
+        self.archive.writestr('xl/workbook.xml', _HEADER +
+            '<workbook xmlns="{}" xmlns:r="{}"><sheets>'.format(_MAIN_NAMESPACE, _RELATIONSHIPS_NAMESPACE) +
+            "".join('<sheet name="{}" sheetId="{}" r:id="rId{}"/>'.format(escape_text(name).replace('"', "&quot;"), number, number)
+                    for number, name in enumerate(self.sheet_names, 1)) +
+            '</sheets></workbook>')
+        self.archive.writestr('xl/_rels/workbook.xml.rels', _HEADER +
+            '<Relationships xmlns="{}">'.format(_PACKAGE_RELATIONSHIPS) +
+            "".join('<Relationship Id="rId{0}" Type="{1}/worksheet" Target="worksheets/sheet{0}.xml"/>'.format(number, _RELATIONSHIPS_NAMESPACE)
+                    for number in range(1, sheet_count + 1)) +
+            '<Relationship Id="rId{}" Type="{}/styles" Target="styles.xml"/>'.format(sheet_count + 1, _RELATIONSHIPS_NAMESPACE) +
+            '</Relationships>')
+        self.archive.writestr('xl/styles.xml', _STYLES)
+        self.archive.close()
+
+    def abort(self):
+        """Stops writing and removes the unfinished workbook, so a failed build doesn't leave one that still opens
+        """
+        try:
+            if self.sheet is not None:
+                self.sheet.stream.close()
+                self.sheet = None
+            self.archive.close()
+        finally:
+            try:
+                os.remove(self.output_path)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# filename: xml_writer.py
+# description: Writes generated XML documents indented the same way as xmllint --format
+
+import io
+import os
+import gzip
+import zipfile
+from contextlib import contextmanager
+from xml.parsers import expat
+
+INDENT = "  "
+# libxml2 stops indenting deeper than 60 characters
+MAX_INDENT_LEVEL = 30
+WHITESPACE = " \t\n\r"
+# suffix added to the output path for each supported compression
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zip": ".zip"}
+
+
+def escape_text(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\r", "&#13;")
+
+
+def escape_attribute(value):
+    return (value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+            .replace("\n", "&#10;").replace("\r", "&#13;").replace("\t", "&#9;"))
+
+
+class _Element():
+    __slots__ = ('name', 'count', 'has_children', 'first_is_text', 'last_is_text', 'parent_format')
+
+    def __init__(self, name, count, parent_format):
+        self.name = name
+        self.count = count
+        self.has_children = False
+        self.first_is_text = False
+        self.last_is_text = False
+        self.parent_format = parent_format
+
+
+class XmlFormatter():
+    """Reads a document from string fragments with expat and writes it indented like xmllint --format.
+
+    Whitespace only text is dropped on the same rules as libxml2 parsing without blanks, and an element
+    that keeps any text is written on one line. Whether an element keeps text is only known once it is
+    closed, so the fragments are parsed twice: the first pass records the elements with text content and
+    the second writes the output as it is parsed.
+    """
+    FLUSH_SIZE = 4096
+
+    def __init__(self, fragments):
+        self.fragments = fragments
+        self.declaration = None
+        self.mixed = None
+
+    def _parse(self, write):
+        self.write = write
+        self.stack = []
+        self.text = []
+        self.cdata = None
+        self.format = True
+        self.open_tag = False
+        self.count = 0
+        found_mixed = set()
+        self.found_mixed = found_mixed
+
+        parser = expat.ParserCreate()
+        parser.ordered_attributes = True
+        parser.buffer_text = True
+        parser.buffer_size = 65536
+        parser.XmlDeclHandler = self._declaration
+        parser.StartElementHandler = self._start_element
+        parser.EndElementHandler = self._end_element
+        parser.CharacterDataHandler = self._characters
+        parser.CommentHandler = self._comment
+        parser.ProcessingInstructionHandler = self._processing_instruction
+        parser.StartCdataSectionHandler = self._start_cdata
+        parser.EndCdataSectionHandler = self._end_cdata
+        for fragment in self.fragments:
+            parser.Parse(fragment, False)
+        parser.Parse("", True)
+        return found_mixed
+
+    def _indent(self):
+        if self.format:
+            self.write(INDENT * min(len(self.stack), MAX_INDENT_LEVEL))
+
+    def _add_child(self, is_text=False):
+        """Closes the start tag of the parent the first time it gets a child"""
+        if not self.stack:
+            return
+        parent = self.stack[-1]
+        if not parent.has_children:
+            parent.first_is_text = is_text
+        parent.has_children = True
+        parent.last_is_text = is_text
+        if self.open_tag:
+            self.write(">")
+            if self.format:
+                self.write("\n")
+            self.open_tag = False
+
+    def _flush_text(self, closes_parent=False):
+        if not self.text:
+            return
+        text = "".join(self.text)
+        self.text = []
+        if not self.stack:
+            return
+        parent = self.stack[-1]
+        if text.strip(WHITESPACE) == "":
+            # blank text is kept inside an otherwise empty element and next to other text
+            if not (closes_parent and not parent.has_children) and not parent.last_is_text and not parent.first_is_text:
+                return
+        self.found_mixed.add(parent.count)
+        self._add_child(is_text=True)
+        self.write(escape_text(text))
+
+    def _declaration(self, version, encoding, standalone):
+        self.declaration = (version, encoding, standalone)
+
+    def _start_element(self, name, attributes):
+        self._flush_text()
+        self._add_child()
+        self._indent()
+        namespaces = []
+        others = []
+        for i in range(0, len(attributes), 2):
+            attribute = ' {}="{}"'.format(attributes[i], escape_attribute(attributes[i + 1]))
+            if attributes[i] == "xmlns" or attributes[i].startswith("xmlns:"):
+                namespaces.append(attribute)
+            else:
+                others.append(attribute)
+        self.write("<" + name + "".join(namespaces) + "".join(others))
+
+        element = _Element(name, self.count, self.format)
+        self.count += 1
+        self.stack.append(element)
+        if self.mixed is not None and element.count in self.mixed:
+            self.format = False
+        self.open_tag = True
+
+    def _end_element(self, name):
+        self._flush_text(closes_parent=True)
+        element = self.stack.pop()
+        if self.open_tag:
+            self.write("/>")
+            self.open_tag = False
+        else:
+            self._indent()
+            self.write("</" + name + ">")
+        self.format = element.parent_format
+        if self.format:
+            self.write("\n")
+
+    def _characters(self, data):
+        if self.cdata is not None:
+            self.cdata.append(data)
+        else:
+            self.text.append(data)
+
+    def _comment(self, data):
+        self._flush_text()
+        self._add_child()
+        self._indent()
+        self.write("<!--" + data + "-->")
+        if self.format:
+            self.write("\n")
+
+    def _processing_instruction(self, target, data):
+        self._flush_text()
+        self._add_child()
+        self._indent()
+        if data:
+            self.write("<?" + target + " " + data + "?>")
+        else:
+            self.write("<?" + target + "?>")
+        if self.format:
+            self.write("\n")
+
+    def _start_cdata(self):
+        self._flush_text()
+        self.cdata = []
+
+    def _end_cdata(self):
+        cdata = "".join(self.cdata)
+        self.cdata = None
+        self.found_mixed.add(self.stack[-1].count)
+        self._add_child()
+        self.write("<![CDATA[" + cdata + "]]>")
+
+    def write_to(self, output_file):
+        """Writes the formatted document to an open text file, raises expat.ExpatError if the document is not well formed
+        """
+        self.mixed = self._parse(lambda text: None)
+
+        pending = []
+        def write(text):
+            pending.append(text)
+            if len(pending) >= self.FLUSH_SIZE:
+                output_file.writelines(pending)
+                pending.clear()
+
+        version, encoding, standalone = self.declaration or ("1.0", None, -1)
+        write('<?xml version="{}"'.format(version))
+        if encoding:
+            write(' encoding="{}"'.format(encoding))
+        if standalone != -1:
+            write(' standalone="{}"'.format("yes" if standalone else "no"))
+        write("?>\n")
+        self._parse(write)
+        output_file.writelines(pending)
+
+
+@contextmanager
+def open_output(output_path, compression=None):
+    """Opens output_path as a text file, or streams it compressed into output_path.gz or a zip archive holding it when compression is gzip or zip
+    """
+    if compression == "gzip":
+        with gzip.open(output_path + COMPRESSION_SUFFIXES["gzip"], 'wt', encoding='utf-8') as output_file:
+            yield output_file
+    elif compression == "zip":
+        with zipfile.ZipFile(output_path + COMPRESSION_SUFFIXES["zip"], 'w', zipfile.ZIP_DEFLATED) as archive:
+            with io.TextIOWrapper(archive.open(os.path.basename(output_path), 'w'), encoding='utf-8') as output_file:
+                yield output_file
+    else:
+        with open(output_path, 'w', encoding='utf-8') as output_file:
+            yield output_file
+
+
+def write_formatted(fragments, output_path, compression=None):
+    """Writes the XML document made of fragments to output_path, indented like xmllint --format and optionally compressed
+    """
+    with open_output(output_path, compression) as output_file:
+        XmlFormatter(fragments).write_to(output_file)